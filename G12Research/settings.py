@@ -36,6 +36,7 @@ INSTALLED_APPS = [
     'django_recaptcha',
     'django.contrib.sites',
     'django.contrib.sitemaps',
+    'django.contrib.postgres',
 ]
 
 MIDDLEWARE = [
@@ -43,6 +44,7 @@ MIDDLEWARE = [
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'accounts.middleware.AmazonbotBlockerMiddleware',
     'django.middleware.common.CommonMiddleware',  
+    'research.middleware.AnonymousPageCacheMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
@@ -154,9 +156,24 @@ AUTH_USER_MODEL = 'accounts.User'
 
 SUPABASE_URL = config('SUPABASE_URL', default='')
 SUPABASE_KEY = config('SUPABASE_KEY', default='')
+# Keep-alive connections to Supabase per worker; match gunicorn's threads
+SUPABASE_POOL_SIZE = config('SUPABASE_POOL_SIZE', default=config('GUNICORN_THREADS', default=2, cast=int), cast=int)
+
+# Local disk LRU cache for PDFs downloaded from Supabase (0 disables it)
+PDF_CACHE_DIR = config('PDF_CACHE_DIR', default='/tmp/pdf-cache')
+PDF_CACHE_MAX_BYTES = config('PDF_CACHE_MAX_MB', default=256, cast=int) * 1024 * 1024
 
 DEFAULT_FROM_EMAIL = config('FROM_EMAIL', default='')
 
+# Outgoing mail is queued and sent by accounts/outbox.py. Without a Brevo
+# key, queued mail is printed to the console instead.
+EMAIL_TRANSPORT = config(
+    'EMAIL_TRANSPORT',
+    default='accounts.outbox.BrevoTransport' if BREVO_API_KEY else 'accounts.outbox.ConsoleTransport',
+)
+# Send from a thread in every web worker; turn off when `manage.py run_outbox` does it
+EMAIL_OUTBOX_THREAD = config('EMAIL_OUTBOX_THREAD', default=True, cast=bool)
+
 if not DEBUG:
     SECURE_SSL_REDIRECT = True
     SESSION_COOKIE_SECURE = True
@@ -189,12 +206,15 @@ FILE_UPLOAD_HANDLERS = [
     'django.core.files.uploadhandler.TemporaryFileUploadHandler',
 ]
 
+# Shared by all gunicorn workers (see sqlite_cache.py); RAM-backed on /dev/shm
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-        'LOCATION': 'unique-snowflake',
+        'BACKEND': 'sqlite_cache.SQLiteCache',
+        'LOCATION': config('CACHE_PATH', default='/dev/shm/g12research-cache.sqlite3'),
         'OPTIONS': {
-            'MAX_ENTRIES': 1000,
+            'MAX_ENTRIES': 5000,
+            # /dev/shm counts against the instance's memory
+            'MAX_BYTES': 32 * 1024 * 1024,
             'CULL_FREQUENCY': 4,
         }
     }
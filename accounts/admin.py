@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
-from .models import User, UserProfile
+from .models import OutgoingEmail, User, UserProfile
 
 
 @admin.register(User)
@@ -80,4 +80,13 @@ class UserProfileAdmin(admin.ModelAdmin):
     def has_parental_consent(self, obj):
         return bool(obj.parental_consent_file)
     has_parental_consent.boolean = True
-    has_parental_consent.short_description = 'Parental Consent'
\ No newline at end of file
+    has_parental_consent.short_description = 'Parental Consent'
+
+
+@admin.register(OutgoingEmail)
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    list_display = ['subject', 'kind', 'status', 'attempts', 'next_attempt_at', 'sent_at', 'created_at']
+    list_filter = ['status', 'kind']
+    search_fields = ['subject', 'recipients']
+    readonly_fields = ['attempts', 'last_error', 'provider_message_id', 'created_at', 'sent_at']
+    ordering = ['-created_at']
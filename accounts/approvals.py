@@ -0,0 +1,214 @@
+# accounts/approvals.py
+"""
+Approving and denying pending accounts in bulk.
+
+ApproveUserView and DenyUserView handle one profile per request, through
+profile.save() and the receivers in accounts/signals.py. At the start of a
+school year admins approve hundreds of accounts, so approve_profiles()
+does the same work set-based:
+
+- one query for the authors the users already own and one indexed
+  lookup of the authors matching their name keys, then a
+  bulk_update/bulk_create;
+- one bulk insert of profile-author links and a single
+  sync_assigned_papers() for every approved profile;
+- one UPDATE of is_approved.
+
+None of that sends model signals, so the approval cache, search index and
+cache generations the receivers would refresh are refreshed here, once the
+transaction commits: refreshed earlier, a concurrent request could cache
+the old rows again under the new generation. The approval and denial
+notices are batched kinds (accounts/outbox.py) and go out together in one
+dispatcher pass once the transaction commits.
+
+Both functions return one outcome per requested id, in request order.
+"""
+from functools import partial
+
+from django.core.cache import cache
+from django.db import transaction
+
+from research.models import Author, ResearchPaper
+from research.names import name_key
+from research.signals import bump_indexed_generation, reindex_papers
+
+from .models import User, UserProfile
+from .signals import is_shs_eligible, sync_assigned_papers
+from .utils import send_approval_email, send_denial_email
+
+# Most profiles one request may act on
+MAX_BULK_PROFILES = 500
+
+APPROVED = 'approved'
+DENIED = 'denied'
+SKIPPED = 'skipped'
+
+
+def pending_name(profile):
+    return f"{profile.pending_first_name or ''} {profile.pending_last_name or ''}".strip()
+
+
+def _outcome(profile_id, profile, status, detail=''):
+    return {
+        'id': profile_id,
+        'email': profile.user.email if profile else '',
+        'name': pending_name(profile) if profile else '',
+        'status': status,
+        'detail': detail,
+    }
+
+
+def _load(profile_ids):
+    """The requested profiles by id, locked for the rest of the transaction."""
+    return UserProfile.objects.select_related('user').select_for_update(of=('self',)).in_bulk(profile_ids)
+
+
+def _authors_by_name(profiles):
+    """Authors, owned or not, named like ``profiles``, by name_key."""
+    keys = {profile.name_key for profile in profiles}
+    if not keys:
+        return {}
+    authors = sorted(Author.objects.filter(name_key__in=keys), key=lambda author: author.user_id is None)
+    # An unowned author wins over an owned one with the same key
+    return {author.name_key: author for author in authors}
+
+
+def _new_author(profile):
+    user = profile.user
+    author = Author(
+        user=user,
+        # Author.save() normalizes these, bulk_create() doesn't
+        first_name=profile.pending_first_name.strip().title(),
+        last_name=profile.pending_last_name.strip().title(),
+        middle_initial=(profile.pending_middle_initial or '').strip().upper(),
+        suffix=(profile.pending_suffix or '').strip(),
+        G11_Batch=profile.pending_G11,
+        G12_Batch=profile.pending_G12,
+        birthdate=user.birthdate,
+    )
+    author.refresh_names(profile.consent_status == 'consented')
+    author.name_key = name_key(author.first_name, author.last_name, author.middle_initial, author.suffix)
+    return author
+
+
+def _claim(author, profile):
+    user = profile.user
+    author.user = user
+    author.G11_Batch = profile.pending_G11
+    author.G12_Batch = profile.pending_G12
+    if user.birthdate:
+        author.birthdate = user.birthdate
+    author.refresh_names(profile.consent_status == 'consented')
+
+
+@transaction.atomic
+def approve_profiles(profile_ids):
+    """Approve the pending profiles ``profile_ids``, linking SHS accounts to their authors."""
+    profile_ids = list(dict.fromkeys(profile_ids))
+    profiles = _load(profile_ids)
+    pending = [profiles[pk] for pk in profile_ids if pk in profiles and not profiles[pk].is_approved]
+    eligible = [profile for profile in pending if is_shs_eligible(profile)]
+
+    owned = {
+        author.user_id: author
+        for author in Author.objects.filter(user_id__in=[profile.user_id for profile in eligible])
+    }
+    named = [profile for profile in eligible if profile.user_id not in owned and profile.name_key]
+    by_name = _authors_by_name(named)
+    named = {profile.pk for profile in named}
+
+    links = {}  # profile id -> author
+    claimed, created = [], []
+    problems = {}
+    for profile in eligible:
+        if profile.user_id in owned:
+            links[profile.pk] = owned[profile.user_id]
+            continue
+        if profile.pk not in named:
+            problems[profile.pk] = "No name to create an author from; use Edit to approve."
+            continue
+
+        author = by_name.get(profile.name_key)
+        if author is None:
+            author = by_name[profile.name_key] = _new_author(profile)
+            created.append(author)
+        elif author.user_id is None:
+            _claim(author, profile)
+            claimed.append(author)
+        else:
+            # Claimed by another account, possibly earlier in this batch
+            problems[profile.pk] = "Matching author belongs to another account; use Edit to approve."
+            continue
+        links[profile.pk] = author
+
+    if claimed:
+        Author.objects.bulk_update(
+            claimed, ['user', 'G11_Batch', 'G12_Batch', 'birthdate', 'full_name', 'public_name']
+        )
+    if created:
+        Author.objects.bulk_create(created)
+    if links:
+        Link = UserProfile.author_profile.through
+        Link.objects.bulk_create(
+            [Link(userprofile_id=pk, author_id=author.pk) for pk, author in links.items()],
+            ignore_conflicts=True,
+        )
+        sync_assigned_papers(list(links))
+    if claimed:
+        paper_ids = list(
+            ResearchPaper.objects.filter(author__in=claimed).values_list('id', flat=True).distinct()
+        )
+        transaction.on_commit(partial(reindex_papers, paper_ids))
+    if claimed or created:
+        transaction.on_commit(partial(bump_indexed_generation, 'authors'))
+
+    approved = [profile for profile in pending if profile.pk not in problems]
+    UserProfile.objects.filter(pk__in=[profile.pk for profile in approved]).update(is_approved=True)
+    transaction.on_commit(
+        partial(cache.delete_many, [f"user_approved_{profile.user_id}" for profile in approved])
+    )
+
+    notified = {
+        profile.pk: send_approval_email(profile.user.email, pending_name(profile), profile.user.role)
+        for profile in approved
+    }
+
+    outcomes = []
+    for pk in profile_ids:
+        profile = profiles.get(pk)
+        if profile is None:
+            outcomes.append(_outcome(pk, None, SKIPPED, "No such account."))
+        elif pk in problems:
+            outcomes.append(_outcome(pk, profile, SKIPPED, problems[pk]))
+        elif pk in notified:
+            detail = '' if notified[pk] else "Approval email could not be queued."
+            outcomes.append(_outcome(pk, profile, APPROVED, detail))
+        else:
+            outcomes.append(_outcome(pk, profile, SKIPPED, "Already approved."))
+    return outcomes
+
+
+@transaction.atomic
+def deny_profiles(profile_ids, reason):
+    """Notify and delete the pending profiles ``profile_ids``; approved accounts are left alone."""
+    profile_ids = list(dict.fromkeys(profile_ids))
+    profiles = _load(profile_ids)
+    denied = {}
+    for pk in profile_ids:
+        profile = profiles.get(pk)
+        if profile is not None and not profile.is_approved:
+            denied[pk] = send_denial_email(profile.user.email, pending_name(profile), reason)
+
+    User.objects.filter(pk__in=[profiles[pk].user_id for pk in denied]).delete()
+
+    outcomes = []
+    for pk in profile_ids:
+        profile = profiles.get(pk)
+        if profile is None:
+            outcomes.append(_outcome(pk, None, SKIPPED, "No such account."))
+        elif pk in denied:
+            detail = '' if denied[pk] else "Denial email could not be queued."
+            outcomes.append(_outcome(pk, profile, DENIED, detail))
+        else:
+            outcomes.append(_outcome(pk, profile, SKIPPED, "Already approved."))
+    return outcomes
@@ -0,0 +1,76 @@
+# accounts/emails.py
+"""
+Email rendering.
+
+Every email is a pair of templates in accounts/templates/accounts/emails/:
+``<name>.html`` extending base.html, and ``<name>.txt``. Going through
+the template engine on every send would cost far more than the f-strings
+these replaced. Instead, each template is rendered once per process and
+per shape, with marker strings standing in for the variables. The shape
+is which of the variables are non-empty, since that decides the
+{% if %} branches. The result is split at the markers into static chunks,
+so a send only joins those chunks with the values, escaped for the HTML
+part.
+
+Templates may use these variables in {% if %} tags and print them as they
+are, but must not run them through filters: the filter would see the
+marker, not the value.
+"""
+import functools
+import html
+
+from django.template.loader import render_to_string
+
+# Base URL for the website
+SITE_URL = "https://btcsirepository.onrender.com"
+
+# Header/footer colour of each email
+ACCENTS = {
+    'verification': '#015726',
+    'password_reset': '#dc3545',
+    'approval': '#28a745',
+    'denial': '#6c757d',
+}
+
+# Can't occur in a template, and escaping leaves it alone
+MARKER = '\x1f'
+
+
+@functools.lru_cache(maxsize=None)
+def compile_email_template(template_name, names, present, static):
+    """
+    The template rendered with markers in place of ``names``, split into a
+    list whose odd items are variable names and even items static text.
+    ``present`` are the names that will have non-empty values.
+    """
+    context = dict(static)
+    for name in names:
+        context[name] = f'{MARKER}{name}{MARKER}' if name in present else ''
+    return tuple(render_to_string(template_name, context).split(MARKER))
+
+
+def _fill(chunks, values, escape):
+    parts = list(chunks)
+    for i in range(1, len(parts), 2):
+        parts[i] = escape(values[parts[i]])
+    return ''.join(parts)
+
+
+def _text(value):
+    return str(value)
+
+
+def _html(value):
+    # Same as django.utils.html.escape(), minus the lazy/SafeString wrapping
+    return html.escape(str(value))
+
+
+def render_email(name, **values):
+    """(text, html) bodies for the email ``name``; values are escaped in the HTML."""
+    names = tuple(sorted(values))
+    present = frozenset(key for key, value in values.items() if value)
+    static = (('accent', ACCENTS[name]), ('site_url', SITE_URL))
+
+    text = compile_email_template(f'accounts/emails/{name}.txt', names, present, static)
+    html_chunks = compile_email_template(f'accounts/emails/{name}.html', names, present, static)
+    return _fill(text, values, _text).strip() + '\n', _fill(html_chunks, values, _html)
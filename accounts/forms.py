@@ -160,13 +160,11 @@ class RegistrationForm(forms.ModelForm):
         
         if first_name and last_name:
             from research.models import Author
+            from research.names import name_key
             
-            # Check if an author with this exact name already has an account
+            # Check if an author with this name already has an account
             existing_author = Author.objects.filter(
-                first_name__iexact=first_name,
-                last_name__iexact=last_name,
-                middle_initial__iexact=middle_initial,
-                suffix__iexact=suffix,
+                name_key=name_key(first_name, last_name, middle_initial, suffix),
                 user__isnull=False  # Only check authors who already have accounts
             ).first()
             
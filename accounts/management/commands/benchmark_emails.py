@@ -0,0 +1,88 @@
+import importlib.util
+import timeit
+
+from django.core.management.base import BaseCommand, CommandError
+from django.template.loader import render_to_string
+
+from accounts.emails import ACCENTS, SITE_URL, render_email
+
+SAMPLES = {
+    'verification': {'user_name': 'Ana Reyes', 'verification_code': '123456'},
+    'password_reset': {'user_name': 'Ana Reyes', 'verification_code': '123456'},
+    'approval': {
+        'user_name': 'Ana Reyes', 'user_email': 'ana@example.com',
+        'role_display': 'SHS Student', 'login_url': f'{SITE_URL}/accounts/login/',
+    },
+    'denial': {'user_name': 'Ana Reyes', 'reason': 'Incomplete information'},
+}
+
+# The same emails through the old f-string senders in accounts/utils.py
+BASELINE_CALLS = {
+    'verification': ('send_verification_email', ('ana@example.com', '123456', 'Ana Reyes')),
+    'password_reset': ('send_password_reset_email', ('ana@example.com', '123456', 'Ana Reyes')),
+    'approval': ('send_approval_email', ('ana@example.com', 'Ana Reyes', 'shs_student')),
+    'denial': ('send_denial_email', ('ana@example.com', 'Ana Reyes', 'Incomplete information')),
+}
+
+
+def load_baseline(path):
+    """
+    The old accounts/utils.py at ``path``, with sending stubbed out so its
+    senders only build the bodies.
+    """
+    spec = importlib.util.spec_from_file_location('accounts._email_baseline', path)
+    if spec is None:
+        raise CommandError(f"Can't load {path}")
+    module = importlib.util.module_from_spec(spec)
+    try:
+        spec.loader.exec_module(module)
+    except (OSError, SyntaxError, ImportError) as e:
+        raise CommandError(f"Can't load {path}: {e}")
+    missing = [func for func, _ in BASELINE_CALLS.values() if not hasattr(module, func)]
+    if missing:
+        raise CommandError(f"{path} has no {', '.join(missing)}; is it the pre-template accounts/utils.py?")
+    module.send_email_async = lambda *args, **kwargs: True
+    return module
+
+
+class Command(BaseCommand):
+    help = (
+        "Time rendering each email through the template engine and from the compiled chunks. "
+        "Pass --baseline with the old accounts/utils.py to time its f-string senders too."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--number', type=int, default=2000, help="Renders per measurement")
+        parser.add_argument(
+            '--baseline', metavar='PATH',
+            help="Copy of the f-string accounts/utils.py, e.g. from 'git show d326bbb^:accounts/utils.py'",
+        )
+
+    def measure(self, func, number):
+        return min(timeit.repeat(func, number=number, repeat=5)) / number * 1e6
+
+    def handle(self, *args, **options):
+        number = options['number']
+        baseline = load_baseline(options['baseline']) if options['baseline'] else None
+
+        header = f"{'email':<16} {'template':>10} {'compiled':>10}"
+        self.stdout.write(header + (f" {'f-strings':>10}" if baseline else ''))
+        for name, values in SAMPLES.items():
+            context = {**values, 'accent': ACCENTS[name], 'site_url': SITE_URL}
+
+            def full_render():
+                render_to_string(f'accounts/emails/{name}.txt', context)
+                render_to_string(f'accounts/emails/{name}.html', context)
+
+            full = self.measure(full_render, number)
+            compiled = self.measure(lambda: render_email(name, **values), number)
+            row = f"{name:<16} {full:>8.1f}us {compiled:>8.1f}us"
+            if baseline:
+                func, call_args = BASELINE_CALLS[name]
+                old = self.measure(lambda: getattr(baseline, func)(*call_args), number)
+                row += f" {old:>8.1f}us"
+            self.stdout.write(row)
+
+        self.stdout.write(self.style.SUCCESS("Per email, text and HTML bodies together."))
+        if baseline is None:
+            self.stdout.write("No --baseline given: these are two ways of rendering the current templates.")
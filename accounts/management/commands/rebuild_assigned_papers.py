@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from accounts.signals import sync_assigned_papers
+
+
+class Command(BaseCommand):
+    help = "Rebuild every profile's assigned papers from its authors (repairs drift)"
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            added, removed = sync_assigned_papers()
+        self.stdout.write(self.style.SUCCESS(
+            f"Assigned papers rebuilt: {added} added, {removed} removed."
+        ))
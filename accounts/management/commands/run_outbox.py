@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from accounts.outbox import BATCH_SIZE, POLL_INTERVAL, dispatch_due, outbox_dispatcher
+
+
+class Command(BaseCommand):
+    help = "Send queued emails; runs until stopped unless --once is given"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once', action='store_true',
+            help="Send what is due now and exit",
+        )
+
+    def handle(self, *args, **options):
+        if not options['once']:
+            self.stdout.write("Email outbox running (Ctrl+C to stop)...")
+            # Mail queued by the web workers can't wake this process; poll when idle
+            outbox_dispatcher.run_forever(idle_timeout=POLL_INTERVAL)
+            return
+
+        total_sent = total_failed = 0
+        while True:
+            sent, failed = dispatch_due()
+            total_sent += sent
+            total_failed += failed
+            if sent + failed < BATCH_SIZE:
+                break
+        self.stdout.write(self.style.SUCCESS(
+            f"Outbox flushed: {total_sent} sent, {total_failed} failed or retrying."
+        ))
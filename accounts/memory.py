@@ -0,0 +1,154 @@
+# accounts/memory.py
+"""
+Worker memory gauge and garbage-collector tuning.
+
+A MemorySampler thread reads the process RSS every SAMPLE_INTERVAL
+seconds and stores it in ``rss_mb``. MemoryLimiterMiddleware only compares
+that number with the thresholds below, so admission costs nothing per
+request. The last SAMPLE_HISTORY samples are kept for snapshot(), which
+the admin memory endpoint returns, and crossing a threshold is logged
+from the sampler thread.
+
+Forced gc.collect() calls on request threads paused every thread in the
+worker for a full-heap scan. Instead, tune_gc() raises the collection
+thresholds when a worker starts, and freeze_gc() moves everything loaded
+while the worker booted (Django, the URLconf, models, every imported
+module) into the permanent generation, so collections only scan what
+requests allocate.
+"""
+import gc
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+import psutil
+
+logger = logging.getLogger(__name__)
+
+# Render kills the instance above MAX_MEMORY_MB
+MAX_MEMORY_MB = 500
+WARNING_THRESHOLD_MB = 450
+CRITICAL_THRESHOLD_MB = 480
+
+SAMPLE_INTERVAL = 1.0
+# Ten minutes of samples
+SAMPLE_HISTORY = 600
+
+# Python's defaults are (700, 10, 10): a young collection every 700 net
+# allocations, which a single template render exceeds many times over
+GC_THRESHOLDS = (7000, 20, 20)
+
+OK = 'ok'
+WARNING = 'warning'
+CRITICAL = 'critical'
+
+
+def memory_level(rss_mb):
+    if rss_mb is None or rss_mb < WARNING_THRESHOLD_MB:
+        return OK
+    if rss_mb < CRITICAL_THRESHOLD_MB:
+        return WARNING
+    return CRITICAL
+
+
+class MemorySampler:
+    """Samples this process's RSS on a background thread."""
+
+    def __init__(self, interval=SAMPLE_INTERVAL, history=SAMPLE_HISTORY):
+        self.interval = interval
+        # (unix time, RSS in MB), oldest first
+        self.samples = deque(maxlen=history)
+        # Latest RSS in MB; None until the first sample
+        self.rss_mb = None
+        self.peak_mb = None
+        self._level = OK
+        self._process = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def sample(self):
+        """Read the RSS once and record it; returns it in MB."""
+        pid = os.getpid()
+        if self._pid != pid:
+            # A forked worker must not keep measuring its parent
+            self._process = psutil.Process(pid)
+            self._pid = pid
+            self.samples.clear()
+            self.peak_mb = None
+        rss_mb = self._process.memory_info().rss / 1024 / 1024
+
+        self.samples.append((round(time.time(), 1), round(rss_mb, 1)))
+        if self.peak_mb is None or rss_mb > self.peak_mb:
+            self.peak_mb = rss_mb
+        # A single attribute store, so readers never see a half-made update
+        self.rss_mb = rss_mb
+
+        level = memory_level(rss_mb)
+        if level != self._level:
+            log = logger.info if level == OK else logger.warning
+            log(f"RAM {level.upper()}: {rss_mb:.1f}MB / {MAX_MEMORY_MB}MB (was {self._level})")
+            self._level = level
+        return rss_mb
+
+    def level(self):
+        """OK, WARNING or CRITICAL as of the latest sample."""
+        return memory_level(self.rss_mb)
+
+    def run_forever(self):
+        while True:
+            try:
+                self.sample()
+            except Exception:
+                logger.exception("Memory sampling failed")
+            time.sleep(self.interval)
+
+    def start(self):
+        """Start the sampler thread in this process unless it's already running."""
+        with self._lock:
+            # A thread from before a fork isn't running in this process
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self.run_forever, name='memory-sampler', daemon=True)
+            self._thread.start()
+
+    def snapshot(self):
+        """The sampled series and GC state, for the admin memory endpoint."""
+        rss_mb = self.rss_mb
+        return {
+            'pid': os.getpid(),
+            'rss_mb': round(rss_mb, 1) if rss_mb is not None else None,
+            'peak_mb': round(self.peak_mb, 1) if self.peak_mb is not None else None,
+            'level': memory_level(rss_mb),
+            'max_mb': MAX_MEMORY_MB,
+            'warning_mb': WARNING_THRESHOLD_MB,
+            'critical_mb': CRITICAL_THRESHOLD_MB,
+            'interval': self.interval,
+            'samples': list(self.samples),
+            'gc': {
+                'thresholds': gc.get_threshold(),
+                'counts': gc.get_count(),
+                'frozen': gc.get_freeze_count(),
+                'collections': [stats['collections'] for stats in gc.get_stats()],
+            },
+        }
+
+
+memory_sampler = MemorySampler()
+
+
+def tune_gc():
+    gc.set_threshold(*GC_THRESHOLDS)
+
+
+def freeze_gc():
+    """
+    Exempt everything alive now from future collections. Call it before the
+    worker takes requests: objects of a request in flight would be frozen
+    too, and frozen garbage is never freed.
+    """
+    gc.collect()
+    gc.freeze()
+    logger.info(f"GC froze {gc.get_freeze_count()} objects")
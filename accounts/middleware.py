@@ -4,19 +4,19 @@ from django.db import connection
 from django.db.utils import OperationalError
 from django.core.cache import cache
 import logging
-import psutil
-import os
-import gc
 import time
 import re
 
+from .memory import CRITICAL, memory_sampler
+
 logger = logging.getLogger(__name__)
 
 class MemoryLimiterMiddleware:
     """
-    Monitors RAM usage and throttles/blocks requests when memory gets too high.
-    This prevents Render from killing the process due to OOM.
-    Place this FIRST in your MIDDLEWARE list.
+    Turns requests away while the worker's RAM is critical, so Render
+    doesn't kill the process for running out of memory.
+    The RSS comes from the sampler thread in accounts/memory.py, so a
+    request only costs a comparison.
     """
     
     EXCLUDED_PATHS = [
@@ -28,19 +28,9 @@ class MemoryLimiterMiddleware:
         '/__debug__/',  
     ]
     
-    MAX_MEMORY_MB = 500  
-    WARNING_THRESHOLD_MB = 450  
-    CRITICAL_THRESHOLD_MB = 480  
-    
     def __init__(self, get_response):
         self.get_response = get_response
-        self.process = psutil.Process(os.getpid())
-        self.request_count = 0
-    
-    def get_memory_mb(self):
-        """Get current memory usage in MB"""
-        mem_info = self.process.memory_info()
-        return mem_info.rss / 1024 / 1024
+        memory_sampler.start()
     
     def __call__(self, request):
         if request.path == '/healthcheck/':
@@ -49,16 +39,8 @@ class MemoryLimiterMiddleware:
         if any(request.path.startswith(path) for path in self.EXCLUDED_PATHS):
             return self.get_response(request)
         
-        self.request_count += 1
-        current_memory = self.get_memory_mb()
-        
-        if self.request_count % 50 == 0:
-            logger.info(f"RAM: {current_memory:.1f}MB / {self.MAX_MEMORY_MB}MB ({(current_memory/self.MAX_MEMORY_MB*100):.1f}%)")
-        
-        if current_memory >= self.CRITICAL_THRESHOLD_MB:
-            logger.error(f"CRITICAL RAM: {current_memory:.1f}MB - Blocking request from {request.path}")
-            
-            self.emergency_cleanup()
+        if memory_sampler.level() == CRITICAL:
+            logger.error(f"CRITICAL RAM: {memory_sampler.rss_mb:.1f}MB - Blocking request from {request.path}")
             
             return HttpResponse(
                 """
@@ -125,44 +107,11 @@ class MemoryLimiterMiddleware:
                 </html>
                 """,
                 status=503,
-                content_type="text/html"
+                content_type="text/html",
+                headers={'Retry-After': '3'},
             )
         
-        if current_memory >= self.WARNING_THRESHOLD_MB:
-            logger.warning(f"WARNING RAM: {current_memory:.1f}MB - Slowing request")
-            time.sleep(0.1)
-            
-            if self.request_count % 5 == 0:
-                self.cleanup()
-        
-        response = self.get_response(request)
-        
-        if self.request_count % 20 == 0:
-            self.cleanup()
-        
-        return response
-    
-    def cleanup(self):
-        """Regular cleanup operations"""
-        try:
-            gc.collect()
-            from django.db import reset_queries
-            reset_queries()
-            logger.debug("Cleanup: GC + query cache cleared")
-        except Exception as e:
-            logger.error(f"Cleanup error: {e}")
-
-    def emergency_cleanup(self):
-        """Aggressive cleanup when memory is critical"""
-        try:
-            gc.collect()
-            gc.collect()
-            gc.collect()
-            from django.db import reset_queries
-            reset_queries()
-            logger.warning("Emergency cleanup completed")
-        except Exception as e:
-            logger.error(f"Emergency cleanup error: {e}")
+        return self.get_response(request)
 
 class ApprovalCheckMiddleware:
     EXCLUDED_PATHS = [
@@ -175,8 +124,6 @@ class ApprovalCheckMiddleware:
         '/__debug__/',
     ]
 
-    STATIC_CACHED_PATHS = ['/', '/about/', '/terms/', '/privacy-policy/']
-    
     def __init__(self, get_response):
         self.get_response = get_response
 
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.6 on 2026-10-17 00:35
+
+from django.db import migrations, models
+
+from research.names import name_key
+
+
+def fill_name_keys(apps, schema_editor):
+    UserProfile = apps.get_model('accounts', 'UserProfile')
+    changed = []
+    for profile in UserProfile.objects.iterator(chunk_size=500):
+        profile.name_key = name_key(
+            profile.pending_first_name, profile.pending_last_name,
+            profile.pending_middle_initial, profile.pending_suffix,
+        )
+        changed.append(profile)
+    UserProfile.objects.bulk_update(changed, ['name_key'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0010_outgoingemail'),
+        ('research', '0022_author_name_key'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userprofile',
+            name='name_key',
+            field=models.CharField(blank=True, editable=False, max_length=230),
+        ),
+        migrations.AddIndex(
+            model_name='userprofile',
+            index=models.Index(fields=['name_key'], name='idx_profile_name_key'),
+        ),
+        migrations.RunPython(fill_name_keys, migrations.RunPython.noop),
+    ]
@@ -6,6 +6,7 @@ from datetime import date, timedelta
 from django.utils import timezone
 import random
 from storage import SupabaseStorage
+from research.names import name_key
 
 # Add this helper function at the top, before the UserManager class
 def user_consent_file_path(instance, filename):
@@ -77,6 +78,8 @@ class UserProfile(models.Model):
     took_shs = models.BooleanField(default=True)
     pending_G11 = models.CharField(max_length=9, null=True, blank=True)
     pending_G12 = models.CharField(max_length=9, null=True, blank=True)
+    # research.names.name_key() of the pending name; matches Author.name_key
+    name_key = models.CharField(max_length=230, blank=True, editable=False)
 
     author_profile = models.ManyToManyField("research.Author", blank=True)
     assigned_papers = models.ManyToManyField("research.ResearchPaper", blank=True)
@@ -126,6 +129,21 @@ class UserProfile(models.Model):
         help_text="Timestamp of last password reset request (24hr cooldown)"
     )
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['name_key'], name='idx_profile_name_key'),
+        ]
+
+    def save(self, *args, **kwargs):
+        self.name_key = name_key(
+            self.pending_first_name, self.pending_last_name,
+            self.pending_middle_initial, self.pending_suffix,
+        )
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'name_key'}
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return self.display_name
 
@@ -200,4 +218,50 @@ class UserProfile(models.Model):
         if timezone.now() > expiry_time:
             return False
         
-        return True
\ No newline at end of file
+        return True
+
+class OutgoingEmail(models.Model):
+    """
+    A queued email. accounts.outbox sends these off the request thread,
+    retrying failed sends with exponential backoff.
+    """
+    KIND_CHOICES = [
+        ('verification', 'Verification code'),
+        ('password_reset', 'Password reset code'),
+        ('approval', 'Account approved'),
+        ('denial', 'Account denied'),
+        ('other', 'Other'),
+    ]
+
+    STATUS_PENDING = 'pending'
+    STATUS_SENT = 'sent'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_SENT, 'Sent'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES, default='other')
+    recipients = models.JSONField(default=list)
+    subject = models.CharField(max_length=255)
+    text_body = models.TextField(blank=True)
+    html_body = models.TextField(blank=True)
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    # Also pushed forward while a dispatcher holds the message
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    provider_message_id = models.CharField(max_length=255, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='idx_email_due'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} to {', '.join(self.recipients)} ({self.status})"
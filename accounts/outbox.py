@@ -0,0 +1,280 @@
+# accounts/outbox.py
+"""
+Email outbox.
+
+send_email_async() (accounts/utils.py) only stores an OutgoingEmail row,
+so the request returns right away. A dispatcher sends due rows through
+settings.EMAIL_TRANSPORT, either on a background thread in each web worker
+(EMAIL_OUTBOX_THREAD) or in a separate ``python manage.py run_outbox``
+process, or both.
+
+Claiming a row pushes its next_attempt_at forward with a conditional
+UPDATE, so any number of dispatchers can run without sending twice. If a
+dispatcher dies mid-send, the lease lapses and the row is retried.
+Failures back off exponentially up to MAX_ATTEMPTS. Messages the provider
+rejects outright fail at once.
+
+Approval and denial notices aren't urgent. They wait BATCH_WINDOW seconds
+so a run of approvals goes out together in one dispatcher pass, over one
+keep-alive connection.
+"""
+import logging
+import os
+import random
+import threading
+from datetime import timedelta
+
+import sib_api_v3_sdk
+from sib_api_v3_sdk.rest import ApiException
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+# Kinds that wait for company before going out
+BATCHED_KINDS = {'approval', 'denial'}
+BATCH_WINDOW = 10
+BATCH_SIZE = 50
+
+MAX_ATTEMPTS = 6
+# 30s, 1m, 2m, 4m, 8m: about 15 minutes in all, as long as a code is valid
+RETRY_BASE_DELAY = 30
+RETRY_MAX_DELAY = 60 * 30
+# How long a claimed message is left alone before another dispatcher may retry it
+CLAIM_LEASE = 120
+# Pause after a failed dispatch pass, and how often ``run_outbox`` checks
+# for mail when idle (other processes can't wake() it)
+POLL_INTERVAL = 60
+
+
+class PermanentEmailError(Exception):
+    """The provider rejected the message; retrying won't help."""
+
+
+# -------------------------
+# Transports
+# -------------------------
+
+class BrevoTransport:
+    """Brevo transactional API, reusing one API client (and its connections) per process."""
+
+    def __init__(self):
+        self._api = None
+        self._pid = None
+
+    def _client(self):
+        if self._api is None or self._pid != os.getpid():
+            configuration = sib_api_v3_sdk.Configuration()
+            configuration.api_key['api-key'] = settings.BREVO_API_KEY
+            self._api = sib_api_v3_sdk.TransactionalEmailsApi(sib_api_v3_sdk.ApiClient(configuration))
+            self._pid = os.getpid()
+        return self._api
+
+    def send(self, email):
+        message = sib_api_v3_sdk.SendSmtpEmail(
+            to=[{"email": address} for address in email.recipients],
+            sender={"email": settings.DEFAULT_FROM_EMAIL, "name": "BTCSI Research"},
+            subject=email.subject,
+            html_content=email.html_body or None,
+            text_content=email.text_body or None,
+        )
+        try:
+            response = self._client().send_transac_email(message)
+        except ApiException as e:
+            # 4xx other than rate limiting: bad address, bad payload, bad key
+            if e.status and 400 <= e.status < 500 and e.status != 429:
+                raise PermanentEmailError(f"Brevo rejected the message ({e.status}): {e.body}") from e
+            raise
+        return response.message_id
+
+
+class ConsoleTransport:
+    """Prints messages instead of sending them (local development without a Brevo key)."""
+
+    def send(self, email):
+        print(f"\n{'='*50}\nEMAIL to {', '.join(email.recipients)}: {email.subject}\n"
+              f"{'-'*50}\n{email.text_body}\n{'='*50}\n")
+        return f"console-{email.pk}"
+
+
+class FakeTransport:
+    """Keeps messages in FakeTransport.sent instead of sending them (tests, offline work)."""
+
+    sent = []
+    # Exceptions raised by the next send() calls, in order
+    errors = []
+
+    def send(self, email):
+        if FakeTransport.errors:
+            raise FakeTransport.errors.pop(0)
+        FakeTransport.sent.append(email)
+        return f"fake-{email.pk}"
+
+    @classmethod
+    def reset(cls):
+        cls.sent.clear()
+        cls.errors.clear()
+
+
+_transports = {}
+
+
+def get_transport():
+    path = settings.EMAIL_TRANSPORT
+    if path not in _transports:
+        _transports[path] = import_string(path)()
+    return _transports[path]
+
+
+# -------------------------
+# Queueing and dispatch
+# -------------------------
+
+def queue_email(subject, text_body, html_body, recipients, kind='other'):
+    """Store a message for the dispatcher; it's woken once the transaction commits."""
+    from .models import OutgoingEmail
+
+    delay = BATCH_WINDOW if kind in BATCHED_KINDS else 0
+    email = OutgoingEmail.objects.create(
+        kind=kind,
+        recipients=list(recipients),
+        subject=subject,
+        text_body=text_body or '',
+        html_body=html_body or '',
+        next_attempt_at=timezone.now() + timedelta(seconds=delay),
+    )
+    transaction.on_commit(outbox_dispatcher.wake)
+    return email
+
+
+def retry_delay(attempts):
+    delay = min(RETRY_BASE_DELAY * 2 ** (attempts - 1), RETRY_MAX_DELAY)
+    return delay * random.uniform(0.8, 1.2)
+
+
+def _claim(pk, due_at, now):
+    from .models import OutgoingEmail
+
+    return OutgoingEmail.objects.filter(
+        pk=pk, status=OutgoingEmail.STATUS_PENDING, next_attempt_at=due_at
+    ).update(
+        next_attempt_at=now + timedelta(seconds=CLAIM_LEASE),
+        attempts=F('attempts') + 1,
+    )
+
+
+def _send(email, transport):
+    from .models import OutgoingEmail
+
+    try:
+        message_id = transport.send(email)
+    except Exception as e:
+        permanent = isinstance(e, PermanentEmailError) or email.attempts >= MAX_ATTEMPTS
+        if permanent:
+            email.status = OutgoingEmail.STATUS_FAILED
+            logger.error(f"❌ Email {email.pk} to {email.recipients} failed for good: {e}")
+        else:
+            email.next_attempt_at = timezone.now() + timedelta(seconds=retry_delay(email.attempts))
+            logger.warning(f"⚠️ Email {email.pk} attempt {email.attempts} failed, retrying: {e}")
+        email.last_error = str(e)
+        email.save(update_fields=['status', 'next_attempt_at', 'last_error'])
+        return False
+
+    email.status = OutgoingEmail.STATUS_SENT
+    email.sent_at = timezone.now()
+    email.provider_message_id = message_id or ''
+    email.last_error = ''
+    email.save(update_fields=['status', 'sent_at', 'provider_message_id', 'last_error'])
+    logger.info(f"✅ Email {email.pk} sent to {email.recipients}")
+    return True
+
+
+def dispatch_due(limit=BATCH_SIZE):
+    """Send up to ``limit`` due messages; returns (sent, failed) counts."""
+    from .models import OutgoingEmail
+
+    transport = get_transport()
+    now = timezone.now()
+    due = list(
+        OutgoingEmail.objects.filter(
+            status=OutgoingEmail.STATUS_PENDING, next_attempt_at__lte=now
+        ).order_by('next_attempt_at').values_list('pk', 'next_attempt_at')[:limit]
+    )
+
+    sent = failed = 0
+    for pk, due_at in due:
+        if not _claim(pk, due_at, now):
+            continue  # another dispatcher got it
+        email = OutgoingEmail.objects.get(pk=pk)
+        if _send(email, transport):
+            sent += 1
+        else:
+            failed += 1
+    return sent, failed
+
+
+def seconds_until_next_due():
+    """Seconds until the next pending message is due, or None if there is none."""
+    from .models import OutgoingEmail
+
+    next_due = (
+        OutgoingEmail.objects.filter(status=OutgoingEmail.STATUS_PENDING)
+        .order_by('next_attempt_at')
+        .values_list('next_attempt_at', flat=True)
+        .first()
+    )
+    if next_due is None:
+        return None
+    return max((next_due - timezone.now()).total_seconds(), 0)
+
+
+class OutboxDispatcher:
+    """
+    Sends due messages in a loop, sleeping until the next one is due or
+    wake() is called. With nothing pending it sleeps until woken, or for at
+    most ``idle_timeout`` seconds when one is given.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    def run_forever(self, idle_timeout=None):
+        while True:
+            self._wakeup.clear()
+            try:
+                while True:
+                    sent, failed = dispatch_due()
+                    if sent + failed < BATCH_SIZE:
+                        break
+                timeout = seconds_until_next_due()
+                if timeout is None:
+                    timeout = idle_timeout
+            except Exception:
+                logger.exception("Email outbox dispatch failed")
+                timeout = POLL_INTERVAL
+            finally:
+                connection.close()
+            self._wakeup.wait(timeout)
+
+    def start(self):
+        """Start the dispatcher thread in this process unless it's already running."""
+        with self._lock:
+            # A thread from before a fork isn't running in this process
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self.run_forever, name='email-outbox', daemon=True)
+            self._thread.start()
+
+    def wake(self):
+        if not settings.EMAIL_OUTBOX_THREAD:
+            return
+        self.start()
+        self._wakeup.set()
+
+
+outbox_dispatcher = OutboxDispatcher()
@@ -2,7 +2,7 @@ from django.db.models.signals import post_save, m2m_changed
 from django.dispatch import receiver
 from django.apps import apps
 from django.conf import settings
-from django.db.models import Q
+from django.core.cache import cache
 
 
 # -------------------------
@@ -31,11 +31,6 @@ def normalize(value):
     return value.strip().upper() if value else None
 
 
-def blank_or_null(field):
-    """Match empty string OR NULL"""
-    return Q(**{f"{field}__isnull": True}) | Q(**{field: ""})
-
-
 def is_shs_eligible(profile):
     """Check if user is SHS student or Alumni who took SHS"""
     user = profile.user
@@ -61,36 +56,103 @@ def create_user_profile(sender, instance, created, **kwargs):
         UserProfile().objects.create(user=instance)
 
 
+@receiver(post_save, sender=UserProfile())
+def forget_cached_approval(sender, instance, **kwargs):
+    # ApprovalCheckMiddleware caches is_approved; the cache is shared by
+    # every worker, so this takes effect on the user's next request
+    cache.delete(f"user_approved_{instance.user_id}")
+
+
 # -------------------------
 # Assigned papers syncing
 # -------------------------
 
-def update_user_assigned_papers(profile):
-    if getattr(profile, "_updating_papers", False):
-        return
-
-    profile._updating_papers = True
-    authors = profile.author_profile.all()
-    papers = ResearchPaper().objects.filter(author__in=authors).distinct()
-    profile.assigned_papers.set(papers)
-    profile.save(update_fields=[])
-    profile._updating_papers = False
+def sync_assigned_papers(profile_ids=None):
+    """
+    Make each profile's assigned_papers equal to the papers of its authors,
+    set-based: one query for the wanted (profile, paper) pairs, one for the
+    current ones, then a single bulk delete / bulk insert for the difference.
+    ``profile_ids`` None reconciles every profile.
+    Returns (added, removed).
+    """
+    profile_model = UserProfile()
+    links = profile_model.author_profile.through.objects.all()
+    Assigned = profile_model.assigned_papers.through
+    current = Assigned.objects.all()
+
+    if profile_ids is not None:
+        profile_ids = list(profile_ids)
+        if not profile_ids:
+            return 0, 0
+        links = links.filter(userprofile_id__in=profile_ids)
+        current = current.filter(userprofile_id__in=profile_ids)
+
+    wanted = {
+        (profile_id, paper_id)
+        for profile_id, paper_id in links.values_list("userprofile_id", "author__researchpaper")
+        if paper_id is not None
+    }
+    existing = {
+        (profile_id, paper_id): pk
+        for pk, profile_id, paper_id in current.values_list("pk", "userprofile_id", "researchpaper_id")
+    }
+
+    stale = [pk for pair, pk in existing.items() if pair not in wanted]
+    missing = [
+        Assigned(userprofile_id=profile_id, researchpaper_id=paper_id)
+        for profile_id, paper_id in wanted - existing.keys()
+    ]
+    if stale:
+        Assigned.objects.filter(pk__in=stale).delete()
+    if missing:
+        Assigned.objects.bulk_create(missing, ignore_conflicts=True)
+    return len(missing), len(stale)
+
+
+def profile_ids_for_authors(author_ids):
+    author_ids = list(author_ids)
+    if not author_ids:
+        return []
+    return list(
+        UserProfile().author_profile.through.objects.filter(
+            author_id__in=author_ids
+        ).values_list("userprofile_id", flat=True).distinct()
+    )
 
 
 @receiver(m2m_changed, sender=UserProfile().author_profile.through)
-def sync_papers_on_author_change(sender, instance, action, **kwargs):
-    if action in ["post_add", "post_remove", "post_clear"]:
-        update_user_assigned_papers(instance)
+def sync_papers_on_author_change(sender, instance, action, reverse, pk_set, **kwargs):
+    # instance is a UserProfile, or an Author when changed from that side
+    if action == "pre_clear" and reverse:
+        instance._cleared_profile_ids = list(instance.userprofile_set.values_list("id", flat=True))
+    if action not in ["post_add", "post_remove", "post_clear"]:
+        return
+
+    if not reverse:
+        sync_assigned_papers([instance.pk])
+    elif action == "post_clear":
+        sync_assigned_papers(getattr(instance, "_cleared_profile_ids", []))
+    else:
+        sync_assigned_papers(pk_set or [])
 
 
 @receiver(m2m_changed, sender=ResearchPaper().author.through)
-def sync_papers_on_paper_author_change(sender, instance, action, **kwargs):
+def sync_papers_on_paper_author_change(sender, instance, action, reverse, pk_set, **kwargs):
+    # Only profiles of the added/removed authors can gain or lose the paper
+    if action == "pre_clear":
+        instance._cleared_author_ids = (
+            [instance.pk] if reverse else list(instance.author.values_list("id", flat=True))
+        )
     if action not in ["post_add", "post_remove", "post_clear"]:
         return
 
-    for author in instance.author.all():
-        for profile in UserProfile().objects.filter(author_profile=author):
-            update_user_assigned_papers(profile)
+    if reverse:
+        author_ids = [instance.pk]
+    elif action == "post_clear":
+        author_ids = getattr(instance, "_cleared_author_ids", [])
+    else:
+        author_ids = pk_set or []
+    sync_assigned_papers(profile_ids_for_authors(author_ids))
 
 
 # -------------------------
@@ -128,24 +190,7 @@ def create_author_on_approval(sender, instance, **kwargs):
     middle = normalize(instance.pending_middle_initial)
     suffix = normalize(instance.pending_suffix)
 
-    qs = Author().objects.filter(
-        first_name=first,
-        last_name=last,
-        user__isnull=True,
-    )
-
-    # 🔑 Match middle initial and suffix
-    if middle:
-        qs = qs.filter(middle_initial=middle)
-    else:
-        qs = qs.filter(blank_or_null("middle_initial"))
-
-    if suffix:
-        qs = qs.filter(suffix=suffix)
-    else:
-        qs = qs.filter(blank_or_null("suffix"))
-
-    author = qs.first()
+    author = Author().objects.filter(name_key=instance.name_key, user__isnull=True).first()
 
     if author:
         author.user = instance.user
@@ -164,5 +209,5 @@ def create_author_on_approval(sender, instance, **kwargs):
         )
 
     instance.author_profile.add(author)
-    update_user_assigned_papers(instance)
+    sync_assigned_papers([instance.pk])
     instance._creating_author = False
\ No newline at end of file
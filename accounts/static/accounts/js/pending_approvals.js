@@ -113,4 +113,103 @@ function handleEditApproveSubmit(event, form) {
     });
     
     return false;
-}
\ No newline at end of file
+}
+
+/* ============================================
+   BULK APPROVE / DENY
+   ============================================ */
+
+function selectedProfileCheckboxes() {
+    return Array.from(document.querySelectorAll('.bulk-select:checked'));
+}
+
+function updateBulkSelection() {
+    const count = selectedProfileCheckboxes().length;
+    const all = document.querySelectorAll('.bulk-select');
+    const selectAll = document.getElementById('bulkSelectAll');
+    const counter = document.getElementById('bulkSelectedCount');
+
+    if (counter) {
+        counter.textContent = count;
+    }
+    if (selectAll) {
+        selectAll.checked = count > 0 && count === all.length;
+        selectAll.indeterminate = count > 0 && count < all.length;
+    }
+    document.querySelectorAll('#bulkActionForm button[type="submit"]').forEach(button => {
+        button.disabled = count === 0;
+    });
+}
+
+function toggleBulkSelectAll(checkbox) {
+    document.querySelectorAll('.bulk-select').forEach(box => {
+        box.checked = checkbox.checked;
+    });
+    updateBulkSelection();
+}
+
+// Submit the selected rows; report rows the server skipped and reload if anything changed
+function handleBulkAction(event, form) {
+    event.preventDefault();
+
+    const action = event.submitter ? event.submitter.value : 'approve';
+    const selected = selectedProfileCheckboxes();
+    const formData = new FormData(form);
+    formData.set('action', action);
+
+    if (selected.length === 0) {
+        showError('Select at least one account.');
+        return false;
+    }
+    if (action === 'deny') {
+        if (!formData.get('denial_reason')) {
+            showError('Please select a reason for denial.');
+            return false;
+        }
+        if (!confirm(`Deny and permanently delete ${selected.length} account(s)? A denial email will be sent to each.`)) {
+            return false;
+        }
+    } else {
+        formData.delete('denial_reason');
+    }
+
+    fetch(form.action, {
+        method: 'POST',
+        body: formData,
+        headers: {
+            'X-Requested-With': 'XMLHttpRequest'
+        }
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (!data.success) {
+            showError(data.error || 'Failed to process the selected accounts.');
+            return;
+        }
+
+        data.results.forEach(result => {
+            const row = document.getElementById('pendingRow_' + result.id);
+            if (result.status === 'skipped') {
+                if (row) {
+                    row.classList.add('bulk-row-skipped');
+                    row.title = result.detail;
+                }
+                showWarning(`${result.name || result.email}: ${result.detail}`, 6000);
+            } else if (result.detail) {
+                showWarning(`${result.name || result.email}: ${result.detail}`, 6000);
+            }
+        });
+
+        if (data.processed > 0) {
+            const verb = data.action === 'approve' ? 'approved' : 'denied';
+            showSuccess(`${data.processed} account(s) ${verb} successfully!`);
+            setTimeout(() => window.location.reload(), data.skipped ? 4000 : 1000);
+        }
+    })
+    .catch(error => {
+        console.error('Error:', error);
+        showError('An error occurred. Please try again.');
+    });
+
+    return false;
+}
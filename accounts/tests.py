@@ -1,3 +1,523 @@
-from django.test import TestCase
+import os
+import tempfile
+from datetime import date, timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from research.caching import get_generation
+from research.models import Author, ResearchPaper, StoredFile
+from storage import FileStream, SupabaseStorage
+
+from .approvals import approve_profiles, deny_profiles
+from .emails import render_email
+from .memory import CRITICAL, OK, WARNING, MemorySampler
+from .models import OutgoingEmail, User, UserProfile
+from .outbox import (
+    BATCH_WINDOW, MAX_ATTEMPTS, FakeTransport, OutboxDispatcher, PermanentEmailError, dispatch_due,
+)
+from .signals import sync_assigned_papers
+from .utils import send_approval_email, send_verification_email
+from .views import parse_range_header
+
+
+@override_settings(EMAIL_TRANSPORT='accounts.outbox.FakeTransport', EMAIL_OUTBOX_THREAD=False)
+class EmailOutboxTests(TestCase):
+    def setUp(self):
+        FakeTransport.reset()
+
+    def make_due(self):
+        OutgoingEmail.objects.update(next_attempt_at=timezone.now() - timedelta(seconds=1))
+
+    def test_sending_only_queues(self):
+        self.assertTrue(send_verification_email('ana@example.com', '123456', 'Ana'))
+        self.assertEqual(FakeTransport.sent, [])
+
+        email = OutgoingEmail.objects.get()
+        self.assertEqual(email.kind, 'verification')
+        self.assertEqual(email.recipients, ['ana@example.com'])
+        self.assertIn('123456', email.text_body)
+
+        self.assertEqual(dispatch_due(), (1, 0))
+        self.assertEqual([e.pk for e in FakeTransport.sent], [email.pk])
+        email.refresh_from_db()
+        self.assertEqual(email.status, OutgoingEmail.STATUS_SENT)
+        self.assertEqual(email.provider_message_id, f'fake-{email.pk}')
+
+    def test_invalid_recipient_is_not_queued(self):
+        self.assertFalse(send_verification_email('not-an-email', '123456'))
+        self.assertFalse(OutgoingEmail.objects.exists())
+
+    def test_approvals_wait_for_the_batch_window(self):
+        send_approval_email('ana@example.com', 'Ana Reyes', 'shs_student')
+        send_approval_email('ben@example.com', 'Ben Cruz', 'alumni')
+        self.assertEqual(dispatch_due(), (0, 0))
+
+        later = timezone.now() + timedelta(seconds=BATCH_WINDOW + 1)
+        with mock.patch('accounts.outbox.timezone.now', return_value=later):
+            self.assertEqual(dispatch_due(), (2, 0))
+
+    def test_failed_send_backs_off_and_retries(self):
+        send_verification_email('ana@example.com', '123456')
+        FakeTransport.errors.append(ConnectionError('timed out'))
+
+        self.assertEqual(dispatch_due(), (0, 1))
+        email = OutgoingEmail.objects.get()
+        self.assertEqual(email.status, OutgoingEmail.STATUS_PENDING)
+        self.assertEqual(email.attempts, 1)
+        self.assertGreater(email.next_attempt_at, timezone.now())
+        self.assertEqual(dispatch_due(), (0, 0))
+
+        self.make_due()
+        self.assertEqual(dispatch_due(), (1, 0))
+        email.refresh_from_db()
+        self.assertEqual(email.status, OutgoingEmail.STATUS_SENT)
+        self.assertEqual(email.attempts, 2)
+
+    def test_gives_up_after_max_attempts(self):
+        send_verification_email('ana@example.com', '123456')
+        FakeTransport.errors.extend(ConnectionError('down') for _ in range(MAX_ATTEMPTS))
+        for _ in range(MAX_ATTEMPTS):
+            self.make_due()
+            dispatch_due()
+        email = OutgoingEmail.objects.get()
+        self.assertEqual(email.status, OutgoingEmail.STATUS_FAILED)
+        self.assertEqual(email.last_error, 'down')
+
+    def test_permanent_error_fails_at_once(self):
+        send_verification_email('ana@example.com', '123456')
+        FakeTransport.errors.append(PermanentEmailError('invalid sender'))
+        dispatch_due()
+        self.assertEqual(OutgoingEmail.objects.get().status, OutgoingEmail.STATUS_FAILED)
+
+    def test_claimed_message_is_not_sent_twice(self):
+        send_verification_email('ana@example.com', '123456')
+        # Another dispatcher claims it between our SELECT and UPDATE
+        with mock.patch('accounts.outbox._claim', return_value=0):
+            self.assertEqual(dispatch_due(), (0, 0))
+        self.assertEqual(FakeTransport.sent, [])
+
+    def dispatcher_timeouts(self, **kwargs):
+        """Timeouts of the dispatcher's first two sleeps."""
+        dispatcher = OutboxDispatcher()
+        timeouts = []
+
+        def wait(timeout):
+            timeouts.append(timeout)
+            if len(timeouts) == 2:
+                raise StopIteration
+            # A retry gets scheduled while we sleep
+            send_verification_email('ana@example.com', '123456')
+            FakeTransport.errors.append(ConnectionError('timed out'))
+            self.make_due()
+
+        with mock.patch.object(dispatcher._wakeup, 'wait', side_effect=wait), \
+                mock.patch('accounts.outbox.connection.close'), \
+                self.assertRaises(StopIteration):
+            dispatcher.run_forever(**kwargs)
+        return timeouts
+
+    def test_idle_dispatcher_sleeps_until_woken(self):
+        idle, retrying = self.dispatcher_timeouts()
+        self.assertIsNone(idle)
+        self.assertGreater(retrying, 0)
+
+    def test_idle_timeout(self):
+        self.assertEqual(self.dispatcher_timeouts(idle_timeout=60)[0], 60)
+
+
+class EmailRenderingTests(TestCase):
+    def test_values_are_escaped_in_html_only(self):
+        text, html = render_email('denial', user_name='<b>Eve</b>', reason='Spam & <script>')
+        self.assertIn('&lt;b&gt;Eve&lt;/b&gt;', html)
+        self.assertIn('Spam &amp; &lt;script&gt;', html)
+        self.assertNotIn('<script>', html)
+        self.assertIn('Hello <b>Eve</b>,', text)
+        self.assertIn('Reason: Spam & <script>', text)
+
+    def test_empty_values_take_the_other_branch(self):
+        text, html = render_email('denial', user_name='', reason='')
+        self.assertIn('Hello,', text)
+        self.assertIn('please contact the administrator', text)
+        self.assertNotIn('Reason', html)
+
+    def test_layout_is_shared(self):
+        _, verification = render_email('verification', user_name='Ana', verification_code='123456')
+        _, approval = render_email(
+            'approval', user_name='Ana', user_email='ana@example.com',
+            role_display='Alumni', login_url='https://example.com/login/',
+        )
+        for html in (verification, approval):
+            self.assertIn('BTCSI Research Team', html)
+            self.assertIn('Hello <strong>Ana</strong>,', html)
+        self.assertIn('123456', verification)
+        self.assertIn('#28a745', approval)
+
+
+class AssignedPapersSyncTests(TestCase):
+    def setUp(self):
+        self.profiles = [
+            User.objects.create_user(email=f'user{n}@example.com', password='pw').userprofile
+            for n in range(3)
+        ]
+        self.authors = [Author.objects.create(first_name='Ana', last_name=f'Reyes{n}') for n in range(3)]
+        self.papers = [
+            ResearchPaper.objects.create(
+                title=f'Study {n}', abstract='A study.', publication_date=date(2024, 1, 1),
+                grade_level=12, strand='STEM', research_design='QUANTITATIVE', school_year='2023-2024',
+            )
+            for n in range(4)
+        ]
+
+    def assertMatchesPerRowSync(self):
+        # What the old per-profile loop computed: the papers of the profile's authors
+        for profile in self.profiles:
+            expected = {
+                paper.pk
+                for author in profile.author_profile.all()
+                for paper in author.researchpaper_set.all()
+            }
+            self.assertEqual(set(profile.assigned_papers.values_list('pk', flat=True)), expected, profile)
+
+    def test_follows_author_and_link_changes_from_either_side(self):
+        ana, ben, cara = self.profiles
+        a0, a1, a2 = self.authors
+        p0, p1, p2, p3 = self.papers
+
+        ana.author_profile.add(a0)
+        ben.author_profile.add(a1)
+        a2.userprofile_set.add(ana, cara)
+        p0.author.add(a0, a1)
+        p1.author.add(a2)
+        a1.researchpaper_set.add(p2, p3)
+        self.assertMatchesPerRowSync()
+
+        p0.author.remove(a1)
+        a2.researchpaper_set.clear()
+        p3.author.clear()
+        self.assertMatchesPerRowSync()
+
+        a2.researchpaper_set.add(p3)
+        ben.author_profile.clear()
+        a2.userprofile_set.remove(cara)
+        self.assertMatchesPerRowSync()
+
+    def test_repairs_drift(self):
+        ana = self.profiles[0]
+        ana.author_profile.add(self.authors[0])
+        self.papers[0].author.add(self.authors[0])
+        Assigned = UserProfile.assigned_papers.through
+        Assigned.objects.filter(userprofile=ana).delete()
+        Assigned.objects.create(userprofile=ana, researchpaper=self.papers[1])
+
+        self.assertEqual(sync_assigned_papers(), (1, 1))
+        self.assertMatchesPerRowSync()
+        self.assertEqual(sync_assigned_papers(), (0, 0))
+
+
+@override_settings(EMAIL_TRANSPORT='accounts.outbox.FakeTransport', EMAIL_OUTBOX_THREAD=False)
+class BulkApprovalTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.counter = 0
+
+    def pending(self, first, last, role='shs_student', middle='', **fields):
+        self.counter += 1
+        user = User.objects.create_user(
+            email=f'user{self.counter}@example.com', password='pw', role=role,
+            birthdate=date(2007, 5, 1),
+        )
+        profile = UserProfile.objects.get(user=user)
+        fields = dict(
+            pending_first_name=first, pending_last_name=last, pending_middle_initial=middle,
+            pending_G11='2023-2024', pending_G12='2024-2025', **fields
+        )
+        for name, value in fields.items():
+            setattr(profile, name, value)
+        profile.save()
+        return profile
+
+    def test_approves_and_links_authors_in_bulk(self):
+        paper = ResearchPaper.objects.create(
+            title='Plant growth study', abstract='Effects of light.', publication_date=date(2024, 3, 1),
+            grade_level=12, strand='STEM', research_design='QUANTITATIVE', school_year='2024-2025',
+        )
+        unclaimed = Author.objects.create(first_name='Ana', last_name='Reyes', middle_initial='M')
+        paper.author.add(unclaimed)
+
+        ana = self.pending('ana', 'reyes', middle='m')
+        ben = self.pending('Ben', 'Cruz')
+        teacher = self.pending('Carla', 'Santos', role='research_teacher')
+
+        outcomes = approve_profiles([ana.pk, ben.pk, teacher.pk])
+
+        self.assertEqual([o['status'] for o in outcomes], ['approved'] * 3)
+        self.assertFalse(UserProfile.objects.filter(pk__in=[ana.pk, ben.pk, teacher.pk], is_approved=False).exists())
+
+        unclaimed.refresh_from_db()
+        self.assertEqual(unclaimed.user_id, ana.user_id)
+        self.assertEqual(unclaimed.G12_Batch, '2024-2025')
+        self.assertEqual(list(ana.assigned_papers.all()), [paper])
+
+        ben_author = Author.objects.get(user=ben.user)
+        self.assertEqual((ben_author.first_name, ben_author.public_name), ('Ben', 'Cruz, B.'))
+        self.assertEqual(list(ben.author_profile.all()), [ben_author])
+        self.assertFalse(Author.objects.filter(user=teacher.user).exists())
+
+        self.assertEqual(
+            sorted(OutgoingEmail.objects.values_list('kind', flat=True)), ['approval'] * 3
+        )
+
+    def test_caches_refresh_only_after_commit(self):
+        author = Author.objects.create(first_name='Kai', last_name='Ramos')
+        profile = self.pending('Kai', 'Ramos')
+        cache.set(f'user_approved_{profile.user_id}', False)
+        generation = get_generation('authors')
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            approve_profiles([profile.pk])
+            # Still inside the transaction: nothing another request could see yet
+            self.assertEqual(get_generation('authors'), generation)
+            self.assertIs(cache.get(f'user_approved_{profile.user_id}'), False)
+        for callback in callbacks:
+            callback()
+
+        self.assertNotEqual(get_generation('authors'), generation)
+        self.assertIsNone(cache.get(f'user_approved_{profile.user_id}'))
+        author.refresh_from_db()
+        self.assertEqual(author.user_id, profile.user_id)
+
+    def test_matches_authors_by_name_key(self):
+        author = Author.objects.create(first_name='Juan', last_name='Dela Cruz', suffix='Jr.')
+        profile = self.pending('juan', 'dela  cruz', pending_suffix='JR')
+
+        self.assertEqual(profile.name_key, author.name_key)
+        self.assertEqual(approve_profiles([profile.pk])[0]['status'], 'approved')
+        author.refresh_from_db()
+        self.assertEqual(author.user_id, profile.user_id)
+
+    def test_single_approval_prefers_the_unowned_author(self):
+        owner = User.objects.create_user(email='owner@example.com', password='pw')
+        # Spelled differently, so both exist, but with the same name_key
+        owned = Author.objects.create(first_name='Dana', last_name='Lim', suffix='Jr', user=owner)
+        unowned = Author.objects.create(first_name='Dana', last_name='Lim', suffix='Jr.')
+        profile = self.pending('Dana', 'Lim', pending_suffix='Jr.')
+        admin = User.objects.create_user(email='admin@example.com', password='pw', role='admin')
+        UserProfile.objects.filter(user=admin).update(is_approved=True)
+        self.client.force_login(admin)
+
+        self.client.post(reverse('accounts:approve_user', args=[profile.pk]))
+
+        unowned.refresh_from_db()
+        self.assertEqual(unowned.user_id, profile.user_id)
+        self.assertEqual(list(profile.author_profile.all()), [unowned])
+        owned.refresh_from_db()
+        self.assertEqual(owned.user_id, owner.pk)
+
+    def test_reports_rows_it_cannot_approve(self):
+        owner = User.objects.create_user(email='owner@example.com', password='pw')
+        Author.objects.create(first_name='Dana', last_name='Lim', user=owner)
+        taken = self.pending('Dana', 'Lim')
+        first = self.pending('Eli', 'Tan')
+        twin = self.pending('Eli', 'Tan')
+        done = self.pending('Fay', 'Ong', is_approved=True)
+
+        outcomes = approve_profiles([taken.pk, first.pk, twin.pk, done.pk, 999999])
+
+        self.assertEqual(
+            [o['status'] for o in outcomes], ['skipped', 'approved', 'skipped', 'skipped', 'skipped']
+        )
+        self.assertIn('another account', outcomes[0]['detail'])
+        self.assertEqual(outcomes[3]['detail'], 'Already approved.')
+        self.assertEqual(outcomes[4]['detail'], 'No such account.')
+        self.assertFalse(UserProfile.objects.get(pk=taken.pk).is_approved)
+        self.assertFalse(UserProfile.objects.get(pk=twin.pk).is_approved)
+        self.assertEqual(OutgoingEmail.objects.count(), 1)
+
+    def test_approval_query_count_does_not_grow_per_profile(self):
+        def queries_for(count):
+            profiles = [self.pending(f'Name{self.counter}', 'Batch') for _ in range(count)]
+            with CaptureQueriesContext(connection) as ctx:
+                approve_profiles([profile.pk for profile in profiles])
+            # Apart from one INSERT per queued email, the work is set-based
+            return len(ctx.captured_queries) - count
+
+        self.assertEqual(queries_for(2), queries_for(10))
+
+    def test_deny_removes_pending_accounts_only(self):
+        pending = self.pending('Gia', 'Uy')
+        approved = self.pending('Hal', 'Go', is_approved=True)
+
+        outcomes = deny_profiles([pending.pk, approved.pk], 'Duplicate account')
+
+        self.assertEqual([o['status'] for o in outcomes], ['denied', 'skipped'])
+        self.assertFalse(User.objects.filter(pk=pending.user_id).exists())
+        self.assertTrue(User.objects.filter(pk=approved.user_id).exists())
+        email = OutgoingEmail.objects.get()
+        self.assertEqual((email.kind, email.recipients), ('denial', [outcomes[0]['email']]))
+        self.assertIn('Duplicate account', email.text_body)
+
+    def test_view_returns_per_row_outcomes(self):
+        admin = User.objects.create_user(email='admin@example.com', password='pw', role='admin')
+        UserProfile.objects.filter(user=admin).update(is_approved=True)
+        self.client.force_login(admin)
+        profile = self.pending('Ivy', 'Sy')
+        url = reverse('accounts:bulk_pending_action')
+
+        response = self.client.post(
+            url, {'action': 'deny', 'profile_ids': [profile.pk]}, HTTP_X_REQUESTED_WITH='XMLHttpRequest'
+        )
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.post(
+            url, {'action': 'approve', 'profile_ids': [profile.pk]}, HTTP_X_REQUESTED_WITH='XMLHttpRequest'
+        )
+        data = response.json()
+        self.assertEqual((data['processed'], data['skipped']), (1, 0))
+        self.assertEqual(data['results'][0]['id'], profile.pk)
+        self.assertEqual(data['results'][0]['status'], 'approved')
+
+
+class MemoryLimiterTests(TestCase):
+    def setUp(self):
+        # The page cache answers before the limiter runs
+        cache.clear()
+
+    def sampler_at(self, rss_mb):
+        sampler = MemorySampler()
+        sampler.rss_mb = rss_mb
+        # Each test client builds its own middleware, which starts the sampler
+        sampler.start = lambda: None
+        return mock.patch('accounts.middleware.memory_sampler', sampler)
+
+    def test_sample_records_the_series(self):
+        sampler = MemorySampler(history=2)
+        for _ in range(3):
+            sampler.sample()
+        self.assertEqual(len(sampler.samples), 2)
+        self.assertGreater(sampler.rss_mb, 0)
+        self.assertGreaterEqual(sampler.peak_mb, sampler.rss_mb)
+        snapshot = sampler.snapshot()
+        self.assertEqual(snapshot['samples'], list(sampler.samples))
+        self.assertIn('frozen', snapshot['gc'])
+
+    def test_levels(self):
+        sampler = MemorySampler()
+        self.assertEqual(sampler.level(), OK)  # no sample yet
+        for rss_mb, level in ((200, OK), (460, WARNING), (490, CRITICAL)):
+            sampler.rss_mb = rss_mb
+            self.assertEqual(sampler.level(), level)
+
+    def test_warning_level_still_admits(self):
+        with self.sampler_at(460):
+            self.assertEqual(self.client.get(reverse('research:terms')).status_code, 200)
+
+    def test_critical_memory_turns_requests_away(self):
+        with self.sampler_at(490):
+            response = self.client.get(reverse('research:terms'))
+            self.assertEqual(response.status_code, 503)
+            self.assertEqual(response['Retry-After'], '3')
+            self.assertEqual(self.client.get('/healthcheck/').status_code, 200)
+
+    def test_admin_memory_endpoint(self):
+        admin = User.objects.create_user(email='admin@example.com', password='pw', role='admin')
+        UserProfile.objects.filter(user=admin).update(is_approved=True)
+        self.client.force_login(admin)
+        data = self.client.get(reverse('accounts:memory_stats')).json()
+        self.assertEqual(data['critical_mb'], 480)
+        self.assertIn('samples', data)
+
+
+class ServePDFTests(TestCase):
+    PATH = 'research_papers/study.pdf'
+    DATA = bytes(range(100))
+
+    def setUp(self):
+        cache.clear()
+        fd, self.file_path = tempfile.mkstemp(suffix='.pdf')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(self.DATA)
+        self.addCleanup(os.remove, self.file_path)
+
+        def open_stream(storage, name, byte_range=None, sha256=None):
+            return storage._open_file_stream(self.file_path, byte_range)
+
+        patcher = mock.patch.object(SupabaseStorage, 'open_stream', autospec=True, side_effect=open_stream)
+        self.open_stream = patcher.start()
+        self.addCleanup(patcher.stop)
+
+        user = User.objects.create_user(email='reader@example.com', password='pw')
+        UserProfile.objects.filter(user=user).update(is_approved=True)
+        self.client.force_login(user)
+
+    def get(self, **headers):
+        return self.client.get(reverse('serve_pdf', args=[self.PATH]), headers=headers)
+
+    def test_parse_range_header(self):
+        cases = {
+            'bytes=0-9': (0, 9),
+            'bytes=90-': (90, None),
+            'bytes=-10': (None, 10),
+            'bytes=0-1,5-6': None,
+            'bytes=9-0': None,
+            'bytes=-': None,
+            'items=0-9': None,
+            None: None,
+        }
+        for header, parsed in cases.items():
+            self.assertEqual(parse_range_header(header), parsed, header)
+
+    def test_ranges(self):
+        cases = [
+            ('bytes=10-19', 'bytes 10-19/100', self.DATA[10:20]),
+            ('bytes=-10', 'bytes 90-99/100', self.DATA[90:]),
+            ('bytes=95-', 'bytes 95-99/100', self.DATA[95:]),
+            ('bytes=95-500', 'bytes 95-99/100', self.DATA[95:]),
+        ]
+        for header, content_range, body in cases:
+            response = self.get(range=header)
+            self.assertEqual(response.status_code, 206, header)
+            self.assertEqual(response['Content-Range'], content_range)
+            self.assertEqual(response['Content-Length'], str(len(body)))
+            self.assertEqual(b''.join(response.streaming_content), body)
+
+    def test_multiple_ranges_get_the_whole_file(self):
+        response = self.get(range='bytes=0-1,5-6')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), self.DATA)
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+
+    def test_unsatisfiable_range(self):
+        response = self.get(range='bytes=100-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], 'bytes */100')
+
+    def test_etag_and_not_modified(self):
+        StoredFile.objects.create(name=self.PATH, size=len(self.DATA), sha256='abc123')
+        response = self.get()
+        self.assertEqual(response['ETag'], '"abc123"')
+        self.assertEqual(response['Cache-Control'], 'private, no-cache')
+
+        response = self.get(if_none_match='"abc123"')
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(self.open_stream.call_count, 1)
+
+    def test_if_range_only_honoured_while_current(self):
+        StoredFile.objects.create(name=self.PATH, size=len(self.DATA), sha256='abc123')
+        self.assertEqual(self.get(range='bytes=0-9', if_range='"abc123"').status_code, 206)
+        self.assertEqual(self.get(range='bytes=0-9', if_range='"old"').status_code, 200)
+
+    def test_unknown_length_is_not_announced(self):
+        self.open_stream.side_effect = lambda storage, name, byte_range=None, sha256=None: FileStream(
+            iter([self.DATA]), None, 0, None, partial=False,
+        )
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header('Content-Length'))
+        self.assertFalse(response.has_header('Accept-Ranges'))
+        self.assertEqual(b''.join(response.streaming_content), self.DATA)
@@ -26,6 +26,7 @@ urlpatterns = [
     path("admin/approve/<int:id>/", views.ApproveUserView.as_view(), name="approve_user"),
     path('admin/approve-edit/<int:id>/', views.ApproveUserEditView.as_view(), name='approve_user_edit'),
     path("admin/deny/<int:id>/", views.DenyUserView.as_view(), name="deny_user"),
+    path("admin/bulk/", views.BulkPendingActionView.as_view(), name="bulk_pending_action"),
     
     # Teacher - Parental Consent Approvals
     path("teacher/consent-approvals/", views.ConsentApprovalsView.as_view(), name="consent_approvals"),
@@ -42,6 +43,9 @@ urlpatterns = [
     path('admin/users/toggle-active/<int:id>/', views.ToggleUserActiveView.as_view(), name='toggle_user_active'),
     path('get-user-modal/<int:id>/', views.GetUserModalView.as_view(), name='get_user_modal'),
     
+    # Worker monitoring
+    path("admin/memory/", views.MemoryStatsView.as_view(), name="memory_stats"),
+
     # Password reset
     path("forgot-password/", views.ForgotPasswordView.as_view(), name="forgot_password"),
     path("verify-password-reset/", views.VerifyPasswordResetView.as_view(), name="verify_password_reset"),
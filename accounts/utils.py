@@ -1,25 +1,22 @@
-from django.conf import settings
 import logging
-import sib_api_v3_sdk
-from sib_api_v3_sdk.rest import ApiException
+import re
+
+from .emails import SITE_URL, render_email
+from .outbox import queue_email
 
 logger = logging.getLogger(__name__)
 
-# Base URL for the website
-SITE_URL = "https://btcsirepository.onrender.com"
+EMAIL_PATTERN = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+
 
-def send_email_async(subject, message, html_message, recipient_list):
-    """Send email using Brevo API"""
+def send_email_async(subject, message, html_message, recipient_list, kind='other'):
+    """Queue an email in the outbox (see accounts/outbox.py); True once it's queued."""
     try:
-        # Validate emails
-        import re
-        email_pattern = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
-        
         valid_emails = []
         for email in recipient_list:
             if email and isinstance(email, str):
                 email = email.strip()
-                if email_pattern.match(email):
+                if EMAIL_PATTERN.match(email):
                     valid_emails.append(email)
                 else:
                     logger.warning(f"⚠️ Invalid email skipped: {email}")
@@ -28,30 +25,9 @@ def send_email_async(subject, message, html_message, recipient_list):
             logger.error("❌ No valid emails in recipient list")
             return False
         
-        # Configure Brevo API
-        configuration = sib_api_v3_sdk.Configuration()
-        configuration.api_key['api-key'] = settings.BREVO_API_KEY
-        
-        api_instance = sib_api_v3_sdk.TransactionalEmailsApi(sib_api_v3_sdk.ApiClient(configuration))
-        
-        # Prepare email
-        send_smtp_email = sib_api_v3_sdk.SendSmtpEmail(
-            to=[{"email": email} for email in valid_emails],
-            sender={"email": settings.DEFAULT_FROM_EMAIL, "name": "BTCSI Research"},
-            subject=subject,
-            html_content=html_message,
-            text_content=message
-        )
-        
-        # Send email
-        api_response = api_instance.send_transac_email(send_smtp_email)
-        logger.info(f"✅ Email sent successfully to {valid_emails}")
-        logger.info(f"Message ID: {api_response.message_id}")
+        queue_email(subject, message, html_message, valid_emails, kind=kind)
         return True
         
-    except ApiException as e:
-        logger.error(f"❌ Brevo API error: {e}")
-        return False
     except Exception as e:
         logger.error(f"❌ Email error: {e}")
         import traceback
@@ -62,279 +38,19 @@ def send_email_async(subject, message, html_message, recipient_list):
 def send_verification_email(user_email, verification_code, user_name=""):
     """Send verification code email with improved design"""
     subject = 'Email Verification - BTCSI Research'
-    
-    message = f"""
-Hello{' ' + user_name if user_name else ''},
-
-Your verification code is: {verification_code}
-
-This code will expire in 15 minutes.
-
-If you didn't request this code, please ignore this email.
-
-Best regards,
-BTCSI Research Team
-    """
-    
-    html_message = f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <meta charset="UTF-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <link href="https://fonts.googleapis.com/css2?family=Montserrat:wght@300;400;600;700&display=swap" rel="stylesheet">
-    </head>
-    <body style="margin: 0; padding: 0; font-family: 'Montserrat', Arial, sans-serif; background-color: #f5f5f5;">
-        <table width="100%" cellpadding="0" cellspacing="0" border="0" style="background-color: #f5f5f5; padding: 40px 20px;">
-            <tr>
-                <td align="center">
-                    <table width="650" cellpadding="0" cellspacing="0" border="0" style="background: white; border-radius: 20px; overflow: hidden; box-shadow: 0 4px 15px rgba(0, 0, 0, 0.1);">
-                        
-                        <!-- Header -->
-                        <tr>
-                            <td style="background: #015726; padding: 35px 40px; text-align: center; border-radius: 20px 20px 0 0;">
-                                <img src="{SITE_URL}/static/accounts/img/logo.png" alt="BTCSI Logo" style="width: 80px; height: 80px; margin-bottom: 15px; display: block; margin-left: auto; margin-right: auto;">
-                                <h1 style="color: white; margin: 0 0 8px 0; font-size: 32px; font-weight: 700; font-family: 'Montserrat', Arial, sans-serif;">
-                                    Email Verification
-                                </h1>
-                                <p style="color: rgba(255, 255, 255, 0.9); margin: 0; font-size: 16px; font-family: 'Montserrat', Arial, sans-serif;">
-                                    BTCSI Research Repository
-                                </p>
-                            </td>
-                        </tr>
-                        
-                        <!-- Content -->
-                        <tr>
-                            <td style="padding: 40px;">
-                                <p style="color: #333; font-size: 16px; margin: 0 0 15px 0; font-family: 'Montserrat', Arial, sans-serif;">
-                                    Hello{' <strong>' + user_name + '</strong>' if user_name else ''},
-                                </p>
-                                
-                                <p style="color: #666; font-size: 15px; line-height: 1.6; margin: 0 0 25px 0; font-family: 'Montserrat', Arial, sans-serif;">
-                                    Please use the verification code below to complete your registration or to login:
-                                </p>
-                                
-                                <!-- Verification Code -->
-                                <table width="100%" cellpadding="0" cellspacing="0" border="0" style="margin: 25px 0;">
-                                    <tr>
-                                        <td style="background: #f8f9fa; border: 3px solid #015726; border-radius: 12px; padding: 25px; text-align: center;">
-                                            <p style="color: #666; font-size: 12px; font-weight: 600; text-transform: uppercase; letter-spacing: 1px; margin: 0 0 12px 0; font-family: 'Montserrat', Arial, sans-serif;">
-                                                Your Verification Code
-                                            </p>
-                                            <p style="font-size: 40px; font-weight: 700; letter-spacing: 10px; color: #015726; margin: 0; font-family: 'Courier New', monospace;">
-                                                {verification_code}
-                                            </p>
-                                        </td>
-                                    </tr>
-                                </table>
-                                
-                                <!-- Warning -->
-                                <table width="100%" cellpadding="0" cellspacing="0" border="0" style="margin: 20px 0;">
-                                    <tr>
-                                        <td style="background: #fff9e6; border-left: 4px solid #ffc107; border-radius: 8px; padding: 15px;">
-                                            <p style="margin: 0; color: #856404; font-size: 14px; font-family: 'Montserrat', Arial, sans-serif;">
-                                                <strong>⏰ Important:</strong> This code will expire in <strong>15 minutes</strong>. Please complete your verification promptly.
-                                            </p>
-                                        </td>
-                                    </tr>
-                                </table>
-                                
-                                <!-- Security Tips -->
-                                <table width="100%" cellpadding="0" cellspacing="0" border="0" style="margin: 20px 0;">
-                                    <tr>
-                                        <td style="background: #f8f9fa; border-radius: 8px; padding: 18px;">
-                                            <p style="margin: 0 0 10px 0; color: #333; font-size: 14px; font-weight: 600; font-family: 'Montserrat', Arial, sans-serif;">
-                                                🔒 Security Tips:
-                                            </p>
-                                            <table width="100%" cellpadding="0" cellspacing="0" border="0">
-                                                <tr>
-                                                    <td style="padding: 3px 0;">
-                                                        <p style="margin: 0; color: #666; font-size: 13px; font-family: 'Montserrat', Arial, sans-serif;">• Never share this code with anyone</p>
-                                                    </td>
-                                                </tr>
-                                                <tr>
-                                                    <td style="padding: 3px 0;">
-                                                        <p style="margin: 0; color: #666; font-size: 13px; font-family: 'Montserrat', Arial, sans-serif;">• BTCSI will never ask for your verification code</p>
-                                                    </td>
-                                                </tr>
-                                                <tr>
-                                                    <td style="padding: 3px 0;">
-                                                        <p style="margin: 0; color: #666; font-size: 13px; font-family: 'Montserrat', Arial, sans-serif;">• If you didn't request this, please ignore this email</p>
-                                                    </td>
-                                                </tr>
-                                            </table>
-                                        </td>
-                                    </tr>
-                                </table>
-                            </td>
-                        </tr>
-                        
-                        <!-- Footer -->
-                        <tr>
-                            <td style="background: #015726; padding: 25px 40px; text-align: center; border-radius: 0 0 20px 20px;">
-                                <p style="color: white; font-size: 14px; margin: 0 0 8px 0; font-family: 'Montserrat', Arial, sans-serif;">
-                                    Best regards,<br>
-                                    <strong>BTCSI Research Team</strong>
-                                </p>
-                                <p style="color: rgba(255, 255, 255, 0.8); font-size: 12px; margin: 0 0 8px 0; font-family: 'Montserrat', Arial, sans-serif;">
-                                    Trinity Christian School<br>
-                                    Villa Angela Subd., Phase 3, Bacolod City<br>
-                                    © 2024-2025 All rights reserved
-                                </p>
-                                <p style="color: rgba(255, 255, 255, 0.7); font-size: 11px; margin: 8px 0 0 0; font-style: italic; font-family: 'Montserrat', Arial, sans-serif;">
-                                    This is a system-generated email. Please do not reply.
-                                </p>
-                            </td>
-                        </tr>
-                    </table>
-                </td>
-            </tr>
-        </table>
-    </body>
-    </html>
-    """
-    
-    return send_email_async(subject, message, html_message, [user_email])
+    message, html_message = render_email(
+        'verification', user_name=user_name, verification_code=verification_code,
+    )
+    return send_email_async(subject, message, html_message, [user_email], kind='verification')
 
 
 def send_password_reset_email(user_email, verification_code, user_name=""):
     """Send password reset verification code email with improved design"""
     subject = 'Password Reset Verification - BTCSI Research'
-    
-    message = f"""
-Hello{' ' + user_name if user_name else ''},
-
-You requested to reset your password. Your verification code is: {verification_code}
-
-This code will expire in 15 minutes.
-
-If you didn't request a password reset, please ignore this email and your password will remain unchanged.
-
-For security reasons, you can only reset your password once every 24 hours.
-
-Best regards,
-BTCSI Research Team
-    """
-    
-    html_message = f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <meta charset="UTF-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <link href="https://fonts.googleapis.com/css2?family=Montserrat:wght@300;400;600;700&display=swap" rel="stylesheet">
-    </head>
-    <body style="margin: 0; padding: 0; font-family: 'Montserrat', Arial, sans-serif; background-color: #f5f5f5;">
-        <table width="100%" cellpadding="0" cellspacing="0" border="0" style="background-color: #f5f5f5; padding: 40px 20px;">
-            <tr>
-                <td align="center">
-                    <table width="650" cellpadding="0" cellspacing="0" border="0" style="background: white; border-radius: 20px; overflow: hidden; box-shadow: 0 4px 15px rgba(0, 0, 0, 0.1);">
-                        
-                        <!-- Header -->
-                        <tr>
-                            <td style="background: #dc3545; padding: 35px 40px; text-align: center; border-radius: 20px 20px 0 0;">
-                                <img src="{SITE_URL}/static/accounts/img/logo.png" alt="BTCSI Logo" style="width: 80px; height: 80px; margin-bottom: 15px; display: block; margin-left: auto; margin-right: auto;">
-                                <h1 style="color: white; margin: 0 0 8px 0; font-size: 32px; font-weight: 700; font-family: 'Montserrat', Arial, sans-serif;">
-                                    Password Reset
-                                </h1>
-                                <p style="color: rgba(255, 255, 255, 0.9); margin: 0; font-size: 16px; font-family: 'Montserrat', Arial, sans-serif;">
-                                    BTCSI Research Repository
-                                </p>
-                            </td>
-                        </tr>
-                        
-                        <!-- Content -->
-                        <tr>
-                            <td style="padding: 40px;">
-                                <p style="color: #333; font-size: 16px; margin: 0 0 15px 0; font-family: 'Montserrat', Arial, sans-serif;">
-                                    Hello{' <strong>' + user_name + '</strong>' if user_name else ''},
-                                </p>
-                                
-                                <p style="color: #666; font-size: 15px; line-height: 1.6; margin: 0 0 25px 0; font-family: 'Montserrat', Arial, sans-serif;">
-                                    We received a request to reset your password. Please use the verification code below to proceed:
-                                </p>
-                                
-                                <!-- Verification Code -->
-                                <table width="100%" cellpadding="0" cellspacing="0" border="0" style="margin: 25px 0;">
-                                    <tr>
-                                        <td style="background: #f8f9fa; border: 3px solid #dc3545; border-radius: 12px; padding: 25px; text-align: center;">
-                                            <p style="color: #666; font-size: 12px; font-weight: 600; text-transform: uppercase; letter-spacing: 1px; margin: 0 0 12px 0; font-family: 'Montserrat', Arial, sans-serif;">
-                                                Your Verification Code
-                                            </p>
-                                            <p style="font-size: 40px; font-weight: 700; letter-spacing: 10px; color: #dc3545; margin: 0; font-family: 'Courier New', monospace;">
-                                                {verification_code}
-                                            </p>
-                                        </td>
-                                    </tr>
-                                </table>
-                                
-                                <!-- Warning -->
-                                <table width="100%" cellpadding="0" cellspacing="0" border="0" style="margin: 20px 0;">
-                                    <tr>
-                                        <td style="background: #fff9e6; border-left: 4px solid #ffc107; border-radius: 8px; padding: 15px;">
-                                            <p style="margin: 0; color: #856404; font-size: 14px; font-family: 'Montserrat', Arial, sans-serif;">
-                                                <strong>⏰ Time Sensitive:</strong> This code will expire in <strong>15 minutes</strong>. Complete your password reset soon.
-                                            </p>
-                                        </td>
-                                    </tr>
-                                </table>
-                                
-                                <!-- Security Notice -->
-                                <table width="100%" cellpadding="0" cellspacing="0" border="0" style="margin: 20px 0;">
-                                    <tr>
-                                        <td style="background: #ffe6e6; border-left: 4px solid #dc3545; border-radius: 8px; padding: 15px;">
-                                            <p style="margin: 0 0 10px 0; color: #721c24; font-size: 14px; font-weight: 600; font-family: 'Montserrat', Arial, sans-serif;">
-                                                🔒 Security Notice
-                                            </p>
-                                            <table width="100%" cellpadding="0" cellspacing="0" border="0">
-                                                <tr>
-                                                    <td style="padding: 3px 0;">
-                                                        <p style="margin: 0; color: #721c24; font-size: 13px; font-family: 'Montserrat', Arial, sans-serif;">• <strong>Didn't request this?</strong> Ignore this email - your password remains secure</p>
-                                                    </td>
-                                                </tr>
-                                                <tr>
-                                                    <td style="padding: 3px 0;">
-                                                        <p style="margin: 0; color: #721c24; font-size: 13px; font-family: 'Montserrat', Arial, sans-serif;">• <strong>Rate limit:</strong> You can only reset your password once every 24 hours</p>
-                                                    </td>
-                                                </tr>
-                                                <tr>
-                                                    <td style="padding: 3px 0;">
-                                                        <p style="margin: 0; color: #721c24; font-size: 13px; font-family: 'Montserrat', Arial, sans-serif;">• <strong>Never share:</strong> Keep this code confidential at all times</p>
-                                                    </td>
-                                                </tr>
-                                            </table>
-                                        </td>
-                                    </tr>
-                                </table>
-                            </td>
-                        </tr>
-                        
-                        <!-- Footer -->
-                        <tr>
-                            <td style="background: #dc3545; padding: 25px 40px; text-align: center; border-radius: 0 0 20px 20px;">
-                                <p style="color: white; font-size: 14px; margin: 0 0 8px 0; font-family: 'Montserrat', Arial, sans-serif;">
-                                    Best regards,<br>
-                                    <strong>BTCSI Research Team</strong>
-                                </p>
-                                <p style="color: rgba(255, 255, 255, 0.8); font-size: 12px; margin: 0 0 8px 0; font-family: 'Montserrat', Arial, sans-serif;">
-                                    Trinity Christian School<br>
-                                    Villa Angela Subd., Phase 3, Bacolod City<br>
-                                    © 2024-2025 All rights reserved
-                                </p>
-                                <p style="color: rgba(255, 255, 255, 0.7); font-size: 11px; margin: 8px 0 0 0; font-style: italic; font-family: 'Montserrat', Arial, sans-serif;">
-                                    This is a system-generated email. Please do not reply.
-                                </p>
-                            </td>
-                        </tr>
-                    </table>
-                </td>
-            </tr>
-        </table>
-    </body>
-    </html>
-    """
-    
-    return send_email_async(subject, message, html_message, [user_email])
+    message, html_message = render_email(
+        'password_reset', user_name=user_name, verification_code=verification_code,
+    )
+    return send_email_async(subject, message, html_message, [user_email], kind='password_reset')
 
 
 def send_approval_email(user_email, user_name="", role=""):
@@ -349,324 +65,18 @@ def send_approval_email(user_email, user_name="", role=""):
         'admin': 'Administrator'
     }.get(role, role)
     
-    login_url = f"{SITE_URL}/accounts/login/"
-    
-    message = f"""
-Hello{' ' + user_name if user_name else ''},
-
-Great news! Your account has been approved by an administrator.
-
-Role: {role_display}
-
-You can now log in and access the BTCSI Research Repository system.
-
-Visit: {login_url}
-
-Best regards,
-BTCSI Research Team
-    """
-    
-    html_message = f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <meta charset="UTF-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <link href="https://fonts.googleapis.com/css2?family=Montserrat:wght@300;400;600;700&display=swap" rel="stylesheet">
-    </head>
-    <body style="margin: 0; padding: 0; font-family: 'Montserrat', Arial, sans-serif; background-color: #f5f5f5;">
-        <table width="100%" cellpadding="0" cellspacing="0" border="0" style="background-color: #f5f5f5; padding: 40px 20px;">
-            <tr>
-                <td align="center">
-                    <table width="650" cellpadding="0" cellspacing="0" border="0" style="background: white; border-radius: 20px; overflow: hidden; box-shadow: 0 4px 15px rgba(0, 0, 0, 0.1);">
-                        
-                        <!-- Header -->
-                        <tr>
-                            <td style="background: #28a745; padding: 35px 40px; text-align: center; border-radius: 20px 20px 0 0;">
-                                <img src="{SITE_URL}/static/accounts/img/logo.png" alt="BTCSI Logo" style="width: 80px; height: 80px; margin-bottom: 15px; display: block; margin-left: auto; margin-right: auto;">
-                                <h1 style="color: white; margin: 0 0 8px 0; font-size: 32px; font-weight: 700; font-family: 'Montserrat', Arial, sans-serif;">
-                                    Account Approved!
-                                </h1>
-                                <p style="color: rgba(255, 255, 255, 0.9); margin: 0; font-size: 16px; font-family: 'Montserrat', Arial, sans-serif;">
-                                    BTCSI Research Repository
-                                </p>
-                            </td>
-                        </tr>
-                        
-                        <!-- Content -->
-                        <tr>
-                            <td style="padding: 40px;">
-                                <p style="color: #333; font-size: 16px; margin: 0 0 15px 0; font-family: 'Montserrat', Arial, sans-serif;">
-                                    Hello{' <strong>' + user_name + '</strong>' if user_name else ''},
-                                </p>
-                                
-                                <p style="color: #666; font-size: 15px; line-height: 1.6; margin: 0 0 25px 0; font-family: 'Montserrat', Arial, sans-serif;">
-                                    Great news! Your account has been <strong style="color: #28a745;">approved</strong> by an administrator. You now have full access to the BTCSI Research Repository system.
-                                </p>
-                                
-                                <!-- Account Details -->
-                                <table width="100%" cellpadding="0" cellspacing="0" border="0" style="margin: 25px 0;">
-                                    <tr>
-                                        <td style="background: #f8f9fa; border-left: 4px solid #28a745; border-radius: 8px; padding: 20px;">
-                                            <p style="margin: 0 0 12px 0; color: #333; font-size: 14px; font-weight: 600; font-family: 'Montserrat', Arial, sans-serif;">
-                                                📋 Your Account Details
-                                            </p>
-                                            <table width="100%" cellpadding="0" cellspacing="0" border="0">
-                                                <tr>
-                                                    <td style="padding: 5px 0;">
-                                                        <p style="margin: 0; color: #666; font-size: 14px; font-family: 'Montserrat', Arial, sans-serif;">
-                                                            <strong>Email:</strong> {user_email}
-                                                        </p>
-                                                    </td>
-                                                </tr>
-                                                <tr>
-                                                    <td style="padding: 5px 0;">
-                                                        <p style="margin: 0; color: #666; font-size: 14px; font-family: 'Montserrat', Arial, sans-serif;">
-                                                            <strong>Role:</strong> {role_display}
-                                                        </p>
-                                                    </td>
-                                                </tr>
-                                                <tr>
-                                                    <td style="padding: 5px 0;">
-                                                        <p style="margin: 0; color: #666; font-size: 14px; font-family: 'Montserrat', Arial, sans-serif;">
-                                                            <strong>Status:</strong> <span style="color: #28a745; font-weight: 600;">Active</span>
-                                                        </p>
-                                                    </td>
-                                                </tr>
-                                            </table>
-                                        </td>
-                                    </tr>
-                                </table>
-                                
-                                <!-- Login Button -->
-                                <table width="100%" cellpadding="0" cellspacing="0" border="0" style="margin: 30px 0;">
-                                    <tr>
-                                        <td align="center">
-                                            <a href="{login_url}" style="display: inline-block; background: #28a745; color: white; padding: 15px 40px; text-decoration: none; border-radius: 8px; font-weight: 600; font-size: 16px; font-family: 'Montserrat', Arial, sans-serif; box-shadow: 0 2px 10px rgba(40, 167, 69, 0.3);">
-                                                Login to Your Account
-                                            </a>
-                                        </td>
-                                    </tr>
-                                </table>
-                                
-                                <!-- Next Steps -->
-                                <table width="100%" cellpadding="0" cellspacing="0" border="0" style="margin: 25px 0;">
-                                    <tr>
-                                        <td style="background: #e7f5ec; border-radius: 8px; padding: 20px;">
-                                            <p style="margin: 0 0 12px 0; color: #155724; font-size: 14px; font-weight: 600; font-family: 'Montserrat', Arial, sans-serif;">
-                                                🎯 What's Next?
-                                            </p>
-                                            <table width="100%" cellpadding="0" cellspacing="0" border="0">
-                                                <tr>
-                                                    <td style="padding: 3px 0;">
-                                                        <p style="margin: 0; color: #155724; font-size: 13px; font-family: 'Montserrat', Arial, sans-serif;">• Log in using your email and password</p>
-                                                    </td>
-                                                </tr>
-                                                <tr>
-                                                    <td style="padding: 3px 0;">
-                                                        <p style="margin: 0; color: #155724; font-size: 13px; font-family: 'Montserrat', Arial, sans-serif;">• Explore the research repository and available resources</p>
-                                                    </td>
-                                                </tr>
-                                                <tr>
-                                                    <td style="padding: 3px 0;">
-                                                        <p style="margin: 0; color: #155724; font-size: 13px; font-family: 'Montserrat', Arial, sans-serif;">• Update your profile settings as needed</p>
-                                                    </td>
-                                                </tr>
-                                                <tr>
-                                                    <td style="padding: 3px 0;">
-                                                        <p style="margin: 0; color: #155724; font-size: 13px; font-family: 'Montserrat', Arial, sans-serif;">• Contact support if you need any assistance</p>
-                                                    </td>
-                                                </tr>
-                                            </table>
-                                        </td>
-                                    </tr>
-                                </table>
-                                
-                                <p style="color: #999; font-size: 13px; margin: 20px 0 0 0; font-style: italic; font-family: 'Montserrat', Arial, sans-serif; text-align: center;">
-                                    If the button doesn't work, copy and paste this URL into your browser:<br>
-                                    <a href="{login_url}" style="color: #28a745; text-decoration: none;">{login_url}</a>
-                                </p>
-                            </td>
-                        </tr>
-                        
-                        <!-- Footer -->
-                        <tr>
-                            <td style="background: #28a745; padding: 25px 40px; text-align: center; border-radius: 0 0 20px 20px;">
-                                <p style="color: white; font-size: 14px; margin: 0 0 8px 0; font-family: 'Montserrat', Arial, sans-serif;">
-                                    Best regards,<br>
-                                    <strong>BTCSI Research Team</strong>
-                                </p>
-                                <p style="color: rgba(255, 255, 255, 0.8); font-size: 12px; margin: 0 0 8px 0; font-family: 'Montserrat', Arial, sans-serif;">
-                                    Trinity Christian School<br>
-                                    Villa Angela Subd., Phase 3, Bacolod City<br>
-                                    © 2024-2025 All rights reserved
-                                </p>
-                                <p style="color: rgba(255, 255, 255, 0.7); font-size: 11px; margin: 8px 0 0 0; font-style: italic; font-family: 'Montserrat', Arial, sans-serif;">
-                                    This is a system-generated email. Please do not reply.
-                                </p>
-                            </td>
-                        </tr>
-                    </table>
-                </td>
-            </tr>
-        </table>
-    </body>
-    </html>
-    """
-    
-    return send_email_async(subject, message, html_message, [user_email])
+    message, html_message = render_email(
+        'approval',
+        user_name=user_name,
+        user_email=user_email,
+        role_display=role_display,
+        login_url=f"{SITE_URL}/accounts/login/",
+    )
+    return send_email_async(subject, message, html_message, [user_email], kind='approval')
 
 
 def send_denial_email(user_email, user_name="", reason=""):
     """Send account denial notification email"""
     subject = 'Account Registration Update - BTCSI Research'
-    
-    message = f"""
-Hello{' ' + user_name if user_name else ''},
-
-We regret to inform you that your account registration for the BTCSI Research Repository has not been approved at this time.
-
-{f'Reason: {reason}' if reason else 'If you believe this was a mistake or have questions, please contact the administrator.'}
-
-If you would like to reapply or need more information, please contact us at the BTCSI Research office.
-
-Thank you for your interest in the BTCSI Research Repository.
-
-Best regards,
-BTCSI Research Team
-    """
-    
-    html_message = f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <meta charset="UTF-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <link href="https://fonts.googleapis.com/css2?family=Montserrat:wght@300;400;600;700&display=swap" rel="stylesheet">
-    </head>
-    <body style="margin: 0; padding: 0; font-family: 'Montserrat', Arial, sans-serif; background-color: #f5f5f5;">
-        <table width="100%" cellpadding="0" cellspacing="0" border="0" style="background-color: #f5f5f5; padding: 40px 20px;">
-            <tr>
-                <td align="center">
-                    <table width="650" cellpadding="0" cellspacing="0" border="0" style="background: white; border-radius: 20px; overflow: hidden; box-shadow: 0 4px 15px rgba(0, 0, 0, 0.1);">
-                        
-                        <!-- Header -->
-                        <tr>
-                            <td style="background: #6c757d; padding: 35px 40px; text-align: center; border-radius: 20px 20px 0 0;">
-                                <img src="{SITE_URL}/static/accounts/img/logo.png" alt="BTCSI Logo" style="width: 80px; height: 80px; margin-bottom: 15px; display: block; margin-left: auto; margin-right: auto;">
-                                <h1 style="color: white; margin: 0 0 8px 0; font-size: 32px; font-weight: 700; font-family: 'Montserrat', Arial, sans-serif;">
-                                    Registration Update
-                                </h1>
-                                <p style="color: rgba(255, 255, 255, 0.9); margin: 0; font-size: 16px; font-family: 'Montserrat', Arial, sans-serif;">
-                                    BTCSI Research Repository
-                                </p>
-                            </td>
-                        </tr>
-                        
-                        <!-- Content -->
-                        <tr>
-                            <td style="padding: 40px;">
-                                <p style="color: #333; font-size: 16px; margin: 0 0 15px 0; font-family: 'Montserrat', Arial, sans-serif;">
-                                    Hello{' <strong>' + user_name + '</strong>' if user_name else ''},
-                                </p>
-                                
-                                <p style="color: #666; font-size: 15px; line-height: 1.6; margin: 0 0 25px 0; font-family: 'Montserrat', Arial, sans-serif;">
-                                    Thank you for your interest in the BTCSI Research Repository. After careful review, we regret to inform you that your account registration has not been approved at this time.
-                                </p>
-                                
-                                {f'''
-                                <!-- Reason -->
-                                <table width="100%" cellpadding="0" cellspacing="0" border="0" style="margin: 25px 0;">
-                                    <tr>
-                                        <td style="background: #fff3cd; border-left: 4px solid #ffc107; border-radius: 8px; padding: 20px;">
-                                            <p style="margin: 0 0 8px 0; color: #856404; font-size: 14px; font-weight: 600; font-family: 'Montserrat', Arial, sans-serif;">
-                                                📌 Reason
-                                            </p>
-                                            <p style="margin: 0; color: #856404; font-size: 14px; font-family: 'Montserrat', Arial, sans-serif;">
-                                                {reason}
-                                            </p>
-                                        </td>
-                                    </tr>
-                                </table>
-                                ''' if reason else ''}
-                                
-                                <!-- Information Box -->
-                                <table width="100%" cellpadding="0" cellspacing="0" border="0" style="margin: 25px 0;">
-                                    <tr>
-                                        <td style="background: #f8f9fa; border-radius: 8px; padding: 20px;">
-                                            <p style="margin: 0 0 12px 0; color: #333; font-size: 14px; font-weight: 600; font-family: 'Montserrat', Arial, sans-serif;">
-                                                ℹ️ What You Can Do
-                                            </p>
-                                            <table width="100%" cellpadding="0" cellspacing="0" border="0">
-                                                <tr>
-                                                    <td style="padding: 3px 0;">
-                                                        <p style="margin: 0; color: #666; font-size: 13px; font-family: 'Montserrat', Arial, sans-serif;">• If you believe this was a mistake, please contact the administrator</p>
-                                                    </td>
-                                                </tr>
-                                                <tr>
-                                                    <td style="padding: 3px 0;">
-                                                        <p style="margin: 0; color: #666; font-size: 13px; font-family: 'Montserrat', Arial, sans-serif;">• You may reapply in the future if your circumstances change</p>
-                                                    </td>
-                                                </tr>
-                                                <tr>
-                                                    <td style="padding: 3px 0;">
-                                                        <p style="margin: 0; color: #666; font-size: 13px; font-family: 'Montserrat', Arial, sans-serif;">• Visit the BTCSI Research office for more information</p>
-                                                    </td>
-                                                </tr>
-                                                <tr>
-                                                    <td style="padding: 3px 0;">
-                                                        <p style="margin: 0; color: #666; font-size: 13px; font-family: 'Montserrat', Arial, sans-serif;">• Contact your teacher or school administrator for guidance</p>
-                                                    </td>
-                                                </tr>
-                                            </table>
-                                        </td>
-                                    </tr>
-                                </table>
-                                
-                                <!-- Contact Info -->
-                                <table width="100%" cellpadding="0" cellspacing="0" border="0" style="margin: 25px 0;">
-                                    <tr>
-                                        <td style="background: #e9ecef; border-radius: 8px; padding: 20px; text-align: center;">
-                                            <p style="margin: 0 0 10px 0; color: #495057; font-size: 14px; font-weight: 600; font-family: 'Montserrat', Arial, sans-serif;">
-                                                📞 Need Help?
-                                            </p>
-                                            <p style="margin: 0; color: #6c757d; font-size: 13px; font-family: 'Montserrat', Arial, sans-serif;">
-                                                Please visit the BTCSI Research office or contact your school administrator<br>
-                                                for questions regarding this decision.
-                                            </p>
-                                        </td>
-                                    </tr>
-                                </table>
-                                
-                                <p style="color: #666; font-size: 14px; line-height: 1.6; margin: 25px 0 0 0; font-family: 'Montserrat', Arial, sans-serif;">
-                                    Thank you for your understanding and interest in the BTCSI Research Repository.
-                                </p>
-                            </td>
-                        </tr>
-                        
-                        <!-- Footer -->
-                        <tr>
-                            <td style="background: #6c757d; padding: 25px 40px; text-align: center; border-radius: 0 0 20px 20px;">
-                                <p style="color: white; font-size: 14px; margin: 0 0 8px 0; font-family: 'Montserrat', Arial, sans-serif;">
-                                    Best regards,<br>
-                                    <strong>BTCSI Research Team</strong>
-                                </p>
-                                <p style="color: rgba(255, 255, 255, 0.8); font-size: 12px; margin: 0 0 8px 0; font-family: 'Montserrat', Arial, sans-serif;">
-                                    Trinity Christian School<br>
-                                    Villa Angela Subd., Phase 3, Bacolod City<br>
-                                    © 2024-2025 All rights reserved
-                                </p>
-                                <p style="color: rgba(255, 255, 255, 0.7); font-size: 11px; margin: 8px 0 0 0; font-style: italic; font-family: 'Montserrat', Arial, sans-serif;">
-                                    This is a system-generated email. Please do not reply.
-                                </p>
-                            </td>
-                        </tr>
-                    </table>
-                </td>
-            </tr>
-        </table>
-    </body>
-    </html>
-    """
-    
-    return send_email_async(subject, message, html_message, [user_email])
\ No newline at end of file
+    message, html_message = render_email('denial', user_name=user_name, reason=reason)
+    return send_email_async(subject, message, html_message, [user_email], kind='denial')
@@ -8,9 +8,11 @@ from django.contrib import messages
 from django.urls import reverse_lazy
 from django.utils import timezone
 from django.core.files.storage import default_storage
-from django.http import JsonResponse, HttpResponse, Http404
+from django.http import JsonResponse, HttpResponse, Http404, StreamingHttpResponse, FileResponse
 from .models import User, UserProfile
-from research.models import Author
+from research.models import Author, StoredFile, author_prefetch
+from research.names import name_key
+from research.pagination import CursorPaginationMixin
 from .forms import RegistrationForm, LoginForm, EmailVerificationForm
 from .utils import send_approval_email, send_verification_email, send_password_reset_email
 from django.template.loader import render_to_string
@@ -18,45 +20,118 @@ from django.contrib.auth.hashers import make_password
 from datetime import timedelta
 from django.utils.timezone import now
 from django.http import HttpResponse
-from django.db.models import Count, Q, Exists, OuterRef, Subquery, Prefetch
-from storage import SupabaseStorage
+from django.db.models import Count, F, Q, Exists, OuterRef, Subquery, Prefetch
+from storage import SupabaseStorage, RangeNotSatisfiable
 import mimetypes
+import re
 from django.contrib.auth.decorators import login_required
+from django.views.decorators.http import condition
+
+RANGE_HEADER_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def parse_range_header(header):
+    """
+    Parse a single-range ``Range: bytes=...`` header into (start, end).
+    Returns None when absent or unsupported (e.g. multiple ranges), in
+    which case the whole file is served.
+    """
+    match = RANGE_HEADER_RE.match((header or '').strip())
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    start = int(first) if first else None
+    end = int(last) if last else None
+    if start is not None and end is not None and end < start:
+        return None
+    return start, end
+
+
+def can_view_file(request, path):
+    """Any authenticated user can view research papers; consent files only by their owner (or staff)."""
+    if path.startswith('research_papers/'):
+        return True
+    if path.startswith('parental_consents/'):
+        path_parts = path.split('/')
+        if len(path_parts) >= 2:
+            file_user_id = path_parts[1]
+            if str(request.user.id) != file_user_id and not request.user.is_staff:
+                return False
+        return True
+    return False
+
+
+def get_stored_file(request, path):
+    """StoredFile row behind ``path`` (looked up once per request), None if unknown."""
+    if not hasattr(request, '_stored_file'):
+        request._stored_file = (
+            StoredFile.objects.filter(name=path).first()
+            if can_view_file(request, path) else None
+        )
+    return request._stored_file
+
+
+def pdf_etag(request, path):
+    stored = get_stored_file(request, path)
+    return stored.etag if stored else None
+
+
+def pdf_last_modified(request, path):
+    stored = get_stored_file(request, path)
+    return stored.updated_at if stored else None
+
 
 @login_required
+@condition(etag_func=pdf_etag, last_modified_func=pdf_last_modified)
 def serve_pdf(request, path):
-    """Serve PDF files from Supabase storage with authentication"""
+    """Stream PDF files from Supabase storage with authentication and Range support"""
+    if not can_view_file(request, path):
+        raise Http404("File not found")
+
+    byte_range = parse_range_header(request.headers.get('Range'))
+
+    # If-Range: only honour the range while the client's copy is still current
+    if_range = request.headers.get('If-Range')
+    if byte_range and if_range:
+        stored = get_stored_file(request, path)
+        if stored is None or if_range != stored.etag:
+            byte_range = None
+
+    stored = get_stored_file(request, path)
     try:
         storage = SupabaseStorage()
-        
-        # Check if path is a research paper PDF
-        if path.startswith('research_papers/'):
-            # Any authenticated user can view research papers
-            file_content = storage.get_file_content(path)
-            
-        elif path.startswith('parental_consents/'):
-            # Only the user can view their own consent file (or staff)
-            path_parts = path.split('/')
-            if len(path_parts) >= 2:
-                file_user_id = path_parts[1]
-                if str(request.user.id) != file_user_id and not request.user.is_staff:
-                    raise Http404("You don't have permission to view this file")
-            
-            file_content = storage.get_file_content(path)
-        else:
-            raise Http404("File not found")
-        
-        # Determine content type
-        content_type, _ = mimetypes.guess_type(path)
-        if not content_type:
-            content_type = 'application/pdf'
-        
-        response = HttpResponse(file_content, content_type=content_type)
-        response['Content-Disposition'] = f'inline; filename="{path.split("/")[-1]}"'
+        stream = storage.open_stream(path, byte_range, sha256=stored.sha256 if stored else None)
+    except RangeNotSatisfiable as e:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{e.size}'
         return response
-        
     except Exception as e:
         raise Http404(f"File not found: {str(e)}")
+    
+    # Determine content type
+    content_type, _ = mimetypes.guess_type(path)
+    if not content_type:
+        content_type = 'application/pdf'
+    
+    if stream.file is not None:
+        # Whole local file (dev storage or the disk cache): lets the server use sendfile
+        response = FileResponse(stream.file, content_type=content_type)
+    else:
+        # Chunks go straight from storage to the client, so a large PDF never sits in memory
+        response = StreamingHttpResponse(
+            stream, status=206 if stream.partial else 200, content_type=content_type
+        )
+    if stream.length is not None:
+        response['Content-Length'] = str(stream.length)
+        response['Accept-Ranges'] = 'bytes'
+    if stream.partial:
+        response['Content-Range'] = f'bytes {stream.start}-{stream.end}/{stream.size}'
+    response['Content-Disposition'] = f'inline; filename="{path.split("/")[-1]}"'
+    # Let the browser keep its copy but revalidate (ETag / Last-Modified) each time
+    response['Cache-Control'] = 'private, no-cache'
+    return response
 
 
 class RoleRequiredMixin(UserPassesTestMixin):
@@ -381,7 +456,7 @@ class StudentDashboardView(LoginRequiredMixin, RoleRequiredMixin, TemplateView):
         profile = self.request.user.userprofile
         
         ctx.update({
-            "papers": profile.assigned_papers.prefetch_related('keywords', 'awards'),
+            "papers": profile.assigned_papers.prefetch_related(author_prefetch(), 'keywords', 'awards'),
             "authors": profile.author_profile.all()
         })
         return ctx
@@ -415,82 +490,27 @@ class PendingAccountsView(LoginRequiredMixin, RoleRequiredMixin, ListView):
         ).only(
             'id', 'user', 'pending_first_name', 'pending_last_name',
             'pending_middle_initial', 'pending_suffix',
-            'pending_G11', 'pending_G12', 'is_approved'
+            'pending_G11', 'pending_G12', 'is_approved', 'name_key'
         ).order_by('-id')
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        
-        # ✅ Collect all names from current page
-        profiles_data = []
-        all_names = []
-        
-        for profile in context['users']:
-            first = (profile.pending_first_name or "").strip()
-            last = (profile.pending_last_name or "").strip()
-            
-            if first and last:
-                all_names.append((
-                    first.lower(), 
-                    last.lower(),
-                    (profile.pending_middle_initial or "").lower(),
-                    (profile.pending_suffix or "").lower(),
-                    profile.id
-                ))
-        
-        # ✅ Fetch ALL matching authors in ONE query
-        if all_names:
-            match_filters = Q()
-            for first, last, middle, suffix, _ in all_names:
-                name_filter = Q(
-                    first_name__iexact=first,
-                    last_name__iexact=last
-                )
-                
-                if middle:
-                    name_filter &= Q(middle_initial__iexact=middle)
-                else:
-                    name_filter &= (Q(middle_initial__isnull=True) | Q(middle_initial=''))
-                
-                if suffix:
-                    name_filter &= Q(suffix__iexact=suffix)
-                else:
-                    name_filter &= (Q(suffix__isnull=True) | Q(suffix=''))
-                
-                match_filters |= name_filter
-            
-            # Single query for all matches
-            matching_authors = Author.objects.filter(match_filters).annotate(
+        profiles = list(context['users'])
+
+        # ✅ One indexed lookup for every name on the page
+        keys = {profile.name_key for profile in profiles if profile.name_key}
+        matches_by_key = {}
+        if keys:
+            matching_authors = Author.objects.filter(name_key__in=keys).select_related('user').annotate(
                 paper_count=Count('researchpaper')
-            ).only('id', 'first_name', 'last_name', 'middle_initial', 'suffix')
-            
-            # Group by name
-            matches_by_name = {}
+            ).only('id', 'first_name', 'last_name', 'middle_initial', 'suffix', 'name_key', 'user', 'user__email')
             for author in matching_authors:
-                key = (
-                    author.first_name.lower(),
-                    author.last_name.lower(),
-                    (author.middle_initial or "").lower(),
-                    (author.suffix or "").lower()
-                )
-                if key not in matches_by_name:
-                    matches_by_name[key] = []
-                matches_by_name[key].append(author)
-        else:
-            matches_by_name = {}
-        
-        # ✅ Attach matches to profiles
-        for profile in context['users']:
-            first = (profile.pending_first_name or "").strip()
-            last = (profile.pending_last_name or "").strip()
-            middle = (profile.pending_middle_initial or "").strip()
-            suffix = (profile.pending_suffix or "").strip()
-            
-            key = (first.lower(), last.lower(), middle.lower(), suffix.lower())
-            profile.matching_authors = matches_by_name.get(key, [])[:5]
-            profiles_data.append(profile)
-        
-        context['users'] = profiles_data
+                matches_by_key.setdefault(author.name_key, []).append(author)
+
+        for profile in profiles:
+            profile.matching_authors = matches_by_key.get(profile.name_key, [])[:5] if profile.name_key else []
+
+        context['users'] = profiles
         return context
 
 class ApproveUserEditView(LoginRequiredMixin, RoleRequiredMixin, View):
@@ -548,12 +568,10 @@ class ApproveUserEditView(LoginRequiredMixin, RoleRequiredMixin, View):
                     profile.author_profile.add(existing_author)
                 else:
                     try:
-                        author = Author.objects.get(
-                            first_name=first,
-                            last_name=last,
-                            middle_initial=middle_for_query,
-                            suffix=suffix_for_query,
-                        )
+                        # An unowned author wins over an owned one, as in approve_profiles()
+                        author = Author.objects.filter(
+                            name_key=name_key(first, last, middle_for_query, suffix_for_query)
+                        ).earliest(F('user').asc(nulls_first=True), 'id')
                         created = False
                     except Author.DoesNotExist:
                         author = Author.objects.create(
@@ -613,12 +631,10 @@ class ApproveUserView(LoginRequiredMixin, RoleRequiredMixin, View):
                     profile.author_profile.add(existing_author)
                 else:
                     try:
-                        author = Author.objects.get(
-                            first_name=first,
-                            last_name=last,
-                            middle_initial=middle,
-                            suffix=suffix,
-                        )
+                        # An unowned author wins over an owned one, as in approve_profiles()
+                        author = Author.objects.filter(
+                            name_key=name_key(first, last, middle, suffix)
+                        ).earliest(F('user').asc(nulls_first=True), 'id')
                         created = False
                     except Author.DoesNotExist:
                         author = Author.objects.create(
@@ -669,6 +685,64 @@ class DenyUserView(LoginRequiredMixin, RoleRequiredMixin, View):
         messages.info(request, f"Account {email} denied and removed. Denial notification sent with reason: {denial_reason}")
         return redirect("accounts:pending_accounts")
 
+class BulkPendingActionView(LoginRequiredMixin, RoleRequiredMixin, View):
+    """Approve or deny the selected pending accounts in one go (see accounts/approvals.py)."""
+    role = "admin"
+
+    def post(self, request):
+        from .approvals import APPROVED, DENIED, MAX_BULK_PROFILES, SKIPPED, approve_profiles, deny_profiles
+
+        is_ajax = request.headers.get('X-Requested-With') == 'XMLHttpRequest'
+        action = request.POST.get('action')
+        profile_ids = [int(value) for value in request.POST.getlist('profile_ids') if value.isdigit()]
+        denial_reason = request.POST.get('denial_reason', '').strip()
+
+        error = None
+        if action not in ('approve', 'deny'):
+            error = "Unknown action."
+        elif not profile_ids:
+            error = "Select at least one account."
+        elif len(profile_ids) > MAX_BULK_PROFILES:
+            error = f"Select at most {MAX_BULK_PROFILES} accounts at a time."
+        elif action == 'deny' and not denial_reason:
+            error = "Please select a reason for denial."
+        if error:
+            if is_ajax:
+                return JsonResponse({'success': False, 'error': error}, status=400)
+            messages.error(request, error)
+            return redirect("accounts:pending_accounts")
+
+        if action == 'approve':
+            results = approve_profiles(profile_ids)
+        else:
+            results = deny_profiles(profile_ids, denial_reason)
+
+        done = sum(1 for result in results if result['status'] in (APPROVED, DENIED))
+        skipped = [result for result in results if result['status'] == SKIPPED]
+        if is_ajax:
+            return JsonResponse({
+                'success': True,
+                'action': action,
+                'processed': done,
+                'skipped': len(skipped),
+                'results': results,
+            })
+
+        if done:
+            verb = "approved" if action == 'approve' else "denied and removed"
+            messages.success(request, f"{done} account{'s' if done != 1 else ''} {verb}.")
+        for result in skipped:
+            messages.warning(request, f"{result['name'] or result['email'] or result['id']}: {result['detail']}")
+        return redirect("accounts:pending_accounts")
+
+class MemoryStatsView(LoginRequiredMixin, RoleRequiredMixin, View):
+    """This worker's sampled RAM series and GC state (see accounts/memory.py)."""
+    role = "admin"
+
+    def get(self, request):
+        from .memory import memory_sampler
+        return JsonResponse(memory_sampler.snapshot())
+
 class UpdateConsentView(LoginRequiredMixin, View):
     def post(self, request):
         profile = request.user.userprofile
@@ -767,7 +841,7 @@ class DenyConsentView(LoginRequiredMixin, UserPassesTestMixin, View):
         else:
             return redirect("accounts:consent_approvals")
     
-class UserManagementView(LoginRequiredMixin, RoleRequiredMixin, ListView):
+class UserManagementView(LoginRequiredMixin, RoleRequiredMixin, CursorPaginationMixin, ListView):
     template_name = "accounts/user_management.html"
     context_object_name = "profiles"
     role = "admin"
@@ -840,6 +914,14 @@ class UserManagementView(LoginRequiredMixin, RoleRequiredMixin, ListView):
             queryset = queryset.order_by('-id')
         
         return queryset
+
+    def get_cursor_ordering(self):
+        # Cursor pagination only for the id sort; the other columns aren't unique
+        sort_field = self.request.GET.get('sort', '-id')
+        if sort_field not in ('id', '-id'):
+            return None
+        order = self.request.GET.get('order', 'desc')
+        return ('-id',) if order == 'desc' else ('id',)
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -976,12 +1058,10 @@ class EditUserView(LoginRequiredMixin, RoleRequiredMixin, View):
                 profile.author_profile.add(existing_author)
             else:
                 try:
-                    author = Author.objects.get(
-                        first_name=first,
-                        last_name=last,
-                        middle_initial=middle_for_query,
-                        suffix=suffix_for_query,
-                    )
+                    # An unowned author wins over an owned one, as in approve_profiles()
+                    author = Author.objects.filter(
+                        name_key=name_key(first, last, middle_for_query, suffix_for_query)
+                    ).earliest(F('user').asc(nulls_first=True), 'id')
                 except Author.DoesNotExist:
                     author = Author.objects.create(
                         first_name=first,
@@ -1,9 +1,9 @@
 import multiprocessing
 import os
 
-workers = 1  
+workers = int(os.environ.get('GUNICORN_WORKERS', 1))
 
-threads = 2  
+threads = int(os.environ.get('GUNICORN_THREADS', 2))
 worker_class = 'gthread'  
 
 max_requests = 200
@@ -53,6 +53,39 @@ def post_worker_init(worker):
     """Called after a worker has been initialized."""
     print(f"Worker {worker.pid} initialized with {threads} threads")
 
+    # Warm the caches, then build the navbar quick-search index, all off
+    # the request threads so the healthcheck answers right away
+    def build_quick_search_index():
+        from research.quick_search import quick_search_index
+        thread = quick_search_index.build_in_background()
+        if thread:
+            thread.join()
+        report = quick_search_index.memory_report()
+        print(f"Worker {worker.pid} quick-search index: {report['papers']} papers, "
+              f"{report['tokens']} tokens, ~{report['total_mb']}MB")
+
+    def cache_warmed(timings, total):
+        print(f"Worker {worker.pid} cache warm-up took {total}s: {timings}")
+        build_quick_search_index()
+
+    # The app is loaded and no request has been accepted yet: what's alive
+    # now lives as long as the worker, so keep the GC off it. The warm-up
+    # below overlaps with requests, so what it loads isn't frozen.
+    from accounts.memory import freeze_gc
+    freeze_gc()
+
+    from accounts.memory import memory_sampler
+    memory_sampler.start()
+
+    from research.warmup import warm_cache_in_background
+    warm_cache_in_background(on_done=cache_warmed)
+
+    # Pick up mail queued before the restart
+    from django.conf import settings
+    if settings.EMAIL_OUTBOX_THREAD:
+        from accounts.outbox import outbox_dispatcher
+        outbox_dispatcher.start()
+
 def pre_fork(server, worker):
     """Called just before a worker is forked."""
     pass
@@ -61,6 +94,8 @@ def post_fork(server, worker):
     """Called after a worker has been forked."""
     import gc
     gc.collect()
+    from accounts.memory import tune_gc
+    tune_gc()
 
 def worker_exit(server, worker):
     """Called when a worker is exited."""
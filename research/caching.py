@@ -0,0 +1,209 @@
+# research/caching.py
+"""
+Cache versioning.
+
+Version stamps for HTTP validators: each paper has a version token in the
+cache, plus one for the paper lists. research/signals.py bumps them
+whenever something that shows up on those pages changes. A missing stamp
+(evicted, restart) just gets a fresh token, so the worst case is one
+unnecessary full response.
+
+Generations for cached lookups: every domain (papers, authors, keywords,
+awards) has an integer generation that is folded into the keys of the
+data derived from it. Invalidating a domain is one incr(); the old keys
+are never read again and simply expire.
+
+memoize() puts both together for the cached lookup helpers, with
+single-flight recomputation so an expired key doesn't send every thread
+to the database at once.
+"""
+import functools
+import hashlib
+import math
+import random
+import time
+import uuid
+
+from django.core.cache import cache
+
+VERSION_TIMEOUT = 60 * 60 * 24 * 7
+
+LIST_VERSION_KEY = 'paper_list_version'
+
+
+def paper_version_key(paper_id):
+    return f'paper_version_{paper_id}'
+
+
+def _get_version(key):
+    version = cache.get(key)
+    if version is None:
+        version = uuid.uuid4().hex
+        # add() so concurrent requests agree on the same first token
+        if not cache.add(key, version, VERSION_TIMEOUT):
+            version = cache.get(key) or version
+    return version
+
+
+def paper_version(paper_id):
+    return _get_version(paper_version_key(paper_id))
+
+
+def paper_versions(paper_ids):
+    """{paper_id: version} for many papers with one get_many."""
+    keys = {paper_version_key(pid): pid for pid in paper_ids}
+    found = cache.get_many(keys)
+    versions = {keys[key]: version for key, version in found.items()}
+    for key, pid in keys.items():
+        if key not in found:
+            versions[pid] = _get_version(key)
+    return versions
+
+
+def list_version():
+    return _get_version(LIST_VERSION_KEY)
+
+
+def bump_paper_versions(paper_ids):
+    """Give the papers (and the paper lists) new version tokens."""
+    versions = {paper_version_key(pid): uuid.uuid4().hex for pid in paper_ids if pid is not None}
+    versions[LIST_VERSION_KEY] = uuid.uuid4().hex
+    cache.set_many(versions, VERSION_TIMEOUT)
+
+
+def weak_etag(request, *parts):
+    """
+    Weak ETag over version tokens plus what else changes the rendered page:
+    the viewer (templates show per-user controls) and the query string.
+    The viewer part covers what the templates read from the profile:
+    approval (PDF link or lock), consent and the navbar name.
+    """
+    user = request.user
+    viewer = 'anon'
+    if user.is_authenticated:
+        viewer = f'{user.pk}:{user.role}'
+        # Loaded once per request; the templates use the same instance
+        profile = getattr(user, 'userprofile', None)
+        if profile is not None:
+            viewer += f':{profile.is_approved}:{profile.consent_status}:{profile.display_name}'
+    raw = '|'.join([*map(str, parts), viewer, request.GET.urlencode()])
+    return 'W/"%s"' % hashlib.md5(raw.encode(), usedforsecurity=False).hexdigest()
+
+
+# -------------------------
+# Generations
+# -------------------------
+
+def generation_key(domain):
+    return f'generation_{domain}'
+
+
+def _initial_generation():
+    # Time-based so a lost counter never restarts below a generation in use
+    return time.time_ns() // 1000
+
+
+def get_generation(domain):
+    key = generation_key(domain)
+    generation = cache.get(key)
+    if generation is None:
+        cache.add(key, _initial_generation(), None)
+        generation = cache.get(key) or _initial_generation()
+    return generation
+
+
+def bump_generation(*domains):
+    """Invalidate everything cached under ``domains``; returns {generation_key: new generation}."""
+    generations = {}
+    for domain in domains:
+        key = generation_key(domain)
+        try:
+            generations[key] = cache.incr(key)
+        except ValueError:
+            generations[key] = _initial_generation()
+            cache.set(key, generations[key], None)
+    return generations
+
+
+def versioned_key(name, *domains):
+    """``name`` prefixed with the current generation of each domain it depends on."""
+    generations = cache.get_many([generation_key(d) for d in domains])
+    parts = []
+    for domain in domains:
+        generation = generations.get(generation_key(domain))
+        if generation is None:
+            generation = get_generation(domain)
+        parts.append(f'{domain}{generation}')
+    return f"{'.'.join(parts)}:{name}"
+
+
+# -------------------------
+# Memoization
+# -------------------------
+
+LOCK_TIMEOUT = 30
+# How long a caller waits for someone else's recompute before doing it itself
+LOCK_WAIT = 5
+LOCK_POLL_INTERVAL = 0.05
+
+
+def _due_for_early_refresh(fresh_until, cost, beta, now):
+    """Probabilistic early expiry (XFetch): likelier the closer and costlier the recompute."""
+    if not beta:
+        return False
+    return now - cost * beta * math.log(1.0 - random.random()) >= fresh_until
+
+
+def memoize(name, *domains, timeout=60 * 60, stale_timeout=5 * 60, jitter=0.1, early_refresh=1.0):
+    """
+    Cache a function's result under ``name`` (str.format()ed with its
+    arguments) and the generations of ``domains``.
+
+    Only one caller, in any worker, recomputes a missing or stale entry;
+    the others wait for it, or keep getting the stale value for up to
+    ``stale_timeout`` seconds. TTLs vary by +/-``jitter`` so entries written
+    together don't expire together, and ``early_refresh`` (0 disables)
+    lets a caller recompute shortly before expiry.
+    """
+    def decorator(func):
+        def store(key, args):
+            started = time.monotonic()
+            value = func(*args)
+            cost = time.monotonic() - started
+            ttl = timeout * random.uniform(1 - jitter, 1 + jitter)
+            cache.set(key, (value, time.time() + ttl, cost), ttl + stale_timeout)
+            return value
+
+        def recompute(key, args):
+            try:
+                return store(key, args)
+            finally:
+                cache.delete(f'{key}:lock')
+
+        @functools.wraps(func)
+        def wrapper(*args):
+            key = versioned_key(name.format(*args), *domains)
+            entry = cache.get(key)
+            now = time.time()
+
+            if entry is not None:
+                value, fresh_until, cost = entry
+                if now < fresh_until and not _due_for_early_refresh(fresh_until, cost, early_refresh, now):
+                    return value
+                if not cache.add(f'{key}:lock', 1, LOCK_TIMEOUT):
+                    return value  # someone else is refreshing it
+                return recompute(key, args)
+
+            if cache.add(f'{key}:lock', 1, LOCK_TIMEOUT):
+                return recompute(key, args)
+
+            deadline = now + LOCK_WAIT
+            while time.time() < deadline:
+                time.sleep(LOCK_POLL_INTERVAL)
+                entry = cache.get(key)
+                if entry is not None:
+                    return entry[0]
+            return store(key, args)
+
+        return wrapper
+    return decorator
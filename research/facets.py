@@ -0,0 +1,99 @@
+# research/facets.py
+"""
+Facet counts for the search filters.
+
+For every filter value we cache a bitmap of the papers that have it
+(a Python int with bit ``paper.id`` set). Counting then needs just the
+ids matched by the current query: one ``values_list('id')`` query, or
+none at all when there's no query. The rest is AND + bit_count in memory.
+
+Counts are disjunctive: the numbers for one facet honour every other
+selected filter but not its own selection, so each option shows what
+picking it instead would return.
+"""
+from django.core.cache import cache
+
+from .caching import versioned_key
+
+FACETS = ('school_year', 'grade_level', 'research_design', 'strand', 'award')
+
+BITMAP_CACHE_KEY = 'facet_bitmaps'
+BITMAP_CACHE_TIMEOUT = 60 * 60
+
+
+def bitmap_from_ids(ids):
+    """Pack paper ids into an int bitmap."""
+    ids = list(ids)
+    if not ids:
+        return 0
+    buf = bytearray(max(ids) // 8 + 1)
+    for pid in ids:
+        buf[pid >> 3] |= 1 << (pid & 7)
+    return int.from_bytes(buf, 'little')
+
+
+def build_bitmaps():
+    """{'all': bitmap, facet: {value: bitmap}} for every paper, from two queries."""
+    from .models import ResearchPaper
+
+    ids_by_value = {facet: {} for facet in FACETS}
+    all_ids = []
+
+    rows = ResearchPaper.objects.values_list(
+        'id', 'school_year', 'grade_level', 'research_design', 'strand'
+    )
+    for pid, *values in rows:
+        all_ids.append(pid)
+        for facet, value in zip(FACETS, values):
+            if value not in (None, ''):
+                ids_by_value[facet].setdefault(str(value), []).append(pid)
+
+    award_rows = ResearchPaper.awards.through.objects.values_list('researchpaper_id', 'award_id')
+    for pid, award_id in award_rows:
+        ids_by_value['award'].setdefault(str(award_id), []).append(pid)
+
+    bitmaps = {'all': bitmap_from_ids(all_ids)}
+    for facet, values in ids_by_value.items():
+        bitmaps[facet] = {value: bitmap_from_ids(ids) for value, ids in values.items()}
+    return bitmaps
+
+
+def get_bitmaps():
+    """Facet bitmaps (cached for 1 hour, per papers/awards generation)."""
+    cache_key = versioned_key(BITMAP_CACHE_KEY, 'papers', 'awards')
+    bitmaps = cache.get(cache_key)
+    if bitmaps is None:
+        bitmaps = build_bitmaps()
+        cache.set(cache_key, bitmaps, BITMAP_CACHE_TIMEOUT)
+    return bitmaps
+
+
+def facet_counts(selected, matched_ids=None):
+    """
+    Count papers per facet value.
+
+    ``selected`` maps facet name -> selected value ('' or None for "All").
+    ``matched_ids`` are the papers matched by the non-facet part of the
+    search (query, authors, keywords); None means every paper.
+    Returns {facet: {value: count}} with string values, as in the <select>s.
+    """
+    bitmaps = get_bitmaps()
+    base = bitmaps['all'] if matched_ids is None else bitmaps['all'] & bitmap_from_ids(matched_ids)
+
+    selected_bitmaps = {}
+    for facet in FACETS:
+        value = selected.get(facet)
+        if value:
+            selected_bitmaps[facet] = bitmaps[facet].get(str(value), 0)
+
+    counts = {}
+    for facet in FACETS:
+        mask = base
+        for other, bitmap in selected_bitmaps.items():
+            if other != facet:
+                mask &= bitmap
+        counts[facet] = {
+            value: (mask & bitmap).bit_count()
+            for value, bitmap in bitmaps[facet].items()
+        }
+    return counts
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from research.models import Author
+
+
+class Command(BaseCommand):
+    help = "Recompute the stored full_name / public_name of every author"
+
+    def handle(self, *args, **options):
+        changed = []
+        for author in Author.objects.select_related('user__userprofile').iterator(chunk_size=500):
+            old = (author.full_name, author.public_name)
+            profile = getattr(author.user, 'userprofile', None) if author.user else None
+            author.refresh_names(consented=profile is not None and profile.consent_status == 'consented')
+            if (author.full_name, author.public_name) != old:
+                changed.append(author)
+
+        Author.objects.bulk_update(changed, ['full_name', 'public_name'], batch_size=500)
+        self.stdout.write(self.style.SUCCESS(f"Updated {len(changed)} author(s)."))
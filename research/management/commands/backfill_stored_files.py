@@ -0,0 +1,42 @@
+import hashlib
+
+from django.core.management.base import BaseCommand
+
+from research.models import ResearchPaper, StoredFile
+from storage import SupabaseStorage
+
+
+class Command(BaseCommand):
+    help = "Record size and sha256 for research paper PDFs uploaded before StoredFile existed"
+
+    def handle(self, *args, **options):
+        storage = SupabaseStorage()
+        known = set(StoredFile.objects.values_list('name', flat=True))
+        names = {
+            name for name in ResearchPaper.objects.values_list('pdf_file', flat=True)
+            if name and name not in known
+        }
+
+        recorded = 0
+        for name in sorted(names):
+            try:
+                stream = storage.open_stream(name)
+            except Exception as e:
+                self.stdout.write(self.style.WARNING(f"Skipped {name}: {e}"))
+                continue
+
+            digest = hashlib.sha256()
+            size = 0
+            try:
+                for chunk in stream:
+                    digest.update(chunk)
+                    size += len(chunk)
+            finally:
+                stream.close()
+
+            StoredFile.objects.update_or_create(
+                name=name, defaults={'size': size, 'sha256': digest.hexdigest()}
+            )
+            recorded += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Recorded {recorded} file(s)."))
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from storage import get_download_cache
+
+
+class Command(BaseCommand):
+    help = "Show hit/miss counts and bytes saved by the local PDF download cache"
+
+    def handle(self, *args, **options):
+        cache = get_download_cache()
+        if cache is None:
+            self.stdout.write(self.style.WARNING("PDF cache is disabled (PDF_CACHE_MAX_MB=0)."))
+            return
+
+        stats = cache.read_stats()
+        lookups = stats.get('hits', 0) + stats.get('misses', 0)
+        hit_rate = stats.get('hits', 0) / lookups * 100 if lookups else 0
+
+        self.stdout.write(f"Directory:   {cache.directory}")
+        self.stdout.write(f"Files:       {stats['files']}")
+        self.stdout.write(f"On disk:     {stats['bytes_on_disk'] / 1024 / 1024:.1f} MB of {stats['max_bytes'] / 1024 / 1024:.0f} MB")
+        self.stdout.write(f"Hits:        {stats.get('hits', 0)} ({hit_rate:.1f}%)")
+        self.stdout.write(f"Misses:      {stats.get('misses', 0)}")
+        self.stdout.write(f"Evictions:   {stats.get('evictions', 0)}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Bytes saved: {stats.get('bytes_saved', 0) / 1024 / 1024:.1f} MB"
+        ))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from research.quick_search import quick_search_index
+
+
+class Command(BaseCommand):
+    help = "Build the navbar quick-search index and report its memory footprint"
+
+    def handle(self, *args, **options):
+        quick_search_index.build()
+        report = quick_search_index.memory_report()
+        for key, value in report.items():
+            self.stdout.write(f"{key:>12}: {value}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Quick-search index uses ~{report['total_mb']}MB of the 500MB worker budget."
+        ))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from research.search import update_search_index
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text search index for every research paper"
+
+    def handle(self, *args, **options):
+        count = update_search_index()
+        self.stdout.write(self.style.SUCCESS(f"Indexed {count} research paper(s)."))
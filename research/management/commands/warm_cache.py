@@ -0,0 +1,18 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from research.warmup import warm_cache
+
+
+class Command(BaseCommand):
+    help = "Preload cached filter metadata, facet bitmaps and the home/index pages"
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        timings = warm_cache()
+        for step, seconds in timings.items():
+            self.stdout.write(f"  {step:<16} {seconds:.3f}s")
+        self.stdout.write(self.style.SUCCESS(
+            f"Cache warmed in {time.monotonic() - started:.2f}s."
+        ))
@@ -0,0 +1,119 @@
+# research/middleware.py
+"""
+Full-page cache for anonymous visitors.
+
+Public pages look the same to every visitor without a session, so their
+rendered responses are cached under the path, the normalized query
+string and the version stamps of what they show (research/caching.py):
+a paper's own version for its detail page, the paper list version and the
+domain generations for everything else. research/signals.py bumps those
+whenever a paper, its authors (names or consent), keywords or awards
+change, so a purge is just a key nobody asks for again. A cached page can
+never show a name whose consent has since been revoked.
+
+Requests carrying a session or messages cookie and responses that set
+cookies (CSRF token, messages) bypass the cache. Hits skip sessions,
+auth, rate limiting and the database entirely.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.urls import Resolver404, resolve
+from django.utils.cache import get_conditional_response
+from django.utils.http import urlencode
+
+from .caching import list_version, paper_version, versioned_key
+from .utils import is_disallowed_bot
+
+PAGE_CACHE_TIMEOUT = 60 * 60
+
+CACHEABLE_VIEWS = {
+    'research:home',
+    'research:about',
+    'research:index',
+    'research:strand',
+    'research:strand_design',
+    'research:detail',
+    'research:search',
+    'research:terms',
+    'research:privacy_policy',
+}
+
+# Headers that select a different response from the same URL (search partials/JSON)
+VARY_HEADERS = ('X-Requested-With', 'X-Filter-Update')
+
+# Query parameters that never change the page
+IGNORED_PARAMS = {'fbclid', 'gclid'}
+
+MESSAGES_COOKIE_NAME = 'messages'
+
+
+def normalized_query(query_dict):
+    """The query string with sorted parameters, minus blanks and tracking parameters."""
+    params = sorted(
+        (key, value)
+        for key, values in query_dict.lists()
+        if key not in IGNORED_PARAMS and not key.startswith('utm_')
+        for value in values
+        if value != ''
+    )
+    return urlencode(params)
+
+
+def page_cache_key(request, match):
+    if match.view_name == 'research:detail':
+        version = paper_version(match.kwargs['pk'])
+    else:
+        version = list_version()
+    headers = '|'.join(request.headers.get(name, '') for name in VARY_HEADERS)
+    name = f"page:{version}:{request.path}?{normalized_query(request.GET)}|{headers}"
+    return versioned_key(name, 'papers', 'authors', 'keywords', 'awards')
+
+
+class AnonymousPageCacheMiddleware:
+    """Serve and store whole responses for anonymous GETs of public research pages."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        key = self.cache_key(request)
+        if key is None:
+            return self.get_response(request)
+
+        entry = cache.get(key)
+        if entry is not None:
+            status, headers, content = entry
+            response = HttpResponse(content, status=status, headers=headers)
+            response['X-Page-Cache'] = 'hit'
+            return get_conditional_response(request, etag=response.get('ETag'), response=response)
+
+        response = self.get_response(request)
+        if request.method == 'GET' and self.is_cacheable(response):
+            headers = dict(response.items())
+            cache.set(key, (response.status_code, headers, response.content), PAGE_CACHE_TIMEOUT)
+            response['X-Page-Cache'] = 'miss'
+        return response
+
+    def cache_key(self, request):
+        if request.method not in ('GET', 'HEAD'):
+            return None
+        if settings.SESSION_COOKIE_NAME in request.COOKIES or MESSAGES_COOKIE_NAME in request.COOKIES:
+            return None
+        try:
+            match = resolve(request.path_info)
+        except Resolver404:
+            return None
+        if match.view_name not in CACHEABLE_VIEWS:
+            return None
+        # SearchView turns these away; a hit must not skip that
+        if match.view_name == 'research:search' and is_disallowed_bot(request):
+            return None
+        return page_cache_key(request, match)
+
+    @staticmethod
+    def is_cacheable(response):
+        if response.status_code != 200 or response.streaming or response.cookies:
+            return False
+        cache_control = response.get('Cache-Control', '')
+        return 'private' not in cache_control and 'no-store' not in cache_control
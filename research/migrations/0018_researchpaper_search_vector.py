@@ -0,0 +1,44 @@
+# Generated by Django 5.2.6 on 2026-10-16 23:47
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    """GIN index on PostgreSQL, FTS5 mirror table on SQLite."""
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_paper_search "
+            "ON research_researchpaper USING GIN (search_vector)"
+        )
+    elif vendor == 'sqlite':
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS research_paper_fts USING fts5("
+            "title, keywords, authors, abstract, "
+            "tokenize = 'unicode61 remove_diacritics 2')"
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute("DROP INDEX IF EXISTS idx_paper_search")
+    elif vendor == 'sqlite':
+        schema_editor.execute("DROP TABLE IF EXISTS research_paper_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('research', '0017_alter_researchpaper_options_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='researchpaper',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.6 on 2026-10-16 23:58
+
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+TRIGRAM_INDEXES = [
+    ('idx_paper_title_trgm', 'research_researchpaper', 'title'),
+    ('idx_author_last_name_trgm', 'research_author', 'last_name'),
+    ('idx_keyword_word_trgm', 'research_keyword', 'word'),
+]
+
+
+def create_trigram_indexes(apps, schema_editor):
+    """pg_trgm GIN indexes for typo-tolerant search (PostgreSQL only)."""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, table, column in TRIGRAM_INDEXES:
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {name} "
+            f"ON {table} USING GIN ({column} gin_trgm_ops)"
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, _, _ in TRIGRAM_INDEXES:
+        schema_editor.execute(f"DROP INDEX IF EXISTS {name}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('research', '0018_researchpaper_search_vector'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
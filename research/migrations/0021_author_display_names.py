@@ -0,0 +1,23 @@
+# Generated by Django 5.2.6 on 2026-10-17 00:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('research', '0020_storedfile'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='author',
+            name='full_name',
+            field=models.CharField(blank=True, editable=False, max_length=230),
+        ),
+        migrations.AddField(
+            model_name='author',
+            name='public_name',
+            field=models.CharField(blank=True, editable=False, max_length=230),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.6 on 2026-10-17 00:35
+
+from django.conf import settings
+from django.db import migrations, models
+
+from research.names import name_key
+
+
+def fill_name_keys(apps, schema_editor):
+    Author = apps.get_model('research', 'Author')
+    changed = []
+    for author in Author.objects.iterator(chunk_size=500):
+        author.name_key = name_key(
+            author.first_name, author.last_name, author.middle_initial, author.suffix
+        )
+        changed.append(author)
+    Author.objects.bulk_update(changed, ['name_key'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('research', '0021_author_display_names'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='author',
+            name='name_key',
+            field=models.CharField(blank=True, editable=False, max_length=230),
+        ),
+        migrations.AddIndex(
+            model_name='author',
+            index=models.Index(fields=['name_key'], name='idx_author_name_key'),
+        ),
+        migrations.RunPython(fill_name_keys, migrations.RunPython.noop),
+    ]
@@ -2,8 +2,10 @@ from django.db import models
 from django.core.validators import RegexValidator
 from django.core.exceptions import ValidationError
 from django.conf import settings
+from django.contrib.postgres.search import SearchVectorField
 from datetime import date
 from storage import SupabaseStorage
+from .names import name_key
 
 class Keyword(models.Model):
     word = models.CharField(max_length=100, unique=True)
@@ -57,6 +59,13 @@ class Author(models.Model):
         validators=[RegexValidator(regex=r"^\d{4}-\d{4}$")]
     )
 
+    # Denormalized display names so listings never join accounts_userprofile.
+    # Kept current by save() and the consent receiver in research/signals.py.
+    full_name = models.CharField(max_length=230, blank=True, editable=False)
+    public_name = models.CharField(max_length=230, blank=True, editable=False)
+    # research.names.name_key() of the name, for matching accounts to authors
+    name_key = models.CharField(max_length=230, blank=True, editable=False)
+
     class Meta:
         unique_together = (
             "first_name",
@@ -77,6 +86,7 @@ class Author(models.Model):
             models.Index(fields=['G11_Batch'], name='idx_author_g11'),  
             models.Index(fields=['G12_Batch'], name='idx_author_g12'),
             models.Index(fields=['user'], name='idx_author_user'),
+            models.Index(fields=['name_key'], name='idx_author_name_key'),
         ]
 
     def save(self, *args, **kwargs):
@@ -92,6 +102,12 @@ class Author(models.Model):
             self.suffix = self.suffix.strip()
         else:
             self.suffix = ""
+
+        self.refresh_names()
+        self.name_key = name_key(self.first_name, self.last_name, self.middle_initial, self.suffix)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'full_name', 'public_name', 'name_key'}
         
         super().save(*args, **kwargs)
 
@@ -109,12 +125,35 @@ class Author(models.Model):
         suf = f", {self.suffix}" if self.suffix else ""
         return f"{self.first_name}{mid} {self.last_name}{suf}"
 
+    def has_consented(self):
+        """Whether the linked user agreed to full-name display (one query)."""
+        if not self.user_id:
+            return False
+        from accounts.models import UserProfile
+        return UserProfile.objects.filter(
+            user_id=self.user_id, consent_status='consented'
+        ).exists()
+
+    def refresh_names(self, consented=None):
+        """Recompute full_name / public_name (doesn't save)."""
+        if consented is None:
+            consented = self.has_consented()
+        self.full_name = str(self)
+        self.public_name = self.full_name if consented else self.initials_name()
+
     def display_name_public(self):
+        if self.public_name:
+            return self.public_name
+
+        # Rows saved before public_name existed (see backfill_author_names)
         if self.user and hasattr(self.user, 'userprofile'):
             profile = self.user.userprofile
             if profile.consent_status == 'consented':
                 return str(self)
-        
+        return self.initials_name()
+
+    def initials_name(self):
+        """'Last, F. M.' form shown when the author hasn't consented."""
         first_names = self.first_name.strip().split()
         first_initials = " ".join(f"{name[0].upper()}." for name in first_names if name)
         parts = [f"{self.last_name},", first_initials]
@@ -130,6 +169,26 @@ class Author(models.Model):
         return name
     
 
+def author_prefetch():
+    """
+    Prefetch for paper.author with the precomputed public_name, in
+    get_authors_alphabetically() order, so a page of paper cards costs one
+    query for all of its authors and never touches accounts_userprofile.
+    """
+    return models.Prefetch(
+        'author',
+        queryset=Author.objects.only(
+            'id', 'first_name', 'last_name', 'public_name'
+        ).order_by('last_name', 'first_name')
+    )
+
+
+class ResearchPaperManager(models.Manager):
+    def get_queryset(self):
+        # search_vector is only read inside the database, never in Python
+        return super().get_queryset().defer('search_vector')
+
+
 class ResearchPaper(models.Model):
     STRAND_CHOICES = [
         ("STEM", "STEM"),
@@ -177,6 +236,11 @@ class ResearchPaper(models.Model):
         'Award', blank=True, related_name='research_papers'
     )
 
+    # Maintained by research.search / research.signals (PostgreSQL only)
+    search_vector = SearchVectorField(null=True, blank=True, editable=False)
+
+    objects = ResearchPaperManager()
+
     class Meta:
         ordering = ['-publication_date', 'id'] 
         indexes = [
@@ -253,7 +317,11 @@ class ResearchPaper(models.Model):
         """
         Returns authors sorted alphabetically by last name, then first name.
         Use this instead of paper.author.all in templates.
+        Sorts prefetched authors in Python instead of querying again.
         """
+        prefetched = getattr(self, '_prefetched_objects_cache', {}).get('author')
+        if prefetched is not None:
+            return sorted(prefetched, key=lambda a: (a.last_name, a.first_name))
         return self.author.all().order_by('last_name', 'first_name')
 
     def __str__(self):
@@ -292,4 +360,19 @@ class PaperCitation(models.Model):
     def __str__(self):
         if self.cited_by_paper:
             return f"{self.paper.title} cited by {self.cited_by_paper.title}"
-        return f"{self.paper.title} cited by {self.cited_by_external}"
\ No newline at end of file
+        return f"{self.paper.title} cited by {self.cited_by_external}"
+
+
+class StoredFile(models.Model):
+    """Size and content hash of every file written through SupabaseStorage (for strong ETags)"""
+    name = models.CharField(max_length=300, unique=True)
+    size = models.PositiveBigIntegerField()
+    sha256 = models.CharField(max_length=64)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    @property
+    def etag(self):
+        return f'"{self.sha256}"'
+
+    def __str__(self):
+        return self.name
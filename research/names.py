@@ -0,0 +1,39 @@
+# research/names.py
+"""
+Normalized person-name keys.
+
+Author.name_key and UserProfile.name_key store name_key() of their name
+parts, so matching a registration or a pending account to an author is an
+indexed equality (or IN) lookup instead of a case-insensitive comparison
+of four columns. Two names get the same key when they differ only in
+case, spacing or the punctuation of the middle initial and suffix:
+"ana  reyes", "Ana Reyes" and "ANA REYES" match, and so do "Jr.", "jr"
+and "Junior".
+
+Migrations import this module, so keep it free of model imports.
+"""
+
+# Spelled-out suffixes and their usual abbreviation
+SUFFIX_ALIASES = {
+    'junior': 'jr',
+    'senior': 'sr',
+}
+
+
+def _clean(value):
+    return ' '.join((value or '').split()).casefold()
+
+
+def canonical_suffix(suffix):
+    suffix = _clean(suffix).replace('.', '').replace(',', '').strip()
+    return SUFFIX_ALIASES.get(suffix, suffix)
+
+
+def name_key(first_name, last_name, middle_initial='', suffix=''):
+    """'last|first|m|suffix', or '' when the first or last name is missing."""
+    first = _clean(first_name)
+    last = _clean(last_name)
+    if not first or not last:
+        return ''
+    middle = _clean(middle_initial).replace('.', '')[:1]
+    return f'{last}|{first}|{middle}|{canonical_suffix(suffix)}'
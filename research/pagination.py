@@ -0,0 +1,371 @@
+# research/pagination.py
+"""
+Keyset (cursor) pagination for list views.
+
+Pages are fetched with ``WHERE (key) after (last row's key) LIMIT n+1``
+instead of ``OFFSET``, so page 500 costs the same as page 1 and no
+``COUNT(*)`` is needed to know whether there is a next page. Cursors are
+opaque url-safe tokens carrying the boundary row's key and page number.
+
+Every link a page renders is a cursor, numbered ones included: the
+cursors for nearby pages come from one short keyset read of just the key
+columns either side, and "last" is a backwards read from the end. Legacy
+``?page=N`` links are only an entry point: that one page is read with an
+OFFSET (still without a COUNT). The total, needed only for the "last"
+link, is the planner's estimate on PostgreSQL and only falls back to an
+exact count for small results.
+"""
+import base64
+import json
+import math
+
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.db.models import Q
+from django.http import Http404
+from django.utils.functional import cached_property
+
+# Below this many (estimated) rows an exact COUNT is cheap enough
+EXACT_COUNT_THRESHOLD = 1000
+
+
+def encode_cursor(values, number, backwards=False):
+    payload = json.dumps([list(values), number, backwards], default=str, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """(values, number, backwards) from a cursor token, or None if it's malformed."""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        values, number, backwards = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        return None
+    if not isinstance(values, list) or not isinstance(number, int) or number < 1:
+        return None
+    return values, number, bool(backwards)
+
+
+def keyset_filter(ordering, values, backwards=False):
+    """
+    Q matching rows strictly after ``values`` in ``ordering``
+    (strictly before when ``backwards``), e.g. for ('-publication_date', 'id'):
+    publication_date < d OR (publication_date = d AND id > i).
+    """
+    condition = Q()
+    for i, field in enumerate(ordering):
+        name = field.lstrip('-')
+        descending = field.startswith('-') != backwards
+        clause = Q(**{f"{name}__{'lt' if descending else 'gt'}": values[i]})
+        for prev_field, prev_value in zip(ordering[:i], values[:i]):
+            clause &= Q(**{prev_field.lstrip('-'): prev_value})
+        condition |= clause
+
+    # Redundant bound on the leading key so the planner can range-scan its index
+    first = ordering[0]
+    descending = first.startswith('-') != backwards
+    bound = Q(**{f"{first.lstrip('-')}__{'lte' if descending else 'gte'}": values[0]})
+    return bound & condition
+
+
+def reverse_ordering(ordering):
+    return tuple(field[1:] if field.startswith('-') else f'-{field}' for field in ordering)
+
+
+def estimate_count(queryset):
+    """Row count from the PostgreSQL planner estimate, exact when small (or on other databases)."""
+    if connection.vendor != 'postgresql':
+        return queryset.count()
+
+    sql, params = queryset.order_by().values('pk').query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    estimate = int(plan[0]['Plan']['Plan Rows'])
+
+    if estimate < EXACT_COUNT_THRESHOLD:
+        return queryset.count()
+    return estimate
+
+
+class CursorPage:
+    """Quacks like django.core.paginator.Page for the list templates."""
+
+    def __init__(self, object_list, paginator, number, has_next, has_previous):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.number = number
+        self._has_next = has_next
+        self._has_previous = has_previous
+        self.next_cursor = None
+        self.previous_cursor = None
+
+        if object_list and has_next:
+            self.next_cursor = encode_cursor(paginator.key(object_list[-1]), number + 1)
+        if object_list and has_previous:
+            self.previous_cursor = encode_cursor(paginator.key(object_list[0]), number - 1, backwards=True)
+
+    def __repr__(self):
+        return f"<Cursor page {self.number}>"
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next
+
+    def nearby_cursors(self, distance):
+        """
+        (number, cursor) for the pages up to ``distance`` either side of
+        this one, in order; the cursor is None for this page.
+        """
+        paginator = self.paginator
+        per_page = paginator.per_page
+        # Each key is the boundary row of a page further out; one more row tells whether that page exists
+        limit = (distance - 1) * per_page + 1
+        pages = [(self.number, None)]
+        if not self.object_list:
+            return pages
+
+        if self._has_previous and distance > 0:
+            pages.insert(0, (self.number - 1, self.previous_cursor))
+            before = paginator.keys_beyond(self.object_list[0], limit, backwards=True) if distance > 1 else []
+            for j in range(2, distance + 1):
+                number, i = self.number - j, (j - 1) * per_page - 1
+                if number < 1 or i + 1 >= len(before):
+                    break
+                pages.insert(0, (number, encode_cursor(before[i], number, backwards=True)))
+
+        if self._has_next and distance > 0:
+            pages.append((self.number + 1, self.next_cursor))
+            after = paginator.keys_beyond(self.object_list[-1], limit) if distance > 1 else []
+            for j in range(2, distance + 1):
+                number, i = self.number + j, (j - 1) * per_page - 1
+                if i + 1 >= len(after):
+                    break
+                pages.append((number, encode_cursor(after[i], number)))
+        return pages
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    def next_page_number(self):
+        return self.number + 1
+
+    def previous_page_number(self):
+        return self.number - 1
+
+    def start_index(self):
+        if not self.object_list:
+            return 0
+        return (self.number - 1) * self.paginator.per_page + 1
+
+    def end_index(self):
+        return self.start_index() + len(self.object_list) - 1 if self.object_list else 0
+
+
+class CursorPaginator:
+    def __init__(self, queryset, per_page, ordering):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.ordering = tuple(ordering)
+
+    def key(self, obj):
+        return [getattr(obj, field.lstrip('-')) for field in self.ordering]
+
+    def _field(self, name):
+        annotation = self.queryset.query.annotations.get(name)
+        if annotation is not None:
+            return annotation.output_field
+        return self.queryset.model._meta.get_field(name)
+
+    def clean_key(self, values):
+        """
+        Cursor key values converted by their fields' to_python(), or None if
+        any is missing or invalid. Cursors come from the URL, so anything
+        can be in them.
+        """
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            return None
+        cleaned = []
+        for field, value in zip(self.ordering, values):
+            try:
+                value = self._field(field.lstrip('-')).to_python(value)
+            except (ValidationError, TypeError, ValueError):
+                return None
+            if value is None:
+                return None
+            cleaned.append(value)
+        return cleaned
+
+    def page(self, cursor=None):
+        """The page after/before ``cursor``; the first page when there's none or it's invalid."""
+        decoded = decode_cursor(cursor) if cursor else None
+        if decoded and decoded[0] == [] and decoded[2]:
+            # last_cursor(): backwards from the end
+            return self._page_before(self.queryset, decoded[1], has_next=False)
+
+        values = self.clean_key(decoded[0]) if decoded else None
+        if values is None:
+            return self._slice(self.queryset.order_by(*self.ordering), 1, has_previous=False)
+
+        _, number, backwards = decoded
+        qs = self.queryset.filter(keyset_filter(self.ordering, values, backwards))
+        if not backwards:
+            return self._slice(qs.order_by(*self.ordering), number, has_previous=True)
+        return self._page_before(qs, number, has_next=True)
+
+    def last_cursor(self):
+        """Cursor for the last page; its number comes from the (estimated) total."""
+        return encode_cursor([], self.num_pages, backwards=True)
+
+    def keys_beyond(self, obj, limit, backwards=False):
+        """Keys of up to ``limit`` rows after ``obj`` (before it when ``backwards``), nearest first."""
+        ordering = reverse_ordering(self.ordering) if backwards else self.ordering
+        qs = self.queryset.filter(keyset_filter(self.ordering, self.key(obj), backwards)).order_by(*ordering)
+        fields = [field.lstrip('-') for field in self.ordering]
+        return [list(key) for key in qs.values_list(*fields)[:limit]]
+
+    def page_at(self, number):
+        """A page by number (legacy ?page=N): OFFSET read, but still no COUNT."""
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise Http404("Invalid page.")
+        if number < 1:
+            raise Http404("Invalid page.")
+        offset = (number - 1) * self.per_page
+        qs = self.queryset.order_by(*self.ordering)[offset:]
+        return self._slice(qs, number, has_previous=number > 1)
+
+    def _page_before(self, qs, number, has_next):
+        rows = list(qs.order_by(*reverse_ordering(self.ordering))[:self.per_page + 1])
+        has_previous = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        rows.reverse()
+        # Rows may have been deleted since the cursor was made; snap back to page 1
+        number = number if has_previous else 1
+        return CursorPage(rows, self, number, has_next=has_next, has_previous=has_previous)
+
+    def _slice(self, qs, number, has_previous):
+        rows = list(qs[:self.per_page + 1])
+        has_next = len(rows) > self.per_page
+        return CursorPage(rows[:self.per_page], self, number, has_next, has_previous)
+
+    @cached_property
+    def count(self):
+        return estimate_count(self.queryset)
+
+    @cached_property
+    def num_pages(self):
+        return max(1, math.ceil(self.count / self.per_page))
+
+    @property
+    def page_range(self):
+        return range(1, self.num_pages + 1)
+
+
+class CursorPaginationMixin:
+    """
+    For generic ListViews. Paginates by cursor when get_cursor_ordering()
+    returns a unique ordering, otherwise falls back to Django's Paginator.
+    Either way the page gets ``next_query`` / ``previous_query`` /
+    ``first_query`` strings (the current GET params with the page swapped),
+    so templates link with ``href="?{{ page_obj.next_query }}"``.
+    Numbered links come from ``last_query`` and ``nearby_pages``
+    ((number, query) pairs). With cursors these are cursor links too, and
+    both are only worked out when a template uses them; only ``last_query``
+    needs the total.
+    """
+    # Numbered links on either side of the current page
+    nearby_page_links = 2
+    cursor_kwarg = 'cursor'
+    cursor_ordering = ('-publication_date', 'id')
+
+    def get_cursor_ordering(self):
+        return self.cursor_ordering
+
+    def paginate_queryset(self, queryset, page_size):
+        ordering = self.get_cursor_ordering()
+        if ordering is None:
+            paginator, page, object_list, is_paginated = super().paginate_queryset(queryset, page_size)
+
+            def number_params(number):
+                return {} if number == 1 else {self.page_kwarg: number}
+
+            def nearby_params():
+                first = max(1, page.number - self.nearby_page_links)
+                last = min(paginator.num_pages, page.number + self.nearby_page_links)
+                return [(number, number_params(number)) for number in range(first, last + 1)]
+
+            self._add_page_queries(
+                page,
+                next_params={self.page_kwarg: page.number + 1},
+                previous_params={self.page_kwarg: page.number - 1},
+                last_params=lambda: number_params(paginator.num_pages),
+                nearby_params=nearby_params,
+            )
+            return paginator, page, object_list, is_paginated
+
+        paginator = CursorPaginator(queryset, page_size, ordering)
+        cursor = self.request.GET.get(self.cursor_kwarg)
+        page_number = self.kwargs.get(self.page_kwarg) or self.request.GET.get(self.page_kwarg)
+
+        if cursor or not page_number or page_number == '1':
+            page = paginator.page(cursor)
+        else:
+            page = paginator.page_at(page_number)
+
+        # Page 1 gets its clean URL rather than a backwards cursor
+        previous_params = (
+            {} if page.number <= 2 else {self.cursor_kwarg: page.previous_cursor}
+        )
+        current_params = {self.cursor_kwarg: cursor} if cursor else {self.page_kwarg: page.number}
+
+        def nearby_params():
+            pages = []
+            for number, page_cursor in page.nearby_cursors(self.nearby_page_links):
+                if number == 1:
+                    params = {}
+                elif page_cursor is None:  # this page
+                    params = current_params
+                else:
+                    params = {self.cursor_kwarg: page_cursor}
+                pages.append((number, params))
+            return pages
+
+        self._add_page_queries(
+            page,
+            next_params={self.cursor_kwarg: page.next_cursor},
+            previous_params=previous_params,
+            last_params=lambda: {self.cursor_kwarg: paginator.last_cursor()},
+            nearby_params=nearby_params,
+        )
+        return paginator, page, page.object_list, page.has_other_pages()
+
+    def _add_page_queries(self, page, next_params, previous_params, last_params, nearby_params):
+        def query(params):
+            data = self.request.GET.copy()
+            data.pop(self.page_kwarg, None)
+            data.pop(self.cursor_kwarg, None)
+            for key, value in params.items():
+                data[key] = value
+            return data.urlencode()
+
+        page.next_query = query(next_params)
+        page.previous_query = query(previous_params)
+        page.first_query = query({})
+        # Templates call these, so nothing extra is read unless they're shown
+        page.last_query = lambda: query(last_params())
+        page.nearby_pages = lambda: [(number, query(params)) for number, params in nearby_params()]
@@ -0,0 +1,347 @@
+# research/quick_search.py
+"""
+In-memory inverted index for the navbar quick-search.
+
+Every worker keeps a token -> sorted array of paper ids map plus the
+small JSON payload the navbar renders, so each debounced keystroke is
+answered without a database round trip. Query terms are matched as
+prefixes (like search_papers()) against a sorted vocabulary with bisect,
+which gives the same lookups as a prefix trie at a fraction of the memory.
+
+The index is built once per worker (gunicorn post_worker_init, or lazily
+on first use). The receivers in research/signals.py keep it current for
+changes made in this worker; for changes made anywhere else (another
+worker, a management command, the shell) it compares the shared cache
+generations of the data it holds with the ones it is current for. Once
+they have moved, search() answers None, so the caller falls back to the
+database and build_in_background() rebuilds the index. Bumps made by
+this worker's own changes, which the index has already applied, move its
+generations along with them (see applied()).
+Anything it can't answer (filters, no hits) goes to the database search.
+"""
+import bisect
+import logging
+import sys
+import threading
+from array import array
+
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Prefetch
+
+from .caching import generation_key, get_generation
+
+from .search import TOKEN_RE, _author_search_text, author_index_prefetch, tokenize
+
+logger = logging.getLogger(__name__)
+
+MAX_RESULTS = 8
+MAX_KEYWORDS = 6
+
+# Cache generations of what the index holds (see research/caching.py)
+GENERATION_DOMAINS = ('papers', 'authors', 'keywords')
+
+
+def _paper_queryset(paper_ids=None):
+    from .models import Keyword, ResearchPaper
+
+    qs = ResearchPaper.objects.only(
+        'id', 'title', 'abstract', 'strand', 'research_design', 'publication_date'
+    ).prefetch_related(
+        # Stored names only: no per-author query for the public name or search text
+        author_index_prefetch(),
+        Prefetch('keywords', queryset=Keyword.objects.only('id', 'word')),
+    )
+    if paper_ids is not None:
+        qs = qs.filter(pk__in=paper_ids)
+    return qs
+
+
+def _entry(paper):
+    """(payload, sort_key, title_tokens, all_tokens) for one paper."""
+    authors = sorted(paper.author.all(), key=lambda a: (a.last_name, a.first_name))
+    keywords = [k.word for k in paper.keywords.all()]
+    payload = {
+        'id': paper.id,
+        'title': paper.title,
+        'strand': paper.strand or '',
+        'design': paper.get_research_design_display() if paper.research_design else '',
+        'authors': [a.display_name_public() for a in authors],
+        'keywords': keywords[:MAX_KEYWORDS],
+    }
+
+    text = ' '.join(
+        [paper.title or '', paper.abstract or '', ' '.join(keywords)] +
+        [_author_search_text(a) for a in authors]
+    )
+    title_tokens = frozenset(TOKEN_RE.findall((paper.title or '').lower()))
+    tokens = frozenset(TOKEN_RE.findall(text.lower()))
+
+    # Newest first, then id, same as the database search tie-break
+    date = paper.publication_date
+    sort_key = (-date.toordinal() if date else 0, paper.id)
+    return payload, sort_key, title_tokens, tokens
+
+
+class QuickSearchIndex:
+    """Thread-safe inverted index over all research papers."""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._reset()
+        self._ready = False
+        self._building = False
+        self._pending = set()
+        # generation_key(domain) -> generation the current index was built at
+        self._generations = {}
+
+    def _reset(self):
+        self._postings = {}       # token -> array('I') of paper ids, sorted
+        self._vocabulary = []     # sorted tokens, for prefix lookups
+        self._payloads = {}       # paper id -> navbar JSON payload
+        self._sort_keys = {}      # paper id -> (-publication ordinal, id)
+        self._title_tokens = {}   # paper id -> frozenset of title tokens
+        self._tokens = {}         # paper id -> frozenset of all tokens
+
+    @property
+    def ready(self):
+        return self._ready
+
+    def stale(self):
+        """Whether the data changed somewhere the index hasn't seen."""
+        return cache.get_many(list(self._generations)) != self._generations
+
+    def applied(self, generations):
+        """
+        Take ``generations`` (from bump_generation()) as current: they were
+        bumped for a change this index has applied already. Only a bump
+        right after the generation the index is current for is taken; a
+        gap means another process changed the data too, and the index stays
+        stale until it's rebuilt.
+        """
+        with self._lock:
+            for key, generation in generations.items():
+                if key in self._generations and self._generations[key] == generation - 1:
+                    self._generations[key] = generation
+
+    # -------------------------
+    # Building
+    # -------------------------
+
+    def build(self):
+        """Load every paper from the database and swap the new index in."""
+        with self._lock:
+            if self._building:
+                return
+            self._building = True
+            self._pending.clear()
+
+        try:
+            # Read before the snapshot, so changes made while it loads
+            # leave the index stale rather than missing
+            generations = {generation_key(domain): get_generation(domain) for domain in GENERATION_DOMAINS}
+            entries = {paper.id: _entry(paper) for paper in _paper_queryset().iterator(chunk_size=200)}
+        except Exception:
+            with self._lock:
+                self._building = False
+            raise
+
+        postings = {}
+        for paper_id in sorted(entries):
+            for token in entries[paper_id][3]:
+                postings.setdefault(token, array('I')).append(paper_id)
+
+        with self._lock:
+            self._reset()
+            for paper_id, (payload, sort_key, title_tokens, tokens) in entries.items():
+                self._payloads[paper_id] = payload
+                self._sort_keys[paper_id] = sort_key
+                self._title_tokens[paper_id] = title_tokens
+                self._tokens[paper_id] = tokens
+            self._postings = postings
+            self._vocabulary = sorted(postings)
+            self._generations = generations
+            self._ready = True
+            self._building = False
+            pending, self._pending = self._pending, set()
+
+        # Changes made while the snapshot was loading
+        if pending:
+            self.update(pending)
+
+    def build_in_background(self):
+        """Start a build on a daemon thread unless one is running or the index is current."""
+        with self._lock:
+            if self._building or (self._ready and not self.stale()):
+                return
+        thread = threading.Thread(target=self._build_and_close, name='quick-search-index', daemon=True)
+        thread.start()
+        return thread
+
+    def _build_and_close(self):
+        try:
+            self.build()
+            logger.info("Quick-search index built: %s", self.memory_report())
+        except Exception:
+            logger.exception("Quick-search index build failed")
+        finally:
+            connection.close()
+
+    # -------------------------
+    # Incremental updates
+    # -------------------------
+
+    def update(self, paper_ids):
+        """Re-read the given papers; ids that no longer exist are dropped."""
+        paper_ids = {pid for pid in paper_ids if pid is not None}
+        if not paper_ids:
+            return
+
+        with self._lock:
+            if self._building:
+                self._pending.update(paper_ids)
+                return
+            if not self._ready:
+                return
+
+        entries = {paper.id: _entry(paper) for paper in _paper_queryset(paper_ids)}
+
+        with self._lock:
+            for paper_id in paper_ids:
+                self._remove(paper_id)
+            for paper_id, entry in entries.items():
+                self._add(paper_id, *entry)
+
+    def remove(self, paper_ids):
+        with self._lock:
+            if self._building:
+                self._pending.update(paper_ids)
+                return
+            for paper_id in paper_ids:
+                self._remove(paper_id)
+
+    def schedule_update(self, paper_ids):
+        """Update once the current transaction commits, so rollbacks never leak in."""
+        paper_ids = list(paper_ids)
+        if paper_ids and (self._ready or self._building):
+            transaction.on_commit(lambda: self.update(paper_ids))
+
+    def schedule_remove(self, paper_ids):
+        paper_ids = list(paper_ids)
+        if paper_ids and (self._ready or self._building):
+            transaction.on_commit(lambda: self.remove(paper_ids))
+
+    def _add(self, paper_id, payload, sort_key, title_tokens, tokens):
+        self._payloads[paper_id] = payload
+        self._sort_keys[paper_id] = sort_key
+        self._title_tokens[paper_id] = title_tokens
+        self._tokens[paper_id] = tokens
+        for token in tokens:
+            ids = self._postings.get(token)
+            if ids is None:
+                self._postings[token] = array('I', [paper_id])
+                bisect.insort(self._vocabulary, token)
+                continue
+            pos = bisect.bisect_left(ids, paper_id)
+            if pos == len(ids) or ids[pos] != paper_id:
+                ids.insert(pos, paper_id)
+
+    def _remove(self, paper_id):
+        tokens = self._tokens.pop(paper_id, None)
+        if tokens is None:
+            return
+        self._payloads.pop(paper_id, None)
+        self._sort_keys.pop(paper_id, None)
+        self._title_tokens.pop(paper_id, None)
+        for token in tokens:
+            ids = self._postings.get(token)
+            if ids is None:
+                continue
+            pos = bisect.bisect_left(ids, paper_id)
+            if pos < len(ids) and ids[pos] == paper_id:
+                del ids[pos]
+            if not ids:
+                del self._postings[token]
+                pos = bisect.bisect_left(self._vocabulary, token)
+                if pos < len(self._vocabulary) and self._vocabulary[pos] == token:
+                    del self._vocabulary[pos]
+
+    # -------------------------
+    # Querying
+    # -------------------------
+
+    def _prefix_ids(self, prefix):
+        """Union of the posting lists of every token starting with ``prefix``."""
+        ids = set()
+        pos = bisect.bisect_left(self._vocabulary, prefix)
+        while pos < len(self._vocabulary) and self._vocabulary[pos].startswith(prefix):
+            ids.update(self._postings[self._vocabulary[pos]])
+            pos += 1
+        return ids
+
+    def search(self, q, limit=MAX_RESULTS):
+        """
+        Return (results, total) like the navbar JSON, or None while the
+        index isn't ready or is stale. Every term must match as a prefix;
+        papers with the terms in their title come first, then newest first.
+        """
+        terms = tokenize(q)
+        if not terms:
+            return [], 0
+        if not self._ready or self.stale():
+            return None
+
+        with self._lock:
+            if not self._ready:
+                return None
+
+            matches = None
+            for ids in sorted((self._prefix_ids(term) for term in terms), key=len):
+                matches = ids if matches is None else matches & ids
+                if not matches:
+                    return [], 0
+
+            def rank(paper_id):
+                title = self._title_tokens[paper_id]
+                hits = sum(1 for term in terms if any(t.startswith(term) for t in title))
+                return (-hits, self._sort_keys[paper_id])
+
+            top = sorted(matches, key=rank)[:limit]
+            return [dict(self._payloads[pid]) for pid in top], len(matches)
+
+    # -------------------------
+    # Memory budget
+    # -------------------------
+
+    def memory_report(self):
+        """Approximate memory held by the index (sys.getsizeof, one level deep)."""
+        with self._lock:
+            postings_bytes = sys.getsizeof(self._postings) + sum(
+                sys.getsizeof(token) + sys.getsizeof(ids)
+                for token, ids in self._postings.items()
+            )
+            vocabulary_bytes = sys.getsizeof(self._vocabulary)
+            payload_bytes = sys.getsizeof(self._payloads) + sum(
+                sys.getsizeof(p) + sum(sys.getsizeof(v) for v in p.values())
+                + sum(sys.getsizeof(s) for s in p['authors'] + p['keywords'])
+                for p in self._payloads.values()
+            )
+            token_set_bytes = sum(
+                sys.getsizeof(s)
+                for mapping in (self._tokens, self._title_tokens)
+                for s in mapping.values()
+            ) + sys.getsizeof(self._sort_keys) + sum(
+                sys.getsizeof(k) for k in self._sort_keys.values()
+            )
+            total = postings_bytes + vocabulary_bytes + payload_bytes + token_set_bytes
+            return {
+                'papers': len(self._payloads),
+                'tokens': len(self._postings),
+                'postings': sum(len(ids) for ids in self._postings.values()),
+                'postings_kb': round(postings_bytes / 1024, 1),
+                'payloads_kb': round(payload_bytes / 1024, 1),
+                'total_mb': round(total / 1024 / 1024, 2),
+            }
+
+
+quick_search_index = QuickSearchIndex()
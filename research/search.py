@@ -0,0 +1,365 @@
+# research/search.py
+"""
+Full-text search over research papers.
+
+On PostgreSQL every paper keeps a weighted tsvector in
+``ResearchPaper.search_vector`` (GIN indexed, see migration 0018).
+On SQLite the same document is mirrored into an FTS5 table so dev and
+test databases rank results the same way.
+
+Typos are handled with trigram similarity: pg_trgm GIN indexes on
+paper titles, author last names and keywords (migration 0019), or a
+pure-Python trigram comparison on SQLite.
+
+The index is kept up to date by the receivers in research/signals.py;
+``python manage.py rebuild_search_index`` rebuilds it from scratch.
+"""
+import re
+
+from django.db import connection
+from django.db.models import Case, F, FloatField, Prefetch, Q, Value, When
+from django.contrib.postgres.search import (
+    SearchQuery, SearchRank, SearchVector, TrigramSimilarity, TrigramWordSimilarity,
+)
+
+FTS_TABLE = 'research_paper_fts'
+
+# Weights: title > keywords/authors > abstract
+FTS_WEIGHTS = (10.0, 4.0, 4.0, 1.0)
+
+MAX_TERMS = 8
+MAX_FALLBACK_RESULTS = 500
+MAX_SUGGESTIONS = 3
+
+# Same defaults as pg_trgm's similarity_threshold / word_similarity_threshold
+SIMILARITY_THRESHOLD = 0.3
+WORD_SIMILARITY_THRESHOLD = 0.6
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def tokenize(text):
+    """Split a user query into lowercase search terms (max MAX_TERMS)."""
+    if not text:
+        return []
+    return TOKEN_RE.findall(text.lower())[:MAX_TERMS]
+
+
+def _author_search_text(author):
+    """
+    Last names are always searchable. First name, middle initial and
+    suffix are only indexed for authors who consented to full-name display,
+    which is when the stored public_name is the full name.
+    """
+    if author.public_name and author.public_name == author.full_name:
+        return author.full_name
+    return author.last_name
+
+
+def author_index_prefetch():
+    """Prefetch for paper.author with just what _author_search_text() reads."""
+    from .models import Author
+
+    return Prefetch(
+        'author',
+        queryset=Author.objects.only(
+            'id', 'first_name', 'last_name', 'middle_initial', 'suffix', 'full_name', 'public_name', 'user'
+        ),
+    )
+
+
+def build_documents(paper_ids=None):
+    """Return {paper_id: {title, keywords, authors, abstract}} for indexing."""
+    from .models import Keyword, ResearchPaper
+
+    qs = ResearchPaper.objects.only('id', 'title', 'abstract').prefetch_related(
+        author_index_prefetch(),
+        Prefetch('keywords', queryset=Keyword.objects.only('id', 'word')),
+    )
+    if paper_ids is not None:
+        qs = qs.filter(pk__in=paper_ids)
+
+    documents = {}
+    for paper in qs:
+        documents[paper.pk] = {
+            'title': (paper.title or '').replace('*', ''),
+            'keywords': ' '.join(k.word.replace('*', '') for k in paper.keywords.all()),
+            'authors': ' '.join(_author_search_text(a) for a in paper.author.all()),
+            'abstract': (paper.abstract or '').replace('*', ''),
+        }
+    return documents
+
+
+def update_search_index(paper_ids=None):
+    """
+    Rebuild the search document for the given papers (all papers when
+    ``paper_ids`` is None). Ids of deleted papers are dropped from the index.
+    """
+    if paper_ids is not None:
+        paper_ids = {pid for pid in paper_ids if pid is not None}
+        if not paper_ids:
+            return 0
+
+    documents = build_documents(paper_ids)
+
+    if connection.vendor == 'postgresql':
+        _update_postgres(documents)
+    elif connection.vendor == 'sqlite':
+        _update_sqlite(documents, paper_ids)
+
+    return len(documents)
+
+
+def _update_postgres(documents):
+    from .models import ResearchPaper
+
+    for paper_id, doc in documents.items():
+        vector = (
+            SearchVector(Value(doc['title']), weight='A', config='simple') +
+            SearchVector(Value(doc['keywords']), weight='B', config='simple') +
+            SearchVector(Value(doc['authors']), weight='B', config='simple') +
+            SearchVector(Value(doc['abstract']), weight='C', config='simple')
+        )
+        # .update() bypasses save() so no signals fire again
+        ResearchPaper.objects.filter(pk=paper_id).update(search_vector=vector)
+
+
+def _update_sqlite(documents, paper_ids):
+    with connection.cursor() as cursor:
+        if paper_ids is None:
+            cursor.execute(f"DELETE FROM {FTS_TABLE}")
+        else:
+            ids = list(paper_ids)
+            placeholders = ', '.join(['%s'] * len(ids))
+            cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})", ids)
+
+        rows = [
+            (pid, doc['title'], doc['keywords'], doc['authors'], doc['abstract'])
+            for pid, doc in documents.items()
+        ]
+        if rows:
+            cursor.executemany(
+                f"INSERT INTO {FTS_TABLE} (rowid, title, keywords, authors, abstract) "
+                f"VALUES (%s, %s, %s, %s, %s)",
+                rows
+            )
+
+
+def remove_from_search_index(paper_ids):
+    """Drop papers from the SQLite FTS table (Postgres rows go with the paper)."""
+    paper_ids = [pid for pid in paper_ids if pid is not None]
+    if not paper_ids or connection.vendor != 'sqlite':
+        return
+    placeholders = ', '.join(['%s'] * len(paper_ids))
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})", paper_ids)
+
+
+def search_papers(queryset, q):
+    """
+    Filter ``queryset`` to papers matching ``q`` and order them by relevance.
+    Every term must match (the last one as a prefix, so quick-search works
+    while typing). Adds a ``search_rank`` annotation, higher is better.
+    """
+    terms = tokenize(q)
+    if not terms:
+        return queryset.none()
+
+    if connection.vendor == 'postgresql':
+        query = SearchQuery(
+            ' & '.join(f"{term}:*" for term in terms),
+            search_type='raw',
+            config='simple',
+        )
+        return queryset.filter(search_vector=query).annotate(
+            search_rank=SearchRank(F('search_vector'), query) + TrigramWordSimilarity(q, 'title')
+        ).order_by('-search_rank', '-publication_date', 'id')
+
+    if connection.vendor == 'sqlite':
+        return _search_sqlite(queryset, terms)
+
+    return _search_icontains(queryset, q)
+
+
+def _search_sqlite(queryset, terms):
+    match = ' AND '.join(f'"{term}"*' for term in terms)
+    weights = ', '.join(str(w) for w in FTS_WEIGHTS)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT rowid, bm25({FTS_TABLE}, {weights}) FROM {FTS_TABLE} "
+            f"WHERE {FTS_TABLE} MATCH %s ORDER BY 2 LIMIT %s",
+            [match, MAX_FALLBACK_RESULTS]
+        )
+        rows = cursor.fetchall()
+
+    # bm25() is lower-is-better; flip it so search_rank sorts like ts_rank
+    return _rank_by_scores(queryset, {pid: -score for pid, score in rows})
+
+
+def _rank_by_scores(queryset, scores):
+    """Restrict ``queryset`` to the ids in ``scores`` and annotate them as search_rank."""
+    if not scores:
+        return queryset.none()
+
+    rank = Case(
+        *[When(pk=pid, then=Value(score)) for pid, score in scores.items()],
+        default=Value(0.0),
+        output_field=FloatField(),
+    )
+    return queryset.filter(pk__in=list(scores)).annotate(
+        search_rank=rank
+    ).order_by('-search_rank', '-publication_date', 'id')
+
+
+def _search_icontains(queryset, q):
+    """Unindexed fallback for other database backends."""
+    return queryset.filter(
+        Q(title__icontains=q) |
+        Q(keywords__word__icontains=q) |
+        Q(author__last_name__icontains=q) |
+        Q(
+            author__first_name__icontains=q,
+            author__user__userprofile__consent_status='consented'
+        )
+    ).distinct()
+
+
+# -------------------------
+# Typo tolerance (trigrams)
+# -------------------------
+
+def trigrams(text):
+    """Trigram set of ``text``, padded per word the way pg_trgm does it."""
+    grams = set()
+    for word in TOKEN_RE.findall((text or '').lower()):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def similarity(a, b):
+    """Python equivalent of pg_trgm similarity()."""
+    ta, tb = trigrams(a), trigrams(b)
+    if not ta or not tb:
+        return 0.0
+    return len(ta & tb) / len(ta | tb)
+
+
+def word_similarity(q, text):
+    """
+    Approximation of pg_trgm word_similarity(): the share of the query's
+    trigrams that also appear somewhere in ``text``.
+    """
+    tq = trigrams(q)
+    if not tq:
+        return 0.0
+    return len(tq & trigrams(text)) / len(tq)
+
+
+def fuzzy_search_papers(queryset, q):
+    """
+    Typo-tolerant search used when search_papers() finds nothing.
+    Matches papers by title (word similarity), author last name or keyword.
+    """
+    if not tokenize(q):
+        return queryset.none()
+
+    if connection.vendor == 'postgresql':
+        from .models import Author, Keyword, ResearchPaper
+
+        author_papers = ResearchPaper.author.through.objects.filter(
+            author_id__in=Author.objects.filter(last_name__trigram_similar=q).values('id')
+        ).values('researchpaper_id')
+        keyword_papers = ResearchPaper.keywords.through.objects.filter(
+            keyword_id__in=Keyword.objects.filter(word__trigram_similar=q).values('id')
+        ).values('researchpaper_id')
+
+        return queryset.filter(
+            Q(title__trigram_word_similar=q) |
+            Q(pk__in=author_papers) |
+            Q(pk__in=keyword_papers)
+        ).annotate(
+            search_rank=TrigramWordSimilarity(q, 'title')
+        ).order_by('-search_rank', '-publication_date', 'id')
+
+    return _fuzzy_search_python(queryset, q)
+
+
+def _fuzzy_search_python(queryset, q):
+    from .models import Author, Keyword
+
+    scores = {}
+    papers = queryset.only('id', 'title').prefetch_related(None).prefetch_related(
+        Prefetch('author', queryset=Author.objects.only('id', 'last_name')),
+        Prefetch('keywords', queryset=Keyword.objects.only('id', 'word')),
+    )
+    for paper in papers:
+        title_score = word_similarity(q, paper.title)
+        other_score = max(
+            [similarity(q, a.last_name) for a in paper.author.all()] +
+            [similarity(q, k.word) for k in paper.keywords.all()] +
+            [0.0]
+        )
+        if title_score >= WORD_SIMILARITY_THRESHOLD or other_score >= SIMILARITY_THRESHOLD:
+            scores[paper.pk] = max(title_score, other_score)
+        if len(scores) >= MAX_FALLBACK_RESULTS:
+            break
+
+    return _rank_by_scores(queryset, scores)
+
+
+def suggest(q, limit=MAX_SUGGESTIONS):
+    """
+    "Did you mean" candidates for ``q``: the closest keywords, author last
+    names and paper titles, best match first.
+    """
+    if not tokenize(q):
+        return []
+
+    from .models import Author, Keyword, ResearchPaper
+
+    if connection.vendor == 'postgresql':
+        candidates = list(
+            Keyword.objects.filter(word__trigram_similar=q)
+            .annotate(score=TrigramSimilarity('word', q))
+            .order_by('-score').values_list('word', 'score')[:limit]
+        )
+        candidates += list(
+            Author.objects.filter(last_name__trigram_similar=q)
+            .annotate(score=TrigramSimilarity('last_name', q))
+            .order_by('-score').values_list('last_name', 'score').distinct()[:limit]
+        )
+        candidates += list(
+            ResearchPaper.objects.filter(title__trigram_word_similar=q)
+            .annotate(score=TrigramWordSimilarity(q, 'title'))
+            .order_by('-score').values_list('title', 'score')[:limit]
+        )
+    else:
+        candidates = [
+            (word, similarity(q, word))
+            for word in Keyword.objects.values_list('word', flat=True)
+        ]
+        candidates += [
+            (name, similarity(q, name))
+            for name in Author.objects.values_list('last_name', flat=True).distinct()
+        ]
+        candidates += [
+            (title, word_similarity(q, title))
+            for title in ResearchPaper.objects.values_list('title', flat=True)
+        ]
+        candidates = [
+            (text, score) for text, score in candidates
+            if score >= SIMILARITY_THRESHOLD
+        ]
+
+    suggestions = []
+    seen = {q.strip().casefold()}
+    for text, _ in sorted(candidates, key=lambda item: item[1], reverse=True):
+        text = text.replace('*', '')
+        if text.casefold() in seen:
+            continue
+        seen.add(text.casefold())
+        suggestions.append(text)
+        if len(suggestions) >= limit:
+            break
+    return suggestions
@@ -0,0 +1,258 @@
+# research/signals.py
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import (
+    post_save, post_delete, pre_save, pre_delete, post_init, m2m_changed,
+)
+from django.dispatch import receiver
+
+from .models import ResearchPaper, Author, Keyword, Award
+from .search import update_search_index, remove_from_search_index
+from .quick_search import quick_search_index
+from .caching import bump_generation, bump_paper_versions
+from .stats import BREAKDOWNS, count_keyword, count_paper
+
+
+# -------------------------
+# Helpers
+# -------------------------
+
+def changed_paper_ids(instance, action, reverse, pk_set):
+    """
+    Paper ids touched by an m2m_changed signal on ResearchPaper.author or
+    ResearchPaper.keywords, from either side of the relation.
+    Reverse clears don't carry pk_set, so the ids are stashed on pre_clear.
+    """
+    if not reverse:
+        return [instance.pk]
+
+    if action == "pre_clear":
+        instance._cleared_paper_ids = list(
+            instance.researchpaper_set.values_list("id", flat=True)
+        )
+        return []
+
+    if action == "post_clear":
+        return getattr(instance, "_cleared_paper_ids", [])
+
+    return list(pk_set or [])
+
+
+def after_commit(func, *args):
+    """
+    Call func(*args) once the current transaction commits (right away
+    outside one). Cache stamps must move after the new rows are visible:
+    bumped earlier, a concurrent request could cache the old rows under
+    the new stamp, and a rollback would have invalidated for nothing.
+    """
+    transaction.on_commit(partial(func, *args))
+
+
+def bump_indexed_generation(*domains):
+    """
+    bump_generation() for a change this worker's quick-search index has
+    applied already: the update scheduled by reindex_papers() runs first,
+    so only changes made elsewhere leave the index stale.
+    """
+    quick_search_index.applied(bump_generation(*domains))
+
+
+def reindex_papers(paper_ids):
+    """
+    Refresh the database search index, this worker's quick-search index
+    and the version stamps behind the paper pages' ETags.
+    """
+    paper_ids = list(paper_ids)
+    update_search_index(paper_ids)
+    quick_search_index.schedule_update(paper_ids)
+    after_commit(bump_paper_versions, paper_ids)
+
+
+def remember_paper_ids(instance):
+    """Stash an author's/keyword's papers before the through rows are deleted."""
+    instance._deleted_paper_ids = list(
+        instance.researchpaper_set.values_list("id", flat=True)
+    )
+
+
+# -------------------------
+# Search index maintenance
+# -------------------------
+
+@receiver(post_save, sender=ResearchPaper)
+def index_paper_on_save(sender, instance, **kwargs):
+    reindex_papers([instance.pk])
+
+
+@receiver(post_delete, sender=ResearchPaper)
+def unindex_paper_on_delete(sender, instance, **kwargs):
+    remove_from_search_index([instance.pk])
+    quick_search_index.schedule_remove([instance.pk])
+    after_commit(bump_paper_versions, [instance.pk])
+
+
+@receiver(m2m_changed, sender=ResearchPaper.author.through)
+@receiver(m2m_changed, sender=ResearchPaper.keywords.through)
+def index_papers_on_m2m_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ["pre_clear", "post_add", "post_remove", "post_clear"]:
+        return
+
+    paper_ids = changed_paper_ids(instance, action, reverse, pk_set)
+    if paper_ids:
+        reindex_papers(paper_ids)
+        # Other workers' quick-search indexes hold authors and keywords too
+        after_commit(bump_indexed_generation, "papers")
+
+
+@receiver(post_save, sender=Author)
+@receiver(post_save, sender=Keyword)
+def index_papers_on_name_change(sender, instance, created, **kwargs):
+    if created:
+        return
+    reindex_papers(instance.researchpaper_set.values_list("id", flat=True))
+
+
+@receiver(pre_delete, sender=Author)
+@receiver(pre_delete, sender=Keyword)
+def remember_papers_on_delete(sender, instance, **kwargs):
+    remember_paper_ids(instance)
+
+
+@receiver(post_delete, sender=Author)
+@receiver(post_delete, sender=Keyword)
+def index_papers_on_delete(sender, instance, **kwargs):
+    reindex_papers(getattr(instance, "_deleted_paper_ids", []))
+
+
+# -------------------------
+# Cache generations (see research/caching.py)
+# -------------------------
+
+CACHE_DOMAINS = {
+    ResearchPaper: "papers",
+    Author: "authors",
+    Keyword: "keywords",
+    Award: "awards",
+}
+
+
+@receiver([post_save, post_delete], sender=ResearchPaper)
+@receiver([post_save, post_delete], sender=Author)
+@receiver([post_save, post_delete], sender=Keyword)
+@receiver([post_save, post_delete], sender=Award)
+def bump_cache_generation(sender, **kwargs):
+    after_commit(bump_indexed_generation, CACHE_DOMAINS[sender])
+
+
+@receiver(m2m_changed, sender=ResearchPaper.awards.through)
+def bump_papers_on_award_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == "pre_clear" and reverse:
+        instance._cleared_paper_ids = list(instance.research_papers.values_list("id", flat=True))
+    if action not in ["post_add", "post_remove", "post_clear"]:
+        return
+
+    # Facet bitmaps include award membership
+    after_commit(bump_indexed_generation, "papers")
+    if not reverse:
+        after_commit(bump_paper_versions, [instance.pk])
+    elif action == "post_clear":
+        after_commit(bump_paper_versions, getattr(instance, "_cleared_paper_ids", []))
+    else:
+        after_commit(bump_paper_versions, list(pk_set or []))
+
+
+@receiver(post_save, sender=Award)
+def bump_papers_on_award_rename(sender, instance, created, **kwargs):
+    if not created:
+        after_commit(bump_paper_versions, list(instance.research_papers.values_list("id", flat=True)))
+
+
+@receiver(pre_delete, sender=Award)
+def remember_award_papers(sender, instance, **kwargs):
+    instance._deleted_paper_ids = list(instance.research_papers.values_list("id", flat=True))
+
+
+@receiver(post_delete, sender=Award)
+def bump_papers_on_award_delete(sender, instance, **kwargs):
+    after_commit(bump_paper_versions, getattr(instance, "_deleted_paper_ids", []))
+
+
+# -------------------------
+# Repository statistics (see research/stats.py)
+# -------------------------
+
+def paper_breakdown(paper):
+    return {field: getattr(paper, field) for field in BREAKDOWNS}
+
+
+@receiver(pre_save, sender=ResearchPaper)
+def remember_paper_breakdown(sender, instance, **kwargs):
+    instance._saved_breakdown = None
+    if not instance._state.adding:
+        instance._saved_breakdown = (
+            ResearchPaper.objects.filter(pk=instance.pk).values(*BREAKDOWNS).first()
+        )
+
+
+@receiver(post_save, sender=ResearchPaper)
+def count_paper_on_save(sender, instance, created, **kwargs):
+    current = paper_breakdown(instance)
+    previous = getattr(instance, "_saved_breakdown", None)
+    if created or previous is None:
+        count_paper(current, 1)
+    elif previous != current:
+        count_paper(previous, -1)
+        count_paper(current, 1)
+
+
+@receiver(post_delete, sender=ResearchPaper)
+def count_paper_on_delete(sender, instance, **kwargs):
+    count_paper(paper_breakdown(instance), -1)
+
+
+@receiver(post_save, sender=Keyword)
+def count_keyword_on_save(sender, instance, created, **kwargs):
+    if created:
+        count_keyword(1)
+
+
+@receiver(post_delete, sender=Keyword)
+def count_keyword_on_delete(sender, instance, **kwargs):
+    count_keyword(-1)
+
+
+# -------------------------
+# Consent changes
+# -------------------------
+
+@receiver(post_init, sender="accounts.UserProfile")
+def remember_consent_status(sender, instance, **kwargs):
+    # Skip deferred loads (.only() querysets) so this never costs a query
+    if "consent_status" in instance.get_deferred_fields():
+        instance._loaded_consent_status = None
+    else:
+        instance._loaded_consent_status = instance.consent_status
+
+
+@receiver(post_save, sender="accounts.UserProfile")
+def index_papers_on_consent_change(sender, instance, created, **kwargs):
+    if created or instance._loaded_consent_status == instance.consent_status:
+        return
+
+    instance._loaded_consent_status = instance.consent_status
+    consented = instance.consent_status == 'consented'
+    # Cached author lists show public names
+    after_commit(bump_indexed_generation, "authors")
+    for author in Author.objects.filter(user_id=instance.user_id):
+        author.refresh_names(consented)
+        # .update() so the Author post_save receivers don't reindex twice
+        Author.objects.filter(pk=author.pk).update(
+            full_name=author.full_name, public_name=author.public_name
+        )
+
+    reindex_papers(
+        ResearchPaper.objects.filter(
+            author__user_id=instance.user_id
+        ).values_list("id", flat=True)
+    )
@@ -108,10 +108,20 @@
 
     // ── Render results ─────────────────────────────────────────────
     function renderResults(data, query) {
-        const { results, total } = data;
+        const { results, total, suggestions } = data;
+
+        // "Did you mean" links — only sent when the server fell back to fuzzy matching
+        const suggestionsHtml = suggestions && suggestions.length
+            ? `<div class="search-results-header">Did you mean:
+                   ${suggestions.map(s =>
+                       `<a href="${searchUrl}?q=${encodeURIComponent(s)}">${escHtml(s)}</a>`
+                   ).join(', ')}
+               </div>`
+            : '';
 
         if (!results || results.length === 0) {
             resultsBox.innerHTML = `
+                ${suggestionsHtml}
                 <div class="search-results-empty">
                     <i class="bi bi-search"></i>
                     No papers found for <strong>${escHtml(query)}</strong>
@@ -120,7 +130,7 @@
             return;
         }
 
-        let html = `<div class="search-results-header">Papers</div>`;
+        let html = suggestionsHtml + `<div class="search-results-header">Papers</div>`;
 
         results.forEach(paper => {
             const title   = highlightMatch(paper.title, query);
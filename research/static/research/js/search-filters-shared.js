@@ -88,6 +88,7 @@ async function updateResults() {
         if (filterConfig.updateCallback) {
             filterConfig.updateCallback(temp);
         }
+        applyFacetCounts();
 
         history.replaceState(null, "", `?${params.toString()}`);
         renderAppliedFilters();
@@ -141,6 +142,28 @@ function updateResearchDesignOptions() {
     if (currentValue && !allowedOptions.includes(currentValue)) {
         researchDesign.value = '';
     }
+
+    applyFacetCounts();
+}
+
+// ── Facet counts ──────────────────────────────────────────────────
+// The results partial embeds {facet: {value: count}} as #facet-counts;
+// show each count next to its dropdown option.
+function applyFacetCounts() {
+    const data = document.getElementById("facet-counts");
+    if (!data) return;
+
+    const counts = JSON.parse(data.textContent);
+    Object.entries(counts).forEach(([facet, valueCounts]) => {
+        const select = document.getElementById(facet);
+        if (!select) return;
+
+        Array.from(select.options).forEach(option => {
+            if (!option.value) return;
+            if (!option.dataset.label) option.dataset.label = option.textContent.trim();
+            option.textContent = `${option.dataset.label} (${valueCounts[option.value] || 0})`;
+        });
+    });
 }
 
 // ── Event listeners ───────────────────────────────────────────────
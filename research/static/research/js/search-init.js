@@ -20,6 +20,8 @@ document.addEventListener("DOMContentLoaded", () => {
     if (filterElements.researchDesign) {
         updateResearchDesignOptions();
     }
+
+    applyFacetCounts();
     
     // Initialize pre-selected filters from URL
     initializePreselectedFilters();
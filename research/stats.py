@@ -0,0 +1,133 @@
+# research/stats.py
+"""
+Repository statistics for the home and about pages.
+
+Each figure is a plain integer in the cache, one key per counter
+(``stats_papers``, ``stats_keywords``, ``stats_strand_STEM``, ...). The
+receivers in research/signals.py incr/decr them as papers and keywords
+are saved and deleted, so reading the stats is two get_many calls and no
+query.
+
+recount_stats() rebuilds every counter from the database. It runs when
+counters are missing (cold or evicted cache, a school year seen for the
+first time) and otherwise every RECONCILE_INTERVAL, which also corrects
+drift from writes that send no signals (QuerySet.update(), bulk_create(),
+rolled-back transactions).
+"""
+from django.core.cache import cache
+from django.db.models import Count
+
+RECONCILE_INTERVAL = 60 * 60 * 6
+RECOUNT_LOCK_TIMEOUT = 30
+
+# Paper fields broken down in the stats block
+BREAKDOWNS = ('strand', 'school_year', 'research_design')
+
+# {breakdown: [value, ...]} as of the last recount; never expires
+LABELS_KEY = 'stats_labels'
+# Present while the counters are considered reconciled
+RECONCILED_KEY = 'stats_reconciled'
+RECOUNT_LOCK_KEY = 'stats_recount_lock'
+
+PAPERS_KEY = 'stats_papers'
+KEYWORDS_KEY = 'stats_keywords'
+
+
+def counter_key(breakdown, value):
+    return f'stats_{breakdown}_{value}'
+
+
+def _incr(key, delta):
+    try:
+        cache.incr(key, delta)
+    except ValueError:
+        # Unknown counter: let the next read rebuild them all
+        cache.delete(RECONCILED_KEY)
+
+
+def count_paper(values, delta):
+    """Add ``delta`` to the counters of a paper with ``values`` ({field: value})."""
+    _incr(PAPERS_KEY, delta)
+    for breakdown in BREAKDOWNS:
+        _incr(counter_key(breakdown, values[breakdown]), delta)
+
+
+def count_keyword(delta):
+    _incr(KEYWORDS_KEY, delta)
+
+
+def recount_stats():
+    """Rebuild every counter from the database; returns the counts like site_stats()."""
+    from .models import Keyword, ResearchPaper
+
+    counts = {KEYWORDS_KEY: Keyword.objects.count()}
+    labels = {}
+    for breakdown in BREAKDOWNS:
+        rows = (
+            ResearchPaper.objects.order_by(breakdown)
+            .values_list(breakdown)
+            .annotate(n=Count('id'))
+        )
+        labels[breakdown] = [value for value, _ in rows]
+        counts.update({counter_key(breakdown, value): n for value, n in rows})
+    # Every paper has a strand
+    counts[PAPERS_KEY] = sum(counts[counter_key('strand', v)] for v in labels['strand'])
+
+    cache.set_many(counts, None)
+    cache.set(LABELS_KEY, labels, None)
+    cache.set(RECONCILED_KEY, 1, RECONCILE_INTERVAL)
+    return _build(labels, counts)
+
+
+def _build(labels, counts):
+    from .models import ResearchPaper
+
+    display = {
+        'strand': dict(ResearchPaper.STRAND_CHOICES),
+        'research_design': dict(ResearchPaper.RESEARCH_DESIGN_CHOICES),
+        'school_year': {},
+    }
+    stats = {
+        'paper_count': counts[PAPERS_KEY],
+        'keyword_count': counts[KEYWORDS_KEY],
+    }
+    for breakdown in BREAKDOWNS:
+        stats[f'papers_by_{breakdown}'] = [
+            (display[breakdown].get(value, value), counts[counter_key(breakdown, value)])
+            for value in labels[breakdown]
+            if counts[counter_key(breakdown, value)] > 0
+        ]
+    return stats
+
+
+def site_stats():
+    """
+    Paper and keyword totals plus papers per strand, school year and
+    research design, for the home/about templates.
+    """
+    state = cache.get_many([LABELS_KEY, RECONCILED_KEY])
+    labels = state.get(LABELS_KEY)
+    counts = {}
+    if labels is not None:
+        keys = [PAPERS_KEY, KEYWORDS_KEY] + [
+            counter_key(breakdown, value)
+            for breakdown in BREAKDOWNS
+            for value in labels[breakdown]
+        ]
+        counts = cache.get_many(keys)
+        complete = len(counts) == len(keys)
+    else:
+        complete = False
+
+    if complete and RECONCILED_KEY in state:
+        return _build(labels, counts)
+
+    # One caller recounts; the others keep the current counters if they can
+    if cache.add(RECOUNT_LOCK_KEY, 1, RECOUNT_LOCK_TIMEOUT):
+        try:
+            return recount_stats()
+        finally:
+            cache.delete(RECOUNT_LOCK_KEY)
+    if complete:
+        return _build(labels, counts)
+    return recount_stats()
@@ -0,0 +1,56 @@
+# research/templatetags/paper_cards.py
+from django import template
+from django.core.cache import cache
+from django.db.models import Prefetch, prefetch_related_objects
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from research.caching import paper_versions
+from research.models import Award, Keyword, author_prefetch
+
+register = template.Library()
+
+CARD_TEMPLATE = 'research/partials/paper_card.html'
+CARD_TIMEOUT = 60 * 60 * 24
+
+
+def card_key(paper_id, version):
+    return f'paper_card_{paper_id}_{version}'
+
+
+@register.simple_tag
+def paper_cards(papers):
+    """
+    Render the paper cards of a list page from cached fragments.
+
+    Fragments are keyed by the paper's version stamp, which the receivers
+    in research/signals.py bump whenever the paper, its authors (names or
+    consent), keywords or awards change. Cards look the same to every
+    viewer, so there is nothing per-user in the key. Hits cost one
+    get_many; only the misses are prefetched and rendered.
+    """
+    papers = list(papers)
+    if not papers:
+        return ''
+
+    versions = paper_versions([paper.id for paper in papers])
+    keys = {paper.id: card_key(paper.id, versions[paper.id]) for paper in papers}
+    cached = cache.get_many(list(keys.values()))
+
+    missing = [paper for paper in papers if keys[paper.id] not in cached]
+    if missing:
+        # No-op for relations the view already prefetched
+        prefetch_related_objects(
+            missing,
+            author_prefetch(),
+            Prefetch('keywords', Keyword.objects.only('id', 'word')),
+            Prefetch('awards', Award.objects.only('id', 'name')),
+        )
+        rendered = {
+            keys[paper.id]: render_to_string(CARD_TEMPLATE, {'paper': paper})
+            for paper in missing
+        }
+        cache.set_many(rendered, CARD_TIMEOUT)
+        cached.update(rendered)
+
+    return mark_safe(''.join(cached[keys[paper.id]] for paper in papers))
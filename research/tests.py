@@ -1,3 +1,1004 @@
-from django.test import TestCase
+import gzip
+import os
+import tempfile
+import threading
+import time
+from datetime import date
+from unittest import mock
 
-# Create your tests here.
+import httpx
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.views.generic import ListView
+
+import sqlite_cache
+from accounts.models import User, UserProfile
+from storage import DiskLRUCache, FileStream, ObjectInfoCache, SupabaseStorage
+from .caching import (
+    bump_generation, get_generation, list_version, memoize, paper_version, versioned_key,
+)
+from .facets import get_bitmaps
+from .models import Author, Award, Keyword, ResearchPaper, StoredFile
+from .names import name_key
+from .pagination import CursorPaginationMixin, CursorPaginator, decode_cursor, encode_cursor
+from .quick_search import QuickSearchIndex
+from .search import (
+    _search_icontains, fuzzy_search_papers, search_papers, similarity, suggest, word_similarity,
+)
+from .stats import site_stats
+from .templatetags.paper_cards import paper_cards
+from .views import IndexView
+from .warmup import _render, warm_cache
+
+
+class PaperListQueryCountTests(TestCase):
+    """
+    Listing papers must cost a fixed number of queries: authors, keywords
+    and awards come from prefetches, never one query per paper card.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.counter = 0
+        self.student = User.objects.create_user(
+            email='student@example.com', password='pw', role='shs_student'
+        )
+        profile = self.student.userprofile
+        profile.is_approved = True
+        profile.consent_status = 'consented'
+        profile.save()
+
+    def add_papers(self, count):
+        for _ in range(count):
+            self.counter += 1
+            n = self.counter
+            paper = ResearchPaper.objects.create(
+                title=f'Plant growth study {n}',
+                abstract='Effects of light on plant growth.',
+                publication_date=date(2024, 1 + n % 12, 1),
+                grade_level=12,
+                strand='STEM',
+                research_design='QUANTITATIVE',
+                school_year='2023-2024',
+            )
+            user = User.objects.create_user(email=f'author{n}@example.com', password='pw')
+            paper.author.add(
+                Author.objects.create(first_name='Ana', last_name=f'Zamora{n}', user=user),
+                Author.objects.create(first_name='Ben', last_name=f'Abad{n}'),
+            )
+            paper.keywords.add(Keyword.objects.create(word=f'plants{n}'))
+            paper.awards.add(Award.objects.create(name=f'Best Paper {n}'))
+            self.student.userprofile.assigned_papers.add(paper)
+
+    def count_queries(self, url, **headers):
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, headers=headers)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def assertConstantQueries(self, url, **headers):
+        self.add_papers(1)
+        one_paper = self.count_queries(url, **headers)
+        self.add_papers(5)
+        six_papers = self.count_queries(url, **headers)
+        self.assertEqual(one_paper, six_papers)
+
+    def test_index(self):
+        self.assertConstantQueries(reverse('research:index'))
+
+    def test_strand(self):
+        self.assertConstantQueries(reverse('research:strand', args=['STEM']))
+
+    def test_strand_design(self):
+        self.assertConstantQueries(reverse('research:strand_design', args=['STEM', 'QUANTITATIVE']))
+
+    def test_search_page(self):
+        self.assertConstantQueries(reverse('research:search') + '?q=plant')
+
+    def test_search_results_partial(self):
+        self.assertConstantQueries(
+            reverse('research:search') + '?q=plant&strand=STEM',
+            x_requested_with='XMLHttpRequest', x_filter_update='true',
+        )
+
+    def test_navbar_json(self):
+        # A filter keeps the lookup on the database instead of the in-memory index
+        self.assertConstantQueries(
+            reverse('research:search') + '?q=plant&strand=STEM',
+            x_requested_with='XMLHttpRequest',
+        )
+
+    def test_student_dashboard(self):
+        self.client.force_login(self.student)
+        self.assertConstantQueries(reverse('accounts:student_dashboard'))
+
+    def test_authors_alphabetically_uses_prefetch(self):
+        self.add_papers(1)
+        paper = ResearchPaper.objects.prefetch_related('author').get()
+        with self.assertNumQueries(0):
+            names = [a.last_name for a in paper.get_authors_alphabetically()]
+        self.assertEqual(names, ['Abad1', 'Zamora1'])
+
+    def test_index_never_reads_userprofile(self):
+        self.add_papers(2)
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse('research:index'))
+        self.assertFalse([q['sql'] for q in queries if 'accounts_userprofile' in q['sql']])
+
+    def count_index_build_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            QuickSearchIndex().build()
+        return len(queries)
+
+    def test_quick_search_index_build(self):
+        self.add_papers(1)
+        one_paper = self.count_index_build_queries()
+        self.add_papers(5)
+        self.assertEqual(one_paper, self.count_index_build_queries())
+
+    def test_quick_search_indexes_first_names_only_with_consent(self):
+        self.add_papers(1)
+        consented = User.objects.get(email='author1@example.com').userprofile
+        consented.consent_status = 'consented'
+        consented.save()
+        index = QuickSearchIndex()
+        index.build()
+        results, total = index.search('ana zamora1')
+        self.assertEqual(total, 1)
+        self.assertEqual(results[0]['authors'], ['Abad1, B.', 'Ana Zamora1'])
+        self.assertEqual(index.search('ben abad1'), ([], 0))
+
+
+class AuthorPublicNameTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='ana@example.com', password='pw')
+        self.author = Author.objects.create(
+            first_name='ana maria', last_name='reyes', middle_initial='c', user=self.user
+        )
+
+    def test_names_stored_on_save(self):
+        self.assertEqual(self.author.full_name, 'Ana Maria C. Reyes')
+        self.assertEqual(self.author.public_name, 'Reyes, A. M. C.')
+
+    def test_consent_change_updates_public_name(self):
+        profile = self.user.userprofile
+        profile.consent_status = 'consented'
+        profile.save()
+        self.author.refresh_from_db()
+        self.assertEqual(self.author.public_name, 'Ana Maria C. Reyes')
+
+        profile.consent_status = 'not_consented'
+        profile.save()
+        self.author.refresh_from_db()
+        self.assertEqual(self.author.public_name, 'Reyes, A. M. C.')
+
+    def test_linking_consented_user(self):
+        other = User.objects.create_user(email='ben@example.com', password='pw')
+        other.userprofile.consent_status = 'consented'
+        other.userprofile.save()
+        author = Author.objects.create(first_name='Ben', last_name='Cruz')
+        self.assertEqual(author.public_name, 'Cruz, B.')
+        author.user = other
+        author.save()
+        self.assertEqual(author.public_name, 'Ben Cruz')
+
+
+class NameKeyTests(TestCase):
+    def test_equivalent_spellings_share_a_key(self):
+        key = name_key('Juan', 'Dela Cruz', 'P', 'Jr.')
+        self.assertEqual(key, 'dela cruz|juan|p|jr')
+        self.assertEqual(name_key(' juan ', 'DELA  CRUZ', 'p.', 'junior'), key)
+        self.assertNotEqual(name_key('Juan', 'Dela Cruz', '', 'Jr.'), key)
+        self.assertEqual(name_key('', 'Dela Cruz'), '')
+
+    def test_key_stored_on_save(self):
+        author = Author.objects.create(first_name='juan', last_name='dela cruz', suffix='III')
+        self.assertEqual(author.name_key, 'dela cruz|juan||iii')
+        author.first_name = 'Jose'
+        author.save(update_fields=['first_name'])
+        author.refresh_from_db()
+        self.assertEqual(author.name_key, 'dela cruz|jose||iii')
+
+
+class SiteStatsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def create_paper(self, strand='STEM', school_year='2023-2024'):
+        return ResearchPaper.objects.create(
+            title='Plant growth study',
+            abstract='Effects of light on plant growth.',
+            publication_date=date(2024, 1, 1),
+            grade_level=12,
+            strand=strand,
+            research_design='EXPERIMENTAL',
+            school_year=school_year,
+        )
+
+    def test_counters_follow_saves_and_deletes(self):
+        self.create_paper()
+        site_stats()  # first read recounts
+        paper = self.create_paper()
+        Keyword.objects.create(word='plants')
+        with self.assertNumQueries(0):
+            stats = site_stats()
+        self.assertEqual(stats['paper_count'], 2)
+        self.assertEqual(stats['keyword_count'], 1)
+        self.assertEqual(stats['papers_by_strand'], [('STEM', 2)])
+
+        paper.strand = 'ABM'
+        paper.save()
+        stats = site_stats()
+        self.assertEqual(stats['papers_by_strand'], [('ABM', 1), ('STEM', 1)])
+
+        paper.delete()
+        stats = site_stats()
+        self.assertEqual(stats['paper_count'], 1)
+        self.assertEqual(stats['papers_by_strand'], [('STEM', 1)])
+
+    def test_new_school_year_triggers_recount(self):
+        self.create_paper()
+        site_stats()
+        self.create_paper(school_year='2024-2025')
+        stats = site_stats()
+        self.assertEqual(stats['papers_by_school_year'], [('2023-2024', 1), ('2024-2025', 1)])
+
+    def test_home_page_runs_no_count_queries(self):
+        self.create_paper()
+        self.client.get(reverse('research:home'))
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse('research:home'))
+        self.assertFalse([q['sql'] for q in queries if 'COUNT(' in q['sql'].upper()])
+
+
+class AnonymousPageCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email='ana@example.com', password='pw')
+        self.user.userprofile.consent_status = 'consented'
+        self.user.userprofile.save()
+        self.paper = ResearchPaper.objects.create(
+            title='Plant growth study',
+            abstract='Effects of light on plant growth.',
+            publication_date=date(2024, 1, 1),
+            grade_level=12,
+            strand='STEM',
+            research_design='EXPERIMENTAL',
+            school_year='2023-2024',
+        )
+        self.paper.author.add(Author.objects.create(first_name='Ana', last_name='Reyes', user=self.user))
+
+    def test_second_anonymous_request_is_a_hit(self):
+        url = reverse('research:detail', args=[self.paper.pk])
+        self.assertEqual(self.client.get(url)['X-Page-Cache'], 'miss')
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertEqual(response['X-Page-Cache'], 'hit')
+
+    def test_query_string_is_normalized(self):
+        url = reverse('research:search')
+        self.client.get(url + '?strand=STEM&q=plant')
+        response = self.client.get(url + '?q=plant&utm_source=mail&school_year=&strand=STEM')
+        self.assertEqual(response['X-Page-Cache'], 'hit')
+
+    def test_revoked_consent_purges_cached_pages(self):
+        urls = [reverse('research:detail', args=[self.paper.pk]), reverse('research:index')]
+        for url in urls:
+            self.assertContains(self.client.get(url), 'Ana Reyes')
+
+        self.user.userprofile.consent_status = 'not_consented'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.userprofile.save()
+        for url in urls:
+            response = self.client.get(url)
+            self.assertNotContains(response, 'Ana Reyes')
+            self.assertContains(response, 'Reyes, A.')
+
+    def test_logged_in_users_bypass_the_cache(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('research:index'))
+        self.assertNotIn('X-Page-Cache', response)
+
+
+class FullTextSearchTests(TestCase):
+    def setUp(self):
+        self.title_hit = self.paper('Photosynthesis in shaded leaves', 'Light and plants.')
+        self.abstract_hit = self.paper('Leaf color study', 'We measured photosynthesis rates.')
+        self.other = self.paper('Market survey', 'Prices of rice.')
+
+    def paper(self, title, abstract):
+        return ResearchPaper.objects.create(
+            title=title,
+            abstract=abstract,
+            publication_date=date(2024, 1, 1),
+            grade_level=12,
+            strand='STEM',
+            research_design='QUANTITATIVE',
+            school_year='2023-2024',
+        )
+
+    def search(self, q):
+        return list(search_papers(ResearchPaper.objects.all(), q))
+
+    def test_title_matches_rank_first(self):
+        self.assertEqual(self.search('photosynthesis'), [self.title_hit, self.abstract_hit])
+
+    def test_every_term_must_match_last_one_as_prefix(self):
+        self.assertEqual(self.search('shaded photo'), [self.title_hit])
+        self.assertEqual(self.search('photosynthesis rice'), [])
+        self.assertEqual(self.search('!!!'), [])
+
+    def test_index_follows_edits_and_deletes(self):
+        self.other.keywords.add(Keyword.objects.create(word='photosynthesis'))
+        self.assertIn(self.other, self.search('photosynthesis'))
+        self.title_hit.delete()
+        self.assertEqual(self.search('shaded'), [])
+
+    def test_unindexed_fallback(self):
+        # Other database backends: titles, keywords and author names, unranked
+        matches = _search_icontains(ResearchPaper.objects.all(), 'photosynthesis')
+        self.assertEqual(list(matches), [self.title_hit])
+
+
+class TypoToleranceTests(TestCase):
+    def setUp(self):
+        self.paper = ResearchPaper.objects.create(
+            title='Photosynthesis in shaded leaves',
+            abstract='Light and plants.',
+            publication_date=date(2024, 1, 1),
+            grade_level=12,
+            strand='STEM',
+            research_design='QUANTITATIVE',
+            school_year='2023-2024',
+        )
+        self.paper.author.add(Author.objects.create(first_name='Ana', last_name='Villanueva'))
+        self.paper.keywords.add(Keyword.objects.create(word='chlorophyll'))
+
+    def test_similarity_matches_pg_trgm(self):
+        self.assertEqual(similarity('word', 'word'), 1.0)
+        self.assertEqual(similarity('', 'word'), 0.0)
+        # pg_trgm: similarity('word', 'two words') = 0.363636
+        self.assertAlmostEqual(similarity('word', 'two words'), 4 / 11)
+        self.assertEqual(word_similarity('shaded', 'Photosynthesis in shaded leaves'), 1.0)
+
+    def test_fuzzy_search_finds_misspellings(self):
+        papers = ResearchPaper.objects.all()
+        for typo in ('photosynthsis', 'vilanueva', 'chlorofyll'):
+            self.assertEqual(list(search_papers(papers, typo)), [], typo)
+            self.assertEqual(list(fuzzy_search_papers(papers, typo)), [self.paper], typo)
+        self.assertEqual(list(fuzzy_search_papers(papers, 'economics')), [])
+
+    def test_suggestions(self):
+        self.assertEqual(suggest('chlorofyll'), ['chlorophyll'])
+        self.assertEqual(suggest('Vilanueva'), ['Villanueva'])
+        self.assertEqual(suggest('economics'), [])
+
+    def test_search_page_offers_suggestions(self):
+        cache.clear()
+        response = self.client.get(reverse('research:search') + '?q=chlorofyll')
+        self.assertTrue(response.context['is_fuzzy'])
+        self.assertEqual(list(response.context['papers']), [self.paper])
+        self.assertContains(response, 'chlorophyll')
+
+
+class SearchFacetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.plants = self.paper('Plant growth under LED light', 'STEM')
+        self.marketing = self.paper('Marketing strategy for sari-sari stores', 'ABM')
+        self.marketing.keywords.add(Keyword.objects.create(word='plan'))
+
+    def paper(self, title, strand):
+        return ResearchPaper.objects.create(
+            title=title,
+            abstract='A study.',
+            publication_date=date(2024, 1, 1),
+            grade_level=12,
+            strand=strand,
+            research_design='QUANTITATIVE',
+            school_year='2023-2024',
+        )
+
+    def search(self, query):
+        response = self.client.get(reverse('research:search') + query)
+        self.assertEqual(response.status_code, 200)
+        return response.context
+
+    def test_facet_counts_follow_the_query_and_other_facets(self):
+        context = self.search('?q=plant&strand=STEM')
+        self.assertEqual(list(context['papers']), [self.plants])
+        self.assertEqual(context['facet_counts']['strand'], {'STEM': 1, 'ABM': 0})
+        self.assertEqual(context['facet_counts']['grade_level'], {'12': 1})
+
+        context = self.search('?grade_level=12')
+        self.assertEqual(context['facet_counts']['strand'], {'STEM': 1, 'ABM': 1})
+
+    def test_fuzzy_fallback_is_decided_after_the_facets(self):
+        context = self.search('?q=plant')
+        self.assertFalse(context['is_fuzzy'])
+        self.assertEqual(list(context['papers']), [self.plants])
+
+        # The only exact match is outside the selected strand
+        context = self.search('?q=plant&strand=ABM')
+        self.assertTrue(context['is_fuzzy'])
+        self.assertEqual(list(context['papers']), [self.marketing])
+        self.assertIn('plan', context['suggestions'])
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.paper = ResearchPaper.objects.create(
+            title='Plant growth study',
+            abstract='Effects of light on plant growth.',
+            publication_date=date(2024, 1, 1),
+            grade_level=12,
+            strand='STEM',
+            research_design='EXPERIMENTAL',
+            school_year='2023-2024',
+        )
+        # Logged in, so the anonymous page cache stays out of the way
+        self.user = User.objects.create_user(email='reader@example.com', password='pw')
+        self.user.userprofile.is_approved = True
+        self.user.userprofile.save()
+        self.client.force_login(self.user)
+
+    def test_detail_page_revalidates(self):
+        url = reverse('research:detail', args=[self.paper.pk])
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, headers={'if-none-match': etag}).status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.paper.title = 'Plant growth under LED light'
+            self.paper.save()
+        response = self.client.get(url, headers={'if-none-match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_approval_changes_the_etag(self):
+        UserProfile.objects.filter(user=self.user).update(is_approved=False)
+        url = reverse('research:detail', args=[self.paper.pk])
+        etag = self.client.get(url)['ETag']
+
+        profile = UserProfile.objects.get(user=self.user)
+        profile.is_approved = True
+        profile.save()
+        response = self.client.get(url, headers={'if-none-match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_etag_differs_per_viewer(self):
+        url = reverse('research:index')
+        etag = self.client.get(url)['ETag']
+        self.client.logout()
+        self.assertEqual(self.client.get(url, headers={'if-none-match': etag}).status_code, 200)
+
+
+class MemoizeTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.calls = []
+
+    def test_one_caller_recomputes(self):
+        @memoize('slow_{}', 'papers')
+        def slow(n):
+            self.calls.append(n)
+            time.sleep(0.2)
+            return n * 2
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(slow(21))) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results, [42] * 5)
+        self.assertEqual(self.calls, [21])
+
+    def test_stale_value_served_while_refreshing(self):
+        # timeout=0: every entry is stale as soon as it's written
+        @memoize('stale_{}', timeout=0, jitter=0, early_refresh=0)
+        def stale(n):
+            self.calls.append(n)
+            return len(self.calls)
+
+        self.assertEqual(stale(1), 1)
+        # Another caller holds the refresh lock: keep serving the old value
+        cache.add(f"{versioned_key('stale_1')}:lock", 1)
+        self.assertEqual(stale(1), 1)
+        self.assertEqual(self.calls, [1])
+
+        cache.delete(f"{versioned_key('stale_1')}:lock")
+        self.assertEqual(stale(1), 2)
+
+    def test_generation_bump_recomputes(self):
+        @memoize('counted', 'awards', early_refresh=0)
+        def counted():
+            self.calls.append(1)
+            return len(self.calls)
+
+        self.assertEqual(counted(), 1)
+        self.assertEqual(counted(), 1)
+        bump_generation('awards')
+        self.assertEqual(counted(), 2)
+
+
+class PaperCardCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email='ana@example.com', password='pw')
+        self.paper = ResearchPaper.objects.create(
+            title='Plant growth study',
+            abstract='Effects of light on plant growth.',
+            publication_date=date(2024, 1, 1),
+            grade_level=12,
+            strand='STEM',
+            research_design='EXPERIMENTAL',
+            school_year='2023-2024',
+        )
+        self.paper.author.add(Author.objects.create(first_name='Ana', last_name='Reyes', user=self.user))
+        self.award = Award.objects.create(name='Best Paper')
+        self.paper.awards.add(self.award)
+
+    def cards(self):
+        return paper_cards(ResearchPaper.objects.filter(pk=self.paper.pk))
+
+    def test_cached_cards_cost_no_queries(self):
+        self.assertIn('Best Paper', self.cards())
+        papers = list(ResearchPaper.objects.all())
+        with self.assertNumQueries(0):
+            paper_cards(papers)
+
+    def test_changes_render_a_new_card(self):
+        self.assertIn('Reyes, A.', self.cards())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.award.name = 'Best Research'
+            self.award.save()
+        self.assertIn('Best Research', self.cards())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.userprofile.consent_status = 'consented'
+            self.user.userprofile.save()
+        self.assertIn('Ana Reyes', self.cards())
+
+
+class CacheGenerationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.paper = ResearchPaper.objects.create(
+            title='Plant growth study',
+            abstract='Effects of light on plant growth.',
+            publication_date=date(2024, 1, 1),
+            grade_level=12,
+            strand='STEM',
+            research_design='EXPERIMENTAL',
+            school_year='2023-2024',
+        )
+
+    def stamps(self):
+        return get_generation('papers'), get_generation('awards'), paper_version(self.paper.pk), list_version()
+
+    def test_stamps_move_when_the_change_commits(self):
+        before = self.stamps()
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                self.paper.title = 'Plant growth under LED light'
+                self.paper.save()
+                self.paper.awards.add(Award.objects.create(name='Best Paper'))
+                self.assertEqual(self.stamps(), before)
+        after = self.stamps()
+        self.assertTrue(all(old != new for old, new in zip(before, after)))
+
+    def test_rollback_keeps_the_stamps(self):
+        before = self.stamps()
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                self.paper.title = 'Never committed'
+                self.paper.save()
+                raise RuntimeError
+        self.assertEqual(callbacks, [])
+        self.assertEqual(self.stamps(), before)
+
+
+class QuickSearchStalenessTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.paper = ResearchPaper.objects.create(
+            title='Plant growth study',
+            abstract='Effects of light on plant growth.',
+            publication_date=date(2024, 1, 1),
+            grade_level=12,
+            strand='STEM',
+            research_design='EXPERIMENTAL',
+            school_year='2023-2024',
+        )
+        self.index = QuickSearchIndex()
+        self.index.build()
+
+    def test_change_elsewhere_makes_the_index_stale(self):
+        self.assertEqual(self.index.search('plant')[1], 1)
+        # Another worker or a management command renames the paper: this
+        # index never saw the change, only the shared generation moved
+        ResearchPaper.objects.filter(pk=self.paper.pk).update(title='Soil moisture study', abstract='Watering.')
+        bump_generation('papers')
+
+        self.assertTrue(self.index.stale())
+        self.assertIsNone(self.index.search('plant'))
+
+        self.index.build()
+        self.assertFalse(self.index.stale())
+        self.assertEqual(self.index.search('plant'), ([], 0))
+        self.assertEqual(self.index.search('soil')[1], 1)
+
+    def test_local_changes_keep_the_index_current(self):
+        with mock.patch('research.signals.quick_search_index', self.index):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.paper.title = 'Soil moisture study'
+                self.paper.save()
+            with self.captureOnCommitCallbacks(execute=True):
+                self.paper.keywords.add(Keyword.objects.create(word='irrigation'))
+
+        self.assertFalse(self.index.stale())
+        self.assertEqual(self.index.search('soil irrigation')[1], 1)
+
+        # A change from another process still needs a rebuild
+        bump_generation('papers')
+        self.assertTrue(self.index.stale())
+
+    def test_build_in_background_skips_a_current_index(self):
+        with mock.patch('research.quick_search.threading.Thread') as thread:
+            self.index.build_in_background()
+            thread.assert_not_called()
+            bump_generation('authors')
+            self.index.build_in_background()
+            thread.assert_called_once()
+
+
+class WarmUpTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_every_step_runs(self):
+        ResearchPaper.objects.create(
+            title='Plant growth study',
+            abstract='Effects of light on plant growth.',
+            publication_date=date(2024, 1, 1),
+            grade_level=12,
+            strand='STEM',
+            research_design='EXPERIMENTAL',
+            school_year='2023-2024',
+        )
+        with self.assertNoLogs('research.warmup', 'ERROR'):
+            timings = warm_cache()
+        self.assertIn('home_page', timings)
+        self.assertEqual(_render(IndexView.as_view(), '/research/'), 200)
+        # Warmed: the first visitor's lookups are cache hits
+        with self.assertNumQueries(0):
+            get_bitmaps()
+
+
+class CursorPaginationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        # Two papers per date, so the id tie-breaker matters
+        for n in range(7):
+            ResearchPaper.objects.create(
+                title=f'Plant growth study {n}',
+                abstract='Effects of light on plant growth.',
+                publication_date=date(2024, 1 + n // 2, 1),
+                grade_level=12,
+                strand='STEM',
+                research_design='EXPERIMENTAL',
+                school_year='2023-2024',
+            )
+        self.ordering = ('-publication_date', 'id')
+        self.expected = list(ResearchPaper.objects.order_by(*self.ordering).values_list('id', flat=True))
+
+    def paginator(self):
+        return CursorPaginator(ResearchPaper.objects.all(), 3, self.ordering)
+
+    def test_cursor_round_trip(self):
+        token = encode_cursor([date(2024, 3, 1), 5], 2, backwards=True)
+        self.assertEqual(decode_cursor(token), (['2024-03-01', 5], 2, True))
+        self.assertIsNone(decode_cursor('not a cursor'))
+
+    def test_walks_forward_and_back(self):
+        paginator = self.paginator()
+        pages = [paginator.page()]
+        while pages[-1].has_next():
+            pages.append(paginator.page(pages[-1].next_cursor))
+        self.assertEqual([p.number for p in pages], [1, 2, 3])
+        self.assertEqual([paper.id for page in pages for paper in page], self.expected)
+
+        back = paginator.page(pages[-1].previous_cursor)
+        self.assertEqual(back.number, 2)
+        self.assertEqual([paper.id for paper in back], self.expected[3:6])
+
+    def test_tampered_cursor_falls_back_to_page_one(self):
+        paginator = self.paginator()
+        for values in (['notadate', 'x'], ['2024-01-01'], [None, 1], [{'a': 1}, [2]]):
+            page = paginator.page(encode_cursor(values, 2))
+            self.assertEqual(page.number, 1)
+            self.assertEqual([paper.id for paper in page], self.expected[:3])
+
+        response = self.client.get(reverse('research:index'), {'cursor': encode_cursor(['notadate', 'x'], 2)})
+        self.assertEqual(response.status_code, 200)
+
+    def test_numbered_links_are_cursors(self):
+        class PaperList(CursorPaginationMixin, ListView):
+            model = ResearchPaper
+            paginate_by = 1
+            cursor_ordering = self.ordering
+            template_name = 'unused.html'
+
+        def get(query):
+            return PaperList.as_view()(RequestFactory().get('/?' + query)).context_data['page_obj']
+
+        # Legacy ?page=N is still an entry point
+        page = get('strand=STEM&page=4')
+        self.assertEqual([paper.id for paper in page], self.expected[3:4])
+        links = page.nearby_pages()
+        self.assertEqual([number for number, _ in links], [2, 3, 4, 5, 6])
+        for number, query in links:
+            self.assertIn('strand=STEM', query)
+            if number != 4:
+                self.assertNotIn('page=', query)
+            linked = get(query)
+            self.assertEqual(linked.number, number)
+            self.assertEqual([paper.id for paper in linked], self.expected[number - 1:number])
+
+        last = get(page.last_query())
+        self.assertEqual(last.number, 7)
+        self.assertEqual([paper.id for paper in last], self.expected[6:])
+        self.assertFalse(last.has_next())
+        self.assertEqual([number for number, _ in last.nearby_pages()], [5, 6, 7])
+        self.assertEqual([paper.id for paper in get(last.previous_query)], self.expected[5:6])
+
+
+class SQLiteCacheTests(TestCase):
+    """The shared cache backend, on a file of its own."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.location = os.path.join(self.tmp.name, 'cache.sqlite3')
+
+    def make_cache(self, **options):
+        return sqlite_cache.SQLiteCache(self.location, {'OPTIONS': options})
+
+    def run_threads(self, target, count=8):
+        threads = [threading.Thread(target=target) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def test_add_is_atomic_across_connections(self):
+        caches = [self.make_cache(), self.make_cache()]
+        results = []
+
+        def add():
+            for n in range(20):
+                results.append((n, caches[n % 2].add(f'lock{n}', threading.get_ident())))
+
+        self.run_threads(add)
+        for n in range(20):
+            self.assertEqual([added for key, added in results if key == n].count(True), 1)
+
+    def test_incr_is_atomic_across_connections(self):
+        caches = [self.make_cache(), self.make_cache()]
+        caches[0].set('hits', 0)
+
+        def incr():
+            for n in range(25):
+                caches[n % 2].incr('hits')
+
+        self.run_threads(incr)
+        self.assertEqual(caches[1].get('hits'), 200)
+
+    def test_expired_entries(self):
+        cache = self.make_cache()
+        cache.set('short', 'value', 10)
+        cache.set('forever', 'value', None)
+        self.assertEqual(cache.get('short'), 'value')
+
+        later = mock.Mock(time=lambda: time.time() + 11)
+        with mock.patch.object(sqlite_cache, 'time', later):
+            self.assertIsNone(cache.get('short'))
+            self.assertFalse(cache.has_key('short'))
+            self.assertEqual(cache.get('forever'), 'value')
+            with self.assertRaises(ValueError):
+                cache.incr('short')
+            # An expired key can be added again
+            self.assertTrue(cache.add('short', 'new', 60))
+            self.assertFalse(cache.add('forever', 'new', 60))
+
+    def test_culls_by_total_size(self):
+        cache = self.make_cache(MAX_BYTES=10_000, CULL_FREQUENCY=4)
+        for n in range(sqlite_cache.CULL_CHECK_INTERVAL * 2):
+            cache.set(f'page{n}', b'x' * 1000, 60 + n)
+        (size,) = cache._connection().execute('SELECT SUM(length(value)) FROM cache').fetchone()
+        self.assertLess(size, 10_000 + sqlite_cache.CULL_CHECK_INTERVAL * 1100)
+        # The entries closest to expiry went first
+        self.assertIsNone(cache.get('page0'))
+        self.assertIsNotNone(cache.get(f'page{sqlite_cache.CULL_CHECK_INTERVAL * 2 - 1}'))
+
+    def test_sqlite_errors_are_misses(self):
+        # A directory can't be opened as a database
+        cache = sqlite_cache.SQLiteCache(self.tmp.name, {})
+        with self.assertLogs('sqlite_cache', 'WARNING'):
+            self.assertEqual(cache.get('key', 'default'), 'default')
+            self.assertEqual(cache.get_many(['key']), {})
+            cache.set('key', 'value')
+            self.assertFalse(cache.add('key', 'value'))
+            self.assertEqual(cache.set_many({'key': 'value'}), ['key'])
+            self.assertFalse(cache.delete('key'))
+            with self.assertRaises(ValueError):
+                cache.incr('key')
+
+
+class PDFDownloadCacheTests(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def put(self, cache, name, data, mtime=None):
+        writer = cache.writer(name, 'v1')
+        writer.write(data)
+        writer.commit()
+        if mtime is not None:
+            os.utime(cache._key_path(name, 'v1'), (mtime, mtime))
+
+    def test_evicts_least_recently_used(self):
+        cache = DiskLRUCache(self.tmp.name, max_bytes=10)
+        self.put(cache, 'a.pdf', b'aaaa', mtime=1000)
+        self.put(cache, 'b.pdf', b'bbbb', mtime=2000)
+        # Reading a.pdf makes b.pdf the least recently used
+        self.assertIsNotNone(cache.get('a.pdf', 'v1'))
+        self.put(cache, 'c.pdf', b'cccc')
+
+        self.assertIsNone(cache.get('b.pdf', 'v1'))
+        self.assertIsNotNone(cache.get('a.pdf', 'v1'))
+        self.assertIsNotNone(cache.get('c.pdf', 'v1'))
+        self.assertEqual(cache.stats['evictions'], 1)
+        self.assertEqual(cache.read_stats()['bytes_on_disk'], 8)
+
+    def test_cache_hit_needs_no_request_to_supabase(self):
+        cache = DiskLRUCache(self.tmp.name, max_bytes=1000)
+        StoredFile.objects.create(name='papers/a.pdf', size=7, sha256='abc123')
+        writer = cache.writer('papers/a.pdf', 'abc123')
+        writer.write(b'%PDF-1.')
+        writer.commit()
+
+        storage = SupabaseStorage()
+        with mock.patch('storage.get_download_cache', return_value=cache), \
+                mock.patch.object(storage, '_head') as head:
+            stream = storage.open_stream('papers/a.pdf', (2, 4))
+            self.assertEqual(b''.join(stream), b'DF-')
+            stream.close()
+            head.assert_not_called()
+
+            # Files without a StoredFile row still use the HEAD request
+            head.return_value = None
+            self.assertIsNone(storage._cache_version('papers/unknown.pdf'))
+            head.assert_called_once()
+
+    def test_unfinished_downloads_leave_no_temp_files(self):
+        cache = DiskLRUCache(self.tmp.name, max_bytes=1000)
+        StoredFile.objects.create(name='papers/a.pdf', size=7, sha256='abc123')
+        storage = SupabaseStorage()
+
+        def download(name, byte_range):
+            return FileStream(iter([b'%PDF', b'-1.']), 7, 0, 6, partial=False)
+
+        with mock.patch('storage.get_download_cache', return_value=cache), \
+                mock.patch.object(storage, '_open_download_stream', side_effect=download):
+            # Never iterated (e.g. the client went away before the first chunk)
+            storage.open_stream('papers/a.pdf').close()
+            self.assertEqual(os.listdir(cache.tmp_dir), [])
+
+            # Abandoned halfway
+            stream = storage.open_stream('papers/a.pdf')
+            next(iter(stream))
+            self.assertEqual(len(os.listdir(cache.tmp_dir)), 1)
+            stream.close()
+            self.assertEqual(os.listdir(cache.tmp_dir), [])
+            self.assertIsNone(cache.get('papers/a.pdf', 'abc123'))
+
+    def test_startup_removes_stale_temp_files(self):
+        cache = DiskLRUCache(self.tmp.name, max_bytes=1000)
+        stale = os.path.join(cache.tmp_dir, 'tmpstale')
+        fresh = os.path.join(cache.tmp_dir, 'tmpfresh')
+        for path in (stale, fresh):
+            open(path, 'wb').close()
+        os.utime(stale, (1000, 1000))
+
+        DiskLRUCache(self.tmp.name, max_bytes=1000)
+        self.assertEqual(os.listdir(cache.tmp_dir), ['tmpfresh'])
+
+
+class StorageMetadataTests(TestCase):
+    def setUp(self):
+        patcher = mock.patch('storage.object_info', ObjectInfoCache())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.storage = SupabaseStorage()
+        self.head = mock.patch.object(self.storage, '_head').start()
+        self.addCleanup(mock.patch.stopall)
+
+    def test_uploaded_files_need_no_request(self):
+        StoredFile.objects.create(name='papers/a.pdf', size=1234, sha256='abc123')
+        self.assertTrue(self.storage.exists('papers/a.pdf'))
+        with self.assertNumQueries(0):
+            self.assertEqual(self.storage.size('papers/a.pdf'), 1234)
+        self.head.assert_not_called()
+
+    def test_other_files_use_a_head_request(self):
+        self.head.return_value = mock.Mock(status_code=200, headers={'content-length': '99'})
+        self.assertEqual(self.storage.size('papers/old.pdf'), 99)
+        self.assertTrue(self.storage.exists('papers/old.pdf'))
+        self.head.assert_called_once_with('papers/old.pdf')
+
+    def test_missing_files_are_not_remembered(self):
+        self.head.return_value = mock.Mock(status_code=404, headers={})
+        self.assertFalse(self.storage.exists('papers/new.pdf'))
+        with self.assertRaises(FileNotFoundError):
+            self.storage.size('papers/new.pdf')
+        self.assertEqual(self.head.call_count, 2)
+
+
+class RemoteStreamTests(TestCase):
+    PDF = b'%PDF-1.7 ' + bytes(range(256)) * 4
+
+    def response(self, status, body, headers):
+        # Streamed like a real transport (bytes content would be pre-read)
+        return httpx.Response(status, content=iter([body]), headers={'Content-Length': str(len(body)), **headers})
+
+    def open(self, handler, byte_range=None):
+        self.requests = []
+
+        def record(request):
+            self.requests.append(request)
+            return handler(request)
+
+        client = httpx.Client(transport=httpx.MockTransport(record))
+        self.addCleanup(client.close)
+        with mock.patch('storage.supabase_clients.http', return_value=client):
+            stream = SupabaseStorage()._open_download_stream('papers/a.pdf', byte_range)
+            body = b''.join(stream)
+            stream.close()
+        return stream, body
+
+    def test_streams_stored_bytes_undecoded(self):
+        # A proxy compressing anyway: the bytes sent on must be the ones counted
+        compressed = gzip.compress(self.PDF)
+        stream, body = self.open(lambda request: self.response(
+            200, compressed, {'Content-Encoding': 'gzip'},
+        ))
+        self.assertEqual(self.requests[0].headers['accept-encoding'], 'identity')
+        self.assertEqual(stream.length, len(compressed))
+        self.assertEqual(body, compressed)
+
+    def test_ranges(self):
+        stream, body = self.open(lambda request: self.response(
+            206, self.PDF[10:20], {'Content-Range': f'bytes 10-19/{len(self.PDF)}'},
+        ), byte_range=(10, 19))
+        self.assertEqual(self.requests[0].headers['range'], 'bytes=10-19')
+        self.assertEqual((stream.start, stream.end, stream.size, stream.partial), (10, 19, len(self.PDF), True))
+        self.assertEqual(body, self.PDF[10:20])
+
+    def test_unknown_length(self):
+        def chunked(request):
+            return httpx.Response(200, content=iter([self.PDF[:100], self.PDF[100:]]))
+
+        stream, body = self.open(chunked)
+        self.assertIsNone(stream.size)
+        self.assertIsNone(stream.length)
+        self.assertEqual(body, self.PDF)
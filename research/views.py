@@ -4,8 +4,7 @@ from django.db.models import Q, Prefetch
 from django.http import JsonResponse
 from django.urls import reverse_lazy
 from django.contrib import messages
-from django.core.cache import cache
-from .models import ResearchPaper, Author, Keyword, Award
+from .models import ResearchPaper, Author, Keyword, Award, author_prefetch
 from .forms import ResearchPaperForm
 from accounts.decorators import is_research_teacher_only
 from django.contrib.auth.mixins import LoginRequiredMixin
@@ -19,19 +18,19 @@ from django.utils.decorators import method_decorator
 from django.views.decorators.csrf import csrf_exempt, csrf_protect
 from django.http import HttpResponse, Http404
 from django.contrib.auth.decorators import login_required
-from django.views.decorators.cache import cache_page
-from storage import SupabaseStorage
-import mimetypes
-from datetime import datetime
-from django.core.cache import cache
 from django.db import connection, models
 from django_ratelimit.decorators import ratelimit, Ratelimited
-from django.views.decorators.vary import vary_on_cookie
+from django.views.decorators.http import condition
 from django.template.loader import render_to_string
 from .utils import get_real_ip, is_disallowed_bot
-
-@method_decorator(vary_on_cookie, name='dispatch')
-@method_decorator(cache_page(60 * 60 * 24), name='dispatch')
+from .search import search_papers, fuzzy_search_papers, suggest
+from .quick_search import quick_search_index
+from .facets import facet_counts
+from .pagination import CursorPaginationMixin
+from .caching import paper_version, list_version, weak_etag, memoize
+from .stats import site_stats
+
+# Anonymous visitors are served from research.middleware.AnonymousPageCacheMiddleware
 class StaticPageView(generic.TemplateView):
     pass
 
@@ -40,8 +39,7 @@ class HomeView(generic.TemplateView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['paper_count'] = ResearchPaper.objects.count()
-        context['keyword_count'] = Keyword.objects.count()
+        context.update(site_stats())
         return context
 
 class AboutView(generic.TemplateView):
@@ -49,8 +47,7 @@ class AboutView(generic.TemplateView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['paper_count'] = ResearchPaper.objects.count()
-        context['keyword_count'] = Keyword.objects.count()
+        context.update(site_stats())
         return context
 
 class TermsView(StaticPageView):
@@ -59,156 +56,90 @@ class TermsView(StaticPageView):
 class PrivacyPolicyView(StaticPageView):
     template_name = "research/privacy_policy.html"
     
-@login_required
-def serve_pdf(request, path):
-    """Serve PDF files from Supabase storage with authentication"""
-    try:
-        storage = SupabaseStorage()
-        
-        if path.startswith('research_papers/'):
-            file_content = storage.get_file_content(path)
-            
-        elif path.startswith('parental_consents/'):
-            path_parts = path.split('/')
-            if len(path_parts) >= 2:
-                file_user_id = path_parts[1]
-                if str(request.user.id) != file_user_id and not request.user.is_staff:
-                    raise Http404("You don't have permission to view this file")
-            
-            file_content = storage.get_file_content(path)
-        else:
-            raise Http404("File not found")
-        
-        content_type, _ = mimetypes.guess_type(path)
-        if not content_type:
-            content_type = 'application/pdf'
-        
-        response = HttpResponse(file_content, content_type=content_type)
-        response['Content-Disposition'] = f'inline; filename="{path.split("/")[-1]}"'
-        return response
-        
-    except Exception as e:
-        raise Http404(f"File not found: {str(e)}")
-
+@memoize('all_awards', 'awards')
 def get_cached_awards():
     """Get all awards (cached for 1 hour)"""
-    cache_key = 'all_awards'
-    awards = cache.get(cache_key)
-    if awards is None:
-        awards = list(Award.objects.only('id', 'name').order_by('name'))
-        cache.set(cache_key, awards, 60 * 60)
-    return awards
+    return list(Award.objects.only('id', 'name').order_by('name'))
+
 
+@memoize('all_school_years', 'papers')
 def get_cached_school_years():
     """Get all distinct school years (cached for 1 hour) - OPTIMIZED"""
-    cache_key = 'all_school_years'
-    school_years = cache.get(cache_key)
-    if school_years is None:
-        if connection.vendor == 'postgresql':
-            with connection.cursor() as cursor:
-                cursor.execute(
-                    "SELECT DISTINCT school_year FROM research_researchpaper "
-                    "WHERE school_year IS NOT NULL ORDER BY school_year"
-                )
-                school_years = [row[0] for row in cursor.fetchall()]
-        else:
-            school_years = list(
-                ResearchPaper.objects.values_list("school_year", flat=True)
-                .distinct().order_by("school_year")
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT DISTINCT school_year FROM research_researchpaper "
+                "WHERE school_year IS NOT NULL ORDER BY school_year"
             )
-        cache.set(cache_key, school_years, 60 * 60) 
-    return school_years
+            return [row[0] for row in cursor.fetchall()]
+    return list(
+        ResearchPaper.objects.values_list("school_year", flat=True)
+        .distinct().order_by("school_year")
+    )
 
 
+@memoize('all_strands', 'papers')
 def get_cached_strands():
     """Get all distinct strands (cached for 1 hour) - OPTIMIZED"""
-    cache_key = 'all_strands'
-    strands = cache.get(cache_key)
-    if strands is None:
-        if connection.vendor == 'postgresql':
-            with connection.cursor() as cursor:
-                cursor.execute(
-                    "SELECT DISTINCT strand FROM research_researchpaper "
-                    "WHERE strand IS NOT NULL ORDER BY strand"
-                )
-                strands = [row[0] for row in cursor.fetchall()]
-        else:
-            strands = list(
-                ResearchPaper.objects.values_list("strand", flat=True).distinct()
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT DISTINCT strand FROM research_researchpaper "
+                "WHERE strand IS NOT NULL ORDER BY strand"
             )
-        cache.set(cache_key, strands, 60 * 60) 
-    return strands
+            return [row[0] for row in cursor.fetchall()]
+    return list(
+        ResearchPaper.objects.values_list("strand", flat=True).distinct()
+    )
 
 
+@memoize('all_grade_levels', 'papers')
 def get_cached_grade_levels():
     """Get all distinct grade levels (cached for 1 hour) - OPTIMIZED"""
-    cache_key = 'all_grade_levels'
-    grade_levels = cache.get(cache_key)
-    if grade_levels is None:
-        if connection.vendor == 'postgresql':
-            with connection.cursor() as cursor:
-                cursor.execute(
-                    "SELECT DISTINCT grade_level FROM research_researchpaper "
-                    "WHERE grade_level IS NOT NULL ORDER BY grade_level"
-                )
-                grade_levels = [row[0] for row in cursor.fetchall()]
-        else:
-            grade_levels = list(
-                ResearchPaper.objects.values_list("grade_level", flat=True).distinct()
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT DISTINCT grade_level FROM research_researchpaper "
+                "WHERE grade_level IS NOT NULL ORDER BY grade_level"
             )
-        cache.set(cache_key, grade_levels, 60 * 60) 
-    return grade_levels
+            return [row[0] for row in cursor.fetchall()]
+    return list(
+        ResearchPaper.objects.values_list("grade_level", flat=True).distinct()
+    )
+
 
+@memoize('all_author_batches', 'authors')
 def get_cached_all_batches():
     """Get all author batches (cached for 1 hour) - OPTIMIZED"""
-    cache_key = 'all_author_batches'
-    batches = cache.get(cache_key)
-    if batches is None:
-        batch_pairs = Author.objects.filter(
-            Q(G11_Batch__isnull=False) | Q(G12_Batch__isnull=False)
-        ).values_list('G11_Batch', 'G12_Batch')
-        
-        all_batches = set()
-        for g11, g12 in batch_pairs:
-            if g11:
-                all_batches.add(g11)
-            if g12:
-                all_batches.add(g12)
-        
-        batches = sorted(all_batches)
-        cache.set(cache_key, batches, 60 * 60)  
-    return batches
-
-
-def invalidate_paper_caches():
-    """Invalidate all research paper related caches"""
-    cache.delete('all_school_years')
-    cache.delete('all_strands')
-    cache.delete('all_grade_levels')
-
+    batch_pairs = Author.objects.filter(
+        Q(G11_Batch__isnull=False) | Q(G12_Batch__isnull=False)
+    ).values_list('G11_Batch', 'G12_Batch')
+    
+    all_batches = set()
+    for g11, g12 in batch_pairs:
+        if g11:
+            all_batches.add(g11)
+        if g12:
+            all_batches.add(g12)
+    
+    return sorted(all_batches)
 
-def invalidate_award_caches():
-    """Invalidate award caches"""
-    cache.delete('all_awards')
 
+@memoize('all_keywords', 'keywords')
+def get_cached_keywords():
+    """Keyword dropdown data (cached for 1 hour)"""
+    keywords = Keyword.objects.only('id', 'word').order_by("word")
+    return [{"id": keyword.id, "name": keyword.word} for keyword in keywords]
 
-def invalidate_keyword_caches():
-    """Invalidate keyword caches"""
-    cache.delete('all_keywords')
-    cache.delete('keywords_with_count')
 
-def invalidate_author_caches():
-    """Invalidate author caches - but be selective"""
-    cache.delete('all_author_batches')
-    
-    current_year = datetime.now().year
-    
-    for year_offset in range(-2, 3):  
-        year1 = current_year + year_offset
-        year2 = year1 + 1
-        sy = f"{year1}-{year2}"
-        cache.delete(f'authors_grade_11_year_{sy}')
-        cache.delete(f'authors_grade_12_year_{sy}')
+@memoize('authors_grade_{}_year_{}', 'authors')
+def get_cached_batch_authors(grade, school_year):
+    """Authors of one grade 11/12 batch for the author picker (cached for 1 hour)"""
+    batch_field = 'G11_Batch' if grade == "11" else 'G12_Batch'
+    authors = Author.objects.filter(**{batch_field: school_year}).only(
+        'id', 'first_name', 'last_name', 'public_name'
+    ).order_by("last_name", "first_name")
+    return [{"id": author.id, "name": author.display_name_public()} for author in authors]
 
 @csrf_exempt
 def healthcheck(request):
@@ -255,8 +186,17 @@ class TeacherRequiredMixin:
         view = super().as_view(**initkwargs)
         return is_research_teacher_only(view)
 
+def index_etag(request, *args, **kwargs):
+    return weak_etag(request, list_version())
+
+
+def detail_etag(request, pk, *args, **kwargs):
+    return weak_etag(request, paper_version(pk))
+
+
 @method_decorator(ratelimit(key=get_real_ip, rate='100/h', method='GET', block=True), name='dispatch')
-class IndexView(generic.ListView):
+@method_decorator(condition(etag_func=index_etag), name='dispatch')
+class IndexView(CursorPaginationMixin, generic.ListView):
     model = ResearchPaper
     template_name = "research/index.html"
     context_object_name = "latest_research_list"
@@ -264,34 +204,23 @@ class IndexView(generic.ListView):
     paginate_by = 6
  
     def get_queryset(self):
-        return ResearchPaper.objects.prefetch_related(
-            Prefetch(
-                'author',
-                queryset=Author.objects.only('id', 'first_name', 'last_name', 'middle_initial', 'suffix')
-            ),
-            Prefetch(
-                'keywords',
-                queryset=Keyword.objects.only('id', 'word')
-            )
-        ).defer('pdf_file').order_by('-publication_date')
+        # Authors/keywords/awards are prefetched by {% paper_cards %}, and only
+        # for cards that aren't cached yet
+        return ResearchPaper.objects.defer('pdf_file').order_by('-publication_date')
  
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         return context
 
 @method_decorator(ratelimit(key=get_real_ip, rate='60/h', method='GET', block=True), name='dispatch')
+@method_decorator(condition(etag_func=detail_etag), name='dispatch')
 class DetailView(generic.DetailView):
     model = ResearchPaper
     template_name = "research/detail.html"
  
     def get_queryset(self):
         return ResearchPaper.objects.prefetch_related(
-            Prefetch(
-                'author',
-                queryset=Author.objects.select_related('user__userprofile').only(
-                    'id', 'first_name', 'last_name', 'middle_initial', 'suffix', 'user'
-                )
-            ),
+            author_prefetch(),
             Prefetch(
                 'keywords',
                 queryset=Keyword.objects.only('id', 'word')
@@ -315,7 +244,7 @@ class DetailView(generic.DetailView):
         return context
 
 @method_decorator(ratelimit(key=get_real_ip, rate='60/h', method='GET', block=True), name='dispatch')
-class SearchView(generic.ListView):
+class SearchView(CursorPaginationMixin, generic.ListView):
     model = ResearchPaper
     template_name = "research/search.html"
     context_object_name = "papers"
@@ -333,22 +262,9 @@ class SearchView(generic.ListView):
  
     # ── Queryset ──────────────────────────────────────────────────
     def get_queryset(self):
-        qs = ResearchPaper.objects.prefetch_related(
-            Prefetch(
-                'author',
-                queryset=Author.objects.select_related('user__userprofile').only(
-                    'id', 'first_name', 'last_name', 'middle_initial', 'suffix', 'user'
-                )
-            ),
-            Prefetch(
-                'keywords',
-                queryset=Keyword.objects.only('id', 'word')
-            ),
-            Prefetch(
-                'awards',
-                queryset=Award.objects.only('id', 'name')
-            )
-        ).defer("pdf_file")
+        # Relations are prefetched by {% paper_cards %} (cache misses only)
+        # or by the navbar JSON branch
+        qs = ResearchPaper.objects.defer("pdf_file")
  
         request = self.request
  
@@ -361,40 +277,60 @@ class SearchView(generic.ListView):
         author_ids      = request.GET.getlist("authors")
         keyword_ids     = request.GET.getlist("keywords")
  
-        if q:
-            qs = qs.filter(
-                Q(title__icontains=q) |
-                Q(keywords__word__icontains=q) |
-                Q(author__last_name__icontains=q) |
-                Q(
-                    author__first_name__icontains=q,
-                    author__user__userprofile__consent_status='consented'
-                ) |
-                Q(
-                    author__middle_initial__icontains=q,
-                    author__user__userprofile__consent_status='consented'
-                ) |
-                Q(
-                    author__suffix__icontains=q,
-                    author__user__userprofile__consent_status='consented'
-                )
-            ).distinct()
-        if school_year:
-            qs = qs.filter(school_year=school_year)
-        if strand:
-            qs = qs.filter(strand=strand)
-        if research_design:
-            qs = qs.filter(research_design=research_design)
-        if grade_level:
-            qs = qs.filter(grade_level=grade_level)
-        if award:
-            qs = qs.filter(awards__id=award)
         if author_ids:
             qs = qs.filter(author__id__in=author_ids).distinct()
         if keyword_ids:
             qs = qs.filter(keywords__id__in=keyword_ids).distinct()
- 
+
+        self.selected_facets = {
+            "school_year":     school_year,
+            "grade_level":     grade_level,
+            "research_design": research_design,
+            "strand":          strand,
+            "award":           award,
+        }
+
+        # Fall back to trigram matching when the exact search finds nothing
+        # the visitor will see, i.e. nothing left after the facet filters
+        self.is_fuzzy = False
+        if q:
+            matches = search_papers(qs, q)
+            if not self.filter_facets(matches).exists():
+                matches = fuzzy_search_papers(qs, q)
+                self.is_fuzzy = True
+            qs = matches
+
+        # Facet counts are taken before the facet filters narrow the results
+        self.matched_queryset = qs if (q or author_ids or keyword_ids) else None
+        return self.filter_facets(qs)
+
+    def filter_facets(self, qs):
+        """``qs`` narrowed to the selected school year, strand, design, grade and award."""
+        facets = self.selected_facets
+        if facets["school_year"]:
+            qs = qs.filter(school_year=facets["school_year"])
+        if facets["strand"]:
+            qs = qs.filter(strand=facets["strand"])
+        if facets["research_design"]:
+            qs = qs.filter(research_design=facets["research_design"])
+        if facets["grade_level"]:
+            qs = qs.filter(grade_level=facets["grade_level"])
+        if facets["award"]:
+            qs = qs.filter(awards__id=facets["award"])
         return qs
+
+    def get_cursor_ordering(self):
+        # Relevance-ranked results keep offset pagination
+        if self.request.GET.get("q"):
+            return None
+        return self.cursor_ordering
+
+    def get_facet_counts(self):
+        """Per-option result counts for the filter dropdowns (see research/facets.py)."""
+        matched_ids = None
+        if self.matched_queryset is not None:
+            matched_ids = self.matched_queryset.prefetch_related(None).order_by().values_list('id', flat=True)
+        return facet_counts(self.selected_facets, matched_ids)
  
     # ── GET handler ───────────────────────────────────────────────
     def get(self, request, *args, **kwargs):
@@ -415,10 +351,24 @@ class SearchView(generic.ListView):
  
         if is_ajax:
             # Called by the navbar quick-search bar — return JSON as before.
+            # Plain ?q= lookups are answered from the in-memory index; filters,
+            # misses (fuzzy suggestions) and a cold or stale index go to the database.
+            if set(request.GET) == {'q'}:
+                hit = quick_search_index.search(request.GET['q'])
+                if hit is None:
+                    quick_search_index.build_in_background()
+                elif hit[1]:
+                    results, total = hit
+                    return JsonResponse({'results': results, 'total': total})
+
             queryset = self.get_queryset()
             total    = queryset.count()
             results  = []
-            for paper in queryset[:8]:
+            papers   = queryset.prefetch_related(
+                author_prefetch(),
+                Prefetch('keywords', queryset=Keyword.objects.only('id', 'word')),
+            )
+            for paper in papers[:8]:
                 authors = [
                     a.display_name_public()
                     for a in paper.get_authors_alphabetically()
@@ -431,7 +381,10 @@ class SearchView(generic.ListView):
                     'authors':  authors,
                     'keywords': [kw.word for kw in paper.keywords.all()[:6]],
                 })
-            return JsonResponse({'results': results, 'total': total})
+            data = {'results': results, 'total': total}
+            if self.is_fuzzy:
+                data['suggestions'] = suggest(request.GET.get('q', ''))
+            return JsonResponse(data)
  
         # Normal full-page render
         return super().get(request, *args, **kwargs)
@@ -450,10 +403,13 @@ class SearchView(generic.ListView):
             "authors":          [],
             "school_years":     get_cached_school_years(),
             "research_designs": ResearchPaper.RESEARCH_DESIGN_CHOICES,
+            "is_fuzzy":         self.is_fuzzy,
+            "suggestions":      suggest(self.request.GET.get("q", "")) if self.is_fuzzy else [],
+            "facet_counts":     self.get_facet_counts(),
         })
         return context
     
-class StrandFilteredView(generic.ListView):
+class StrandFilteredView(CursorPaginationMixin, generic.ListView):
     model = ResearchPaper
     template_name = "research/index.html"
     context_object_name = "latest_research_list"
@@ -462,10 +418,7 @@ class StrandFilteredView(generic.ListView):
     def get_queryset(self):
         return ResearchPaper.objects.filter(
             strand=self.kwargs["strand"]
-        ).prefetch_related(
-            'author',
-            'keywords'
-        ).order_by("-publication_date")
+        ).order_by("-publication_date", "id")
 
     def get_context_data(self, **kwargs):
         ctx = super().get_context_data(**kwargs)
@@ -483,9 +436,6 @@ class StrandDesignFilteredView(generic.ListView):
         return ResearchPaper.objects.filter(
             strand=self.kwargs["strand"],
             research_design=self.kwargs["design"]
-        ).prefetch_related(
-            'author',
-            'keywords'
         ).order_by("-publication_date")
 
     def get_context_data(self, **kwargs):
@@ -496,7 +446,7 @@ class StrandDesignFilteredView(generic.ListView):
         ctx["selected_design_display"] = design_dict.get(self.kwargs["design"], self.kwargs["design"])
         return ctx
 
-class AdminDashboardView(TeacherRequiredMixin, generic.ListView):
+class AdminDashboardView(TeacherRequiredMixin, CursorPaginationMixin, generic.ListView):
     model = ResearchPaper
     template_name = "research/admin_dashboard.html"
     context_object_name = "papers"
@@ -568,6 +518,14 @@ class AdminDashboardView(TeacherRequiredMixin, generic.ListView):
 
         return qs
 
+    def get_cursor_ordering(self):
+        sort_by = self.request.GET.get("sort_by", "latest")
+        return {
+            "alphabetical": ("clean_title", "id"),
+            "reverse_alphabetical": ("-clean_title", "id"),
+            "oldest": ("publication_date", "id"),
+        }.get(sort_by, ("-publication_date", "id"))
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         request = self.request
@@ -642,7 +600,6 @@ class ResearchPaperCreateView(TeacherRequiredMixin, generic.CreateView):
 
     def form_valid(self, form):
         messages.success(self.request, f"'{form.instance.title}' uploaded successfully.")
-        invalidate_paper_caches()
         return super().form_valid(form)
     
     def form_invalid(self, form):
@@ -676,7 +633,6 @@ class ResearchPaperUpdateView(TeacherRequiredMixin, generic.UpdateView):
 
     def form_valid(self, form):
         messages.success(self.request, f"'{form.instance.title}' updated successfully.")
-        invalidate_paper_caches()
         return super().form_valid(form)
 
 class ResearchPaperDeleteView(TeacherRequiredMixin, generic.DeleteView):
@@ -686,7 +642,6 @@ class ResearchPaperDeleteView(TeacherRequiredMixin, generic.DeleteView):
     def delete(self, request, *args, **kwargs):
         paper = self.get_object()
         messages.success(request, f"'{paper.title}' deleted successfully.")
-        invalidate_paper_caches()
         return super().delete(request, *args, **kwargs)
 
     def get(self, request, pk):
@@ -760,7 +715,6 @@ class KeywordManageView(TeacherRequiredMixin, generic.ListView):
                 return redirect("research:manage_keywords")
 
             Keyword.objects.create(word=keyword_name)
-            invalidate_keyword_caches()
 
             if is_ajax:
                 return JsonResponse({"success": True, "message": f"Keyword '{keyword_name}' added successfully."})
@@ -797,7 +751,6 @@ class KeywordManageView(TeacherRequiredMixin, generic.ListView):
                 old_name = keyword.word
                 keyword.word = keyword_name
                 keyword.save()
-                invalidate_keyword_caches()
 
                 if is_ajax:
                     return JsonResponse({"success": True, "message": f"Keyword updated from '{old_name}' to '{keyword_name}'."})
@@ -820,7 +773,6 @@ class KeywordManageView(TeacherRequiredMixin, generic.ListView):
                 usage_count = keyword.researchpaper_set.count()
                 keyword_name = keyword.word
                 keyword.delete()
-                invalidate_keyword_caches()
 
                 if usage_count > 0:
                     messages.warning(
@@ -975,8 +927,6 @@ class ManageAuthorsView(TeacherRequiredMixin, ListView):
                     G12_Batch=g12_batch if g12_batch else None,
                 )
                 
-                invalidate_author_caches()
-                
                 messages.success(request, f"Author '{first_name} {last_name}' added successfully.")
             
             return redirect("research:manage_authors")
@@ -1022,8 +972,6 @@ class ManageAuthorsView(TeacherRequiredMixin, ListView):
                     author.G12_Batch = g12_batch if g12_batch else None
                     author.save()
                     
-                    invalidate_author_caches()
-                    
                     messages.success(request, f"Author '{first_name} {last_name}' updated successfully.")
                 except Author.DoesNotExist:
                     messages.error(request, "Author not found.")
@@ -1037,8 +985,6 @@ class ManageAuthorsView(TeacherRequiredMixin, ListView):
         if delete_id:
             Author.objects.filter(id=delete_id).delete()
             
-            invalidate_author_caches()
-            
             messages.success(request, "Author deleted successfully.")
             return redirect("research:manage_authors")
 
@@ -1050,56 +996,16 @@ class GetAuthorsByBatchView(View):
         grade = request.GET.get("grade")
         school_year = request.GET.get("school_year")
 
-        if not grade or not school_year:
+        if grade not in ("11", "12") or not school_year:
             return JsonResponse([], safe=False)
 
-        cache_key = f'authors_grade_{grade}_year_{school_year}'
-        data = cache.get(cache_key)
-        
-        if data is None:
-            if grade == "11":
-                authors = Author.objects.filter(G11_Batch=school_year).only(
-                    'id', 'first_name', 'last_name', 'middle_initial', 'suffix'
-                )
-            elif grade == "12":
-                authors = Author.objects.filter(G12_Batch=school_year).only(
-                    'id', 'first_name', 'last_name', 'middle_initial', 'suffix'
-                )
-            else:
-                return JsonResponse([], safe=False)
-
-            authors = authors.order_by("last_name", "first_name")
-            
-            data = []
-            for author in authors:
-                data.append({
-                    "id": author.id,
-                    "name": author.display_name_public()
-                })
-            
-            cache.set(cache_key, data, 60 * 60)
-
-        return JsonResponse(data, safe=False)
+        return JsonResponse(get_cached_batch_authors(grade, school_year), safe=False)
 
 @method_decorator(csrf_protect, name='dispatch')
 class GetAllKeywordsView(View):
     """Return all keywords for the keyword dropdown"""
     def get(self, request, *args, **kwargs):
-        cache_key = 'all_keywords'
-        data = cache.get(cache_key)
-        
-        if data is None:
-            keywords = Keyword.objects.only('id', 'word').order_by("word")
-            data = []
-            for keyword in keywords:
-                data.append({
-                    "id": keyword.id,
-                    "name": keyword.word
-                })
-            
-            cache.set(cache_key, data, 60 * 60)
-        
-        return JsonResponse(data, safe=False)
+        return JsonResponse(get_cached_keywords(), safe=False)
 
 @method_decorator(csrf_protect, name='dispatch')
 class AddKeywordAjaxView(View):
@@ -1108,9 +1014,6 @@ class AddKeywordAjaxView(View):
             keyword_text = request.POST.get("name", "").strip()
             kw, created = Keyword.objects.get_or_create(word=keyword_text)
             
-            if created:
-                invalidate_keyword_caches()
-            
             return JsonResponse({"id": kw.id, "name": kw.word})
         except Exception as e:
             return JsonResponse({"error": str(e)}, status=400)
@@ -1173,8 +1076,6 @@ class AddAuthorAjaxView(LoginRequiredMixin, TeacherRequiredMixin, View):
                 G12_Batch=g12_batch if g12_batch else None,
             )
             
-            invalidate_author_caches()
-            
             return JsonResponse({"id": a.id, "name": str(a)})
         except Exception as e:
             return JsonResponse({"error": str(e)}, status=400)
@@ -1186,9 +1087,6 @@ class AddAwardAjaxView(View):
             award_name = request.POST.get("name", "").strip()
             award, created = Award.objects.get_or_create(name=award_name)
             
-            if created:
-                invalidate_award_caches()
-            
             return JsonResponse({"id": award.id, "name": award.name})
         except Exception as e:
             return JsonResponse({"error": str(e)}, status=400)
\ No newline at end of file
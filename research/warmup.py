@@ -0,0 +1,91 @@
+# research/warmup.py
+"""
+Cache warm-up for freshly started workers.
+
+Fills the memoized filter metadata, the facet bitmaps and the repository
+statistics, then renders the home page and the first index page once, so
+the first visitors after a worker (re)start don't pay for cold queries
+and template compilation.
+Runs on a background thread from gunicorn's post_worker_init (requests,
+including the healthcheck, are served meanwhile) or with
+``python manage.py warm_cache``.
+"""
+import logging
+import threading
+import time
+
+from django.contrib.auth.models import AnonymousUser
+from django.db import connection
+from django.http import HttpRequest
+
+logger = logging.getLogger(__name__)
+
+
+def _render(view, path):
+    # Rendered in-process, never sent anywhere; localhost is in ALLOWED_HOSTS.
+    # A bare HttpRequest rather than django.test's RequestFactory, which
+    # would load the test framework into every worker.
+    request = HttpRequest()
+    request.method = 'GET'
+    request.path = request.path_info = path
+    request.META = {
+        'REQUEST_METHOD': 'GET',
+        'PATH_INFO': path,
+        'QUERY_STRING': '',
+        'HTTP_HOST': 'localhost',
+        'SERVER_NAME': 'localhost',
+        'SERVER_PORT': '80',
+    }
+    request.user = AnonymousUser()
+    response = view(request)
+    if hasattr(response, 'render'):
+        response.render()
+    return response.status_code
+
+
+def warm_cache():
+    """Run every warm-up step; returns {step: seconds}. Failed steps are logged and skipped."""
+    from . import views
+    from .facets import get_bitmaps
+    from .stats import recount_stats
+
+    steps = [
+        ('awards', views.get_cached_awards),
+        ('school_years', views.get_cached_school_years),
+        ('strands', views.get_cached_strands),
+        ('grade_levels', views.get_cached_grade_levels),
+        ('author_batches', views.get_cached_all_batches),
+        ('keywords', views.get_cached_keywords),
+        ('facet_bitmaps', get_bitmaps),
+        ('site_stats', recount_stats),
+        ('home_page', lambda: _render(views.HomeView.as_view(), '/')),
+        ('index_page', lambda: _render(views.IndexView.as_view(), '/research/')),
+    ]
+
+    timings = {}
+    for name, step in steps:
+        started = time.monotonic()
+        try:
+            step()
+        except Exception:
+            logger.exception("Cache warm-up step %s failed", name)
+        timings[name] = round(time.monotonic() - started, 3)
+    return timings
+
+
+def warm_cache_in_background(on_done=None):
+    """Start warm_cache() on a daemon thread; ``on_done(timings, total)`` is called when it finishes."""
+    def run():
+        started = time.monotonic()
+        try:
+            timings = warm_cache()
+        finally:
+            connection.close()
+        total = round(time.monotonic() - started, 3)
+        logger.info("Cache warm-up took %ss: %s", total, timings)
+        if on_done:
+            on_done(timings, total)
+
+    thread = threading.Thread(target=run, name='cache-warm-up', daemon=True)
+    thread.start()
+    return thread
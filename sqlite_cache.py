@@ -0,0 +1,290 @@
+"""
+Cache backend on a local SQLite file, shared by every gunicorn worker.
+
+Lives on /dev/shm by default (RAM-backed, no external service), so cached
+data, invalidations and django-ratelimit counters are the same in every
+worker and survive max_requests recycling. Writes are serialized by
+SQLite; add() is a single upsert and incr() runs in one IMMEDIATE
+transaction, so both are atomic across processes.
+
+    CACHES = {'default': {
+        'BACKEND': 'sqlite_cache.SQLiteCache',
+        'LOCATION': '/dev/shm/g12research-cache.sqlite3',
+        'OPTIONS': {'MAX_ENTRIES': 5000, 'MAX_BYTES': 32 * 1024 * 1024, 'CULL_FREQUENCY': 4},
+    }}
+
+/dev/shm is charged to the instance's memory, so besides MAX_ENTRIES the
+stored values are capped at MAX_BYTES in total; a cull drops the entries
+closest to expiry until both limits are back under.
+
+Integers (ratelimit counters, cache generations) are stored as plain
+SQLite integers; everything else is pickled.
+
+The cache must never take a request down: a SQLite error (locked or
+full database, deleted file) is logged and the call behaves like a miss
+(reads, add, touch), a no-op (writes, deletes) or a missing key (incr).
+"""
+import logging
+import os
+import pickle
+import sqlite3
+import tempfile
+import threading
+import time
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    expires REAL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS cache_expires ON cache (expires);
+"""
+
+# Only check the entry count and size every this many writes
+CULL_CHECK_INTERVAL = 32
+
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+
+
+def _encode(value):
+    # bool is an int subclass but must come back as a bool
+    if type(value) is int and -2 ** 63 <= value < 2 ** 63:
+        return value
+    return pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+
+
+def _decode(value):
+    if isinstance(value, int):
+        return value
+    return pickle.loads(value)
+
+
+class SQLiteCache(BaseCache):
+    def __init__(self, location, params):
+        super().__init__(params)
+        location = location or '/dev/shm/g12research-cache.sqlite3'
+        if not os.path.isdir(os.path.dirname(location) or '.'):
+            # No /dev/shm (macOS, Windows): fall back to the temp dir
+            location = os.path.join(tempfile.gettempdir(), os.path.basename(location))
+        self.location = location
+        self._max_bytes = int(params.get('OPTIONS', {}).get('MAX_BYTES', DEFAULT_MAX_BYTES))
+        self._local = threading.local()
+        self._writes = 0
+
+    # -------------------------
+    # Connections
+    # -------------------------
+
+    def _connection(self):
+        """One connection per thread, reopened after fork."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+
+        conn = sqlite3.connect(self.location, timeout=10, isolation_level=None)
+        conn.execute('PRAGMA journal_mode=WAL')
+        # A cache can lose its last writes in a crash; skip the fsyncs
+        conn.execute('PRAGMA synchronous=OFF')
+        conn.executescript(SCHEMA)
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+    def _failed(self, operation, error):
+        logger.warning("Cache %s failed: %s", operation, error)
+        # Reconnect next time, in case the file was removed or replaced
+        conn, self._local.conn = getattr(self._local, 'conn', None), None
+        if conn is not None:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+
+    def _expiry(self, timeout):
+        # BaseCache.get_backend_timeout() gives an absolute time or None
+        return self.get_backend_timeout(timeout)
+
+    def _after_write(self, conn):
+        self._writes += 1
+        if self._writes % CULL_CHECK_INTERVAL == 0:
+            self._cull(conn)
+
+    def _cull(self, conn):
+        conn.execute('DELETE FROM cache WHERE expires <= ?', (time.time(),))
+        count, size = conn.execute('SELECT COUNT(*), COALESCE(SUM(length(value)), 0) FROM cache').fetchone()
+        if count < self._max_entries and size < self._max_bytes:
+            return
+        if self._cull_frequency == 0:
+            conn.execute('DELETE FROM cache')
+            return
+
+        # Whichever limit was reached, free 1/CULL_FREQUENCY of it
+        cull_entries = cull_bytes = 0
+        if count >= self._max_entries:
+            cull_entries = count // self._cull_frequency
+        if size >= self._max_bytes:
+            cull_bytes = size - self._max_bytes + self._max_bytes // self._cull_frequency
+        # Drop the entries closest to expiry (never-expiring ones go last)
+        # until both amounts are freed
+        conn.execute(
+            'DELETE FROM cache WHERE key IN ('
+            ' SELECT key FROM ('
+            '  SELECT key, ROW_NUMBER() OVER w AS n, SUM(length(value)) OVER w - length(value) AS freed'
+            '  FROM cache WINDOW w AS (ORDER BY expires IS NULL, expires, key)'
+            ' ) WHERE n <= ? OR freed < ?)',
+            (cull_entries, cull_bytes),
+        )
+
+    # -------------------------
+    # Cache API
+    # -------------------------
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        try:
+            conn = self._connection()
+            cursor = conn.execute(
+                'INSERT INTO cache (key, value, expires) VALUES (?, ?, ?) '
+                'ON CONFLICT (key) DO UPDATE SET value = excluded.value, expires = excluded.expires '
+                'WHERE cache.expires <= ?',
+                (key, _encode(value), self._expiry(timeout), time.time()),
+            )
+            self._after_write(conn)
+        except sqlite3.Error as e:
+            self._failed('add', e)
+            return False
+        return cursor.rowcount > 0
+
+    def get(self, key, default=None, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        try:
+            row = self._connection().execute(
+                'SELECT value FROM cache WHERE key = ? AND (expires IS NULL OR expires > ?)',
+                (key, time.time()),
+            ).fetchone()
+        except sqlite3.Error as e:
+            self._failed('get', e)
+            return default
+        return default if row is None else _decode(row[0])
+
+    def get_many(self, keys, version=None):
+        key_map = {self.make_and_validate_key(key, version=version): key for key in keys}
+        if not key_map:
+            return {}
+        placeholders = ', '.join('?' * len(key_map))
+        try:
+            rows = self._connection().execute(
+                f'SELECT key, value FROM cache WHERE key IN ({placeholders}) '
+                f'AND (expires IS NULL OR expires > ?)',
+                (*key_map, time.time()),
+            ).fetchall()
+        except sqlite3.Error as e:
+            self._failed('get_many', e)
+            return {}
+        return {key_map[key]: _decode(value) for key, value in rows}
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        try:
+            conn = self._connection()
+            conn.execute(
+                'INSERT OR REPLACE INTO cache (key, value, expires) VALUES (?, ?, ?)',
+                (key, _encode(value), self._expiry(timeout)),
+            )
+            self._after_write(conn)
+        except sqlite3.Error as e:
+            self._failed('set', e)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        expires = self._expiry(timeout)
+        rows = [
+            (self.make_and_validate_key(key, version=version), _encode(value), expires)
+            for key, value in data.items()
+        ]
+        try:
+            conn = self._connection()
+            with conn:
+                conn.execute('BEGIN IMMEDIATE')
+                conn.executemany('INSERT OR REPLACE INTO cache (key, value, expires) VALUES (?, ?, ?)', rows)
+            self._after_write(conn)
+        except sqlite3.Error as e:
+            self._failed('set_many', e)
+            return list(data)
+        return []
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        try:
+            cursor = self._connection().execute(
+                'UPDATE cache SET expires = ? WHERE key = ? AND (expires IS NULL OR expires > ?)',
+                (self._expiry(timeout), key, time.time()),
+            )
+        except sqlite3.Error as e:
+            self._failed('touch', e)
+            return False
+        return cursor.rowcount > 0
+
+    def incr(self, key, delta=1, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        try:
+            conn = self._connection()
+            with conn:
+                conn.execute('BEGIN IMMEDIATE')
+                row = conn.execute(
+                    'SELECT value FROM cache WHERE key = ? AND (expires IS NULL OR expires > ?)',
+                    (key, time.time()),
+                ).fetchone()
+                if row is None:
+                    raise ValueError(f"Key '{key}' not found")
+                value = _decode(row[0]) + delta
+                conn.execute('UPDATE cache SET value = ? WHERE key = ?', (_encode(value), key))
+        except sqlite3.Error as e:
+            self._failed('incr', e)
+            # Callers already handle a missing key
+            raise ValueError(f"Key '{key}' not found") from e
+        return value
+
+    def delete(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        try:
+            cursor = self._connection().execute('DELETE FROM cache WHERE key = ?', (key,))
+        except sqlite3.Error as e:
+            self._failed('delete', e)
+            return False
+        return cursor.rowcount > 0
+
+    def delete_many(self, keys, version=None):
+        keys = [self.make_and_validate_key(key, version=version) for key in keys]
+        if keys:
+            placeholders = ', '.join('?' * len(keys))
+            try:
+                self._connection().execute(f'DELETE FROM cache WHERE key IN ({placeholders})', keys)
+            except sqlite3.Error as e:
+                self._failed('delete_many', e)
+
+    def has_key(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        try:
+            row = self._connection().execute(
+                'SELECT 1 FROM cache WHERE key = ? AND (expires IS NULL OR expires > ?)',
+                (key, time.time()),
+            ).fetchone()
+        except sqlite3.Error as e:
+            self._failed('has_key', e)
+            return False
+        return row is not None
+
+    def clear(self):
+        try:
+            self._connection().execute('DELETE FROM cache')
+        except sqlite3.Error as e:
+            self._failed('clear', e)
+
+    def close(self, **kwargs):
+        # Connections are per thread and reused across requests
+        pass